@@ -0,0 +1,93 @@
+"""
+Process-wide cache for pvlib Linke turbidity lookups
+Shared by IntradaySolarForecastModel, SmartPersistenceModel and the solar tables
+
+pvlib's Ineichen clear-sky model reads the bundled LinkeTurbidities.h5 file on
+every get_clearsky call. The monthly turbidity climatology for a site never
+changes, so it is read once per (latitude, longitude) and reused; daily values
+are interpolated exactly as pvlib does.
+"""
+import calendar
+import threading
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Tuple
+
+# Try importing pvlib for clear sky models
+try:
+    from pvlib.clearsky import lookup_linke_turbidity
+    PVLIB_AVAILABLE = True
+except ImportError:
+    PVLIB_AVAILABLE = False
+    logging.warning("pvlib library not found. Install with: pip install pvlib")
+
+logger = logging.getLogger(__name__)
+
+# Monthly Linke turbidity keyed by (latitude, longitude); index 0-11 is the month
+_TURBIDITY_CACHE: Dict[Tuple[float, float], np.ndarray] = {}
+_TURBIDITY_LOCK = threading.Lock()
+
+
+def _month_middles(leap: bool) -> np.ndarray:
+    """Day-of-year of each month middle, padded with previous Dec and next Jan"""
+    month_days = np.array(calendar.mdays[1:], dtype=float)
+    year_days = 365
+    if leap:
+        month_days[1] += 1
+        year_days = 366
+    return np.concatenate([[-calendar.mdays[12] / 2.0],
+                           np.cumsum(month_days) - month_days / 2.0,
+                           [year_days + calendar.mdays[1] / 2.0]])
+
+
+def get_monthly_turbidity(latitude: float, longitude: float) -> np.ndarray:
+    """Monthly Linke turbidity values (Jan..Dec) for a site, read from pvlib's file once"""
+    key = (float(latitude), float(longitude))
+    with _TURBIDITY_LOCK:
+        monthly = _TURBIDITY_CACHE.get(key)
+        if monthly is None:
+            month_starts = pd.date_range('2001-01-01', periods=12, freq='MS', tz='UTC')
+            monthly = lookup_linke_turbidity(month_starts, latitude, longitude,
+                                             interp_turbidity=False).to_numpy()
+            _TURBIDITY_CACHE[key] = monthly
+            logger.debug(f"Cached Linke turbidity for ({latitude}, {longitude})")
+    return monthly
+
+
+def get_linke_turbidity(times: pd.DatetimeIndex, latitude: float, longitude: float) -> pd.Series:
+    """
+    Linke turbidity for each timestamp, interpolated daily between month middles
+
+    Equivalent to pvlib.clearsky.lookup_linke_turbidity(times, latitude, longitude)
+    without re-reading the data file.
+    """
+    monthly = get_monthly_turbidity(latitude, longitude)
+    padded = np.concatenate([[monthly[-1]], monthly, [monthly[0]]])
+
+    times_utc = pd.DatetimeIndex(times)
+    times_utc = times_utc.tz_convert('UTC') if times_utc.tz is not None else times_utc
+    day_of_year = np.asarray(times_utc.dayofyear)
+
+    turbidity = np.where(np.asarray(times_utc.is_leap_year),
+                         np.interp(day_of_year, _month_middles(True), padded),
+                         np.interp(day_of_year, _month_middles(False), padded))
+    return pd.Series(turbidity, index=times)
+
+
+def get_clearsky_cached(location, times: pd.DatetimeIndex, model: str = 'ineichen') -> pd.DataFrame:
+    """
+    Clear-sky irradiance for a pvlib Location using the cached turbidity
+
+    Args:
+        location: pvlib.location.Location
+        times: Timestamps for calculation
+        model: pvlib clear-sky model name
+
+    Returns:
+        DataFrame with 'ghi', 'dni' and 'dhi' columns
+    """
+    if model == 'ineichen':
+        linke_turbidity = get_linke_turbidity(times, location.latitude, location.longitude)
+        return location.get_clearsky(times, model=model, linke_turbidity=linke_turbidity)
+    return location.get_clearsky(times, model=model)
@@ -0,0 +1,213 @@
+"""
+Optional compiled physics kernels
+Numba-compiled loops for the hot numeric functions, with automatic backend selection
+
+Numba is not a required dependency. When it is installed (and KERNEL_BACKEND is
+'auto' or 'numba') the solar position, POA transposition and synthetic weather
+kernels run as compiled element-wise loops; otherwise the pure NumPy
+implementations in solar_geometry, pv_kernels and synthetic_weather are
+used. tests/test_compiled_kernels.py checks both backends produce the same results.
+
+Compiled kernels are cached in NUMBA_CACHE_DIR; when that directory is not
+writable they are compiled on every start instead.
+"""
+import os
+import math
+import logging
+import numpy as np
+from typing import Optional, Sequence, Tuple
+
+from config import KERNEL_BACKEND, NUMBA_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# Try importing numba for compiled kernels (optional)
+os.environ.setdefault('NUMBA_CACHE_DIR', NUMBA_CACHE_DIR)
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _cache_dir_writable() -> bool:
+    cache_dir = os.environ['NUMBA_CACHE_DIR']
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError:
+        pass
+    if os.access(cache_dir, os.W_OK):
+        return True
+    logger.warning(f"Numba cache directory {cache_dir} is not writable, kernels are compiled on every start")
+    return False
+
+
+CACHE_KERNELS = NUMBA_AVAILABLE and _cache_dir_writable()
+if CACHE_KERNELS:
+    # Also applies when numba was imported before NUMBA_CACHE_DIR was set
+    numba.config.CACHE_DIR = os.environ['NUMBA_CACHE_DIR']
+
+SUPPORTED_BACKENDS = ('auto', 'numba', 'numpy')
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """
+    Resolve the requested backend to the one that will actually run
+
+    Args:
+        backend: 'auto', 'numba', 'numpy' or None for the configured KERNEL_BACKEND
+
+    Returns:
+        'numba' or 'numpy'
+    """
+    backend = backend or KERNEL_BACKEND
+    if backend not in SUPPORTED_BACKENDS:
+        raise ValueError(f"Unknown kernel backend: {backend}")
+    if backend == 'numpy':
+        return 'numpy'
+    if NUMBA_AVAILABLE:
+        return 'numba'
+    if backend == 'numba':
+        logger.warning("Numba backend requested but numba is not installed, using NumPy kernels")
+    return 'numpy'
+
+
+if NUMBA_AVAILABLE:
+
+    @numba.njit(cache=CACHE_KERNELS)
+    def solar_position_numba(unix_seconds, latitude, longitude, apply_refraction,
+                             elevation_out, azimuth_out):
+        """NOAA solar position on flat arrays of equal length (see solar_geometry)"""
+        for i in range(unix_seconds.size):
+            jc = (unix_seconds[i] / 86400.0 + 2440587.5 - 2451545.0) / 36525.0
+
+            mean_long = (280.46646 + jc * (36000.76983 + jc * 0.0003032)) % 360.0
+            mean_anom_rad = math.radians(357.52911 + jc * (35999.05029 - 0.0001537 * jc))
+            eccentricity = 0.016708634 - jc * (0.000042037 + 0.0000001267 * jc)
+
+            eq_center = (math.sin(mean_anom_rad) * (1.914602 - jc * (0.004817 + 0.000014 * jc)) +
+                         math.sin(2 * mean_anom_rad) * (0.019993 - 0.000101 * jc) +
+                         math.sin(3 * mean_anom_rad) * 0.000289)
+            omega_rad = math.radians(125.04 - 1934.136 * jc)
+            apparent_long = mean_long + eq_center - 0.00569 - 0.00478 * math.sin(omega_rad)
+
+            mean_obliquity = 23 + (26 + (21.448 - jc * (46.815 + jc * (0.00059 - jc * 0.001813))) / 60) / 60
+            obliquity_rad = math.radians(mean_obliquity + 0.00256 * math.cos(omega_rad))
+            decl_rad = math.asin(math.sin(obliquity_rad) * math.sin(math.radians(apparent_long)))
+
+            var_y = math.tan(obliquity_rad / 2) ** 2
+            mean_long_rad = math.radians(mean_long)
+            equation_of_time = 4 * math.degrees(
+                var_y * math.sin(2 * mean_long_rad) -
+                2 * eccentricity * math.sin(mean_anom_rad) +
+                4 * eccentricity * var_y * math.sin(mean_anom_rad) * math.cos(2 * mean_long_rad) -
+                0.5 * var_y ** 2 * math.sin(4 * mean_long_rad) -
+                1.25 * eccentricity ** 2 * math.sin(2 * mean_anom_rad)
+            )
+
+            minutes_of_day = (unix_seconds[i] % 86400.0) / 60.0
+            true_solar_time = (minutes_of_day + equation_of_time + 4 * longitude[i]) % 1440.0
+            hour_angle_rad = math.radians(true_solar_time / 4 - 180)
+
+            lat_rad = math.radians(latitude[i])
+            sin_elevation = (math.sin(lat_rad) * math.sin(decl_rad) +
+                             math.cos(lat_rad) * math.cos(decl_rad) * math.cos(hour_angle_rad))
+            sin_elevation = min(max(sin_elevation, -1.0), 1.0)
+            elevation = math.degrees(math.asin(sin_elevation))
+            azimuth = math.degrees(math.atan2(
+                math.sin(hour_angle_rad),
+                math.cos(hour_angle_rad) * math.sin(lat_rad) - math.tan(decl_rad) * math.cos(lat_rad)
+            )) + 180.0
+
+            if apply_refraction:
+                e = min(max(elevation, -89.0), 89.0)
+                tan_e = math.tan(math.radians(e))
+                if e > 85:
+                    correction = 0.0
+                elif e > 5:
+                    correction = 58.1 / tan_e - 0.07 / tan_e ** 3 + 0.000086 / tan_e ** 5
+                elif e > -0.575:
+                    correction = 1735 + e * (-518.2 + e * (103.4 + e * (-12.79 + e * 0.711)))
+                else:
+                    correction = -20.772 / tan_e
+                elevation += correction / 3600.0
+
+            elevation_out[i] = elevation
+            azimuth_out[i] = azimuth % 360.0
+
+    @numba.njit(cache=CACHE_KERNELS)
+    def poa_transposition_numba(elevation, azimuth, ghi, dni, dhi, tilt, panel_azimuth,
+                                albedo, out):
+        """Isotropic-sky POA irradiance on (rows, time) arrays of out's shape (see pv_kernels)
+
+        Inputs may be broadcast views (zero strides), so broadcast dimensions are never copied.
+        """
+        for r in range(out.shape[0]):
+            for i in range(out.shape[1]):
+                tilt_rad = math.radians(tilt[r, i])
+                cos_tilt = math.cos(tilt_rad)
+                elevation_rad = math.radians(elevation[r, i])
+                cos_aoi = (math.sin(elevation_rad) * cos_tilt +
+                           math.cos(elevation_rad) * math.sin(tilt_rad) *
+                           math.cos(math.radians(azimuth[r, i] - panel_azimuth[r, i])))
+                cos_aoi = min(max(cos_aoi, 0.0), 1.0)
+
+                poa = (dni[r, i] * cos_aoi +
+                       dhi[r, i] * ((1 + cos_tilt) / 2) +
+                       ghi[r, i] * (albedo * (1 - cos_tilt) / 2))
+                out[r, i] = min(max(poa, 0.0), 1200.0)
+
+    @numba.njit(cache=CACHE_KERNELS)
+    def synthetic_weather_numba(hour, day_of_year, latitude, longitude, temp_noise,
+                                cloud_factor_draw, wind_draw, cloud_draw, humidity_draw, out):
+        """Synthetic weather rows (see synthetic_weather.synthetic_weather_kernel)
+
+        out has shape (7, n): temperature, ghi, dni, dhi, wind_speed, cloud_cover, humidity
+        """
+        for i in range(hour.size):
+            seasonal_temp = 15 + 10 * math.sin((day_of_year[i] - 80) * 2 * math.pi / 365)
+            diurnal_temp = 8 * math.sin((hour[i] - 6) * math.pi / 12)
+
+            lat_rad = math.radians(latitude[i])
+            decl_rad = math.radians(23.45 * math.sin(math.radians((360 * (284 + day_of_year[i])) / 365)))
+            hour_angle_rad = math.radians(15 * (hour[i] + longitude[i] / 15 - 12))
+            solar_elevation = math.degrees(math.asin(
+                math.sin(lat_rad) * math.sin(decl_rad) +
+                math.cos(lat_rad) * math.cos(decl_rad) * math.cos(hour_angle_rad)
+            ))
+
+            ghi = 0.0
+            if solar_elevation > 0:
+                sin_elevation = math.sin(math.radians(solar_elevation))
+                air_mass = 1 / (sin_elevation + 0.50572 * (solar_elevation + 6.07995) ** -1.6364)
+                ghi = max(0.0, 1361 * sin_elevation * 0.7 ** air_mass * (0.7 + 0.3 * cloud_factor_draw[i]))
+
+            out[0, i] = seasonal_temp + diurnal_temp + temp_noise[i]
+            out[1, i] = ghi
+            out[2, i] = ghi * 0.7
+            out[3, i] = ghi * 0.3
+            out[4, i] = 3 + 4 * wind_draw[i]
+            out[5, i] = 30 + 40 * cloud_draw[i]
+            out[6, i] = 50 + 30 * humidity_draw[i]
+
+
+def flat_float_arrays(*arrays) -> list:
+    """Broadcast inputs to a common shape and return contiguous flat float64 copies"""
+    broadcast = np.broadcast_arrays(*[np.asarray(a, dtype=np.float64) for a in arrays])
+    return [np.ascontiguousarray(a).ravel() for a in broadcast]
+
+
+def broadcast_rows(shape: Tuple[int, ...], dtype: np.dtype, arrays: Sequence) -> list:
+    """
+    Views of the inputs broadcast to shape, as (rows, time) arrays in dtype
+
+    Inputs already in dtype are not copied and broadcast dimensions have zero
+    strides, so per-site parameters and shared time axes stay at their own size.
+    """
+    columns = shape[-1] if shape else 1
+    return [np.broadcast_to(np.asarray(a, dtype=dtype), shape).reshape(-1, columns) for a in arrays]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(f"Active kernel backend: {resolve_backend()}")
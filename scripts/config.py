@@ -8,6 +8,7 @@ This applies to:
 - API responses (must include timezone metadata)
 - Email reports (clearly state CET/CEST timezone)
 """
+import os
 from datetime import datetime
 import pytz
 
@@ -166,12 +167,17 @@ PERFORMANCE_RATIO_BY_WEATHER = {
 }
 
 # Weather API configuration
+# Base URLs can point at a local weather_replay stand-in server for offline/benchmark runs
+OPEN_METEO_BASE_URL = os.environ.get('OPEN_METEO_BASE_URL', 'https://api.open-meteo.com')
+OPEN_METEO_ARCHIVE_BASE_URL = os.environ.get('OPEN_METEO_ARCHIVE_BASE_URL', 'https://archive-api.open-meteo.com')
+WEATHER_RECORD_DIR = os.environ.get('WEATHER_RECORD_DIR')  # When set, every successful weather API response is recorded here
+
 WEATHER_SOURCES = [
     {
         'name': 'open_meteo_era5',
         'type': 'reanalysis',
         'priority': 1,
-        'api_url': 'https://archive-api.open-meteo.com/v1/archive',
+        'api_url': f'{OPEN_METEO_ARCHIVE_BASE_URL}/v1/archive',
         'variables': ['temperature_2m', 'shortwave_radiation', 'direct_normal_irradiance', 
                      'diffuse_radiation', 'windspeed_10m', 'cloudcover', 'relative_humidity_2m']
     },
@@ -179,7 +185,7 @@ WEATHER_SOURCES = [
         'name': 'open_meteo_gfs',
         'type': 'forecast',
         'priority': 2,
-        'api_url': 'https://api.open-meteo.com/v1/forecast',
+        'api_url': f'{OPEN_METEO_BASE_URL}/v1/forecast',
         'variables': ['temperature_2m', 'shortwave_radiation', 'direct_normal_irradiance',
                      'diffuse_radiation', 'windspeed_10m', 'cloudcover']
     },
@@ -187,7 +193,7 @@ WEATHER_SOURCES = [
         'name': 'open_meteo_default',
         'type': 'mixed',
         'priority': 3,
-        'api_url': 'https://api.open-meteo.com/v1/forecast',
+        'api_url': f'{OPEN_METEO_BASE_URL}/v1/forecast',
         'variables': ['temperature_2m', 'shortwave_radiation', 'windspeed_10m', 'cloudcover']
     }
 ]
@@ -223,16 +229,66 @@ ROOFTOP_ANNUAL_PRODUCTION = {
 INTRADAY_FORECAST_DAYS = 7  # 7-day rolling forecast
 INTRADAY_RESOLUTION_MINUTES = 15  # 15-minute precision
 INTRADAY_UPDATE_FREQUENCY_HOURS = 1  # Update every hour
+INTRADAY_INCREMENTAL_UPDATES = True  # Recompute only intervals whose weather changed since the previous update
+
+# Monte Carlo ensemble for distribution-based quantiles (IntradaySolarForecastModel uncertainty_mode='ensemble')
+ENSEMBLE_MEMBERS = 500
+ENSEMBLE_CHUNK_ELEMENTS = 2_000_000  # Max members x intervals simulated at once (bounds memory)
 
 # Output aggregation levels
 AGGREGATION_LEVELS = ['15min', '1hour']
 
+# Compressed siblings written next to streamed API JSON files (*.json.gz, *.json.zst)
+API_JSON_COMPRESSION = ['gzip', 'zstd']
+
+# Write typed Parquet files next to the forecast CSV exports (requires pyarrow)
+FORECAST_PARQUET_EXPORT = True
+
+# Forecast archive: every run appended to a Parquet store partitioned by site/month (see forecast_archive)
+FORECAST_ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data_output', 'archive')
+FORECAST_EXPORT_RETENTION = 3  # Timestamped CSV/Parquet exports kept in data_output/intraday once a run is archived
+
 # Timezone configuration
 # CRITICAL: All outputs MUST use this timezone for display
 OUTPUT_TIMEZONE = 'Europe/Berlin'  # CET/CEST
 OUTPUT_TIMEZONE_NAME = 'CET/CEST'
 OUTPUT_TIMEZONE_NOTICE = "All timestamps are in CET/CEST (Europe/Berlin timezone)"
 
+# Cache configuration
+# Deterministic and downloaded data that can be reused across runs lives under data_cache/
+DATA_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data_cache')
+SOLAR_TABLE_DIR = os.path.join(DATA_CACHE_DIR, 'solar_tables')  # Precomputed solar geometry per site/year
+WEATHER_CACHE_DIR = os.path.join(DATA_CACHE_DIR, 'weather')  # Fetched NWP weather shared across processes
+WEATHER_CACHE_TTL_MINUTES = 90  # Hard expiry of a cached weather fetch
+WEATHER_CACHE_ISSUE_INTERVAL_MINUTES = 60  # Open-Meteo forecast update cadence (cache key granularity)
+WEATHER_CACHE_MAX_SIZE_MB = 200  # Least recently used entries are evicted above this size
+SOLAR_TABLE_RESOLUTION_MINUTES = 15  # Grid of the precomputed tables (must divide the forecast resolution)
+ERA5_ARCHIVE_DIR = os.path.join(DATA_CACHE_DIR, 'era5')  # Historical ERA5 weather, Parquet partitioned by site/year
+ERA5_DOWNLOAD_CONCURRENCY = 4  # Month chunks downloaded in parallel by era5_archive
+
+# HTTP client for weather APIs (pooled keep-alive session shared by the fetchers)
+HTTP_POOL_MAXSIZE = 8  # Connections kept alive per host
+HTTP_RETRY_TOTAL = 2  # Retries on connection errors, 429 and 5xx responses
+HTTP_RETRY_BACKOFF_SECONDS = 0.5  # Exponential backoff factor between retries
+HTTP_CONNECT_TIMEOUT_SECONDS = 5
+HTTP_HEDGE_AFTER_SECONDS = 10.0  # Send a second request if the first has not answered by then (None disables)
+HTTP_STATS_HISTORY = 1000  # Per-request latency/size records kept for monitoring
+OPEN_METEO_RATE_LIMIT_PER_MINUTE = 600  # Open-Meteo free tier quota, enforced by a token bucket on all requests
+OPEN_METEO_RATE_LIMIT_BURST = 10  # Requests allowed back-to-back before the rate limit applies
+WEATHER_FETCH_CONCURRENCY = 8  # Sites fetched concurrently by IntradayWeatherFetcher.fetch_many
+OPEN_METEO_NATIVE_15MIN = True  # Request native minutely_15 NWP data; hourly values are interpolated only where it is missing
+OPEN_METEO_BATCH_SIZE = 50  # Coordinates per multi-location request in IntradayWeatherFetcher.fetch_batch
+
+# Numeric kernel backend: 'auto' uses Numba-compiled kernels when installed, 'numpy' forces the pure NumPy path
+KERNEL_BACKEND = os.environ.get('SOLAR_KERNEL_BACKEND', 'auto')
+# Compiled kernel cache (Numba writes next to the sources by default, which may be read-only in the container)
+NUMBA_CACHE_DIR = os.environ.get('NUMBA_CACHE_DIR', os.path.join(DATA_CACHE_DIR, 'numba'))
+
+# Numeric dtype policy: weather, physics and per-interval values use COMPUTE_DTYPE (~7 significant digits,
+# ample for kW output); sums over time such as energy totals and resampling use ACCUMULATION_DTYPE
+COMPUTE_DTYPE = os.environ.get('SOLAR_COMPUTE_DTYPE', 'float32')
+ACCUMULATION_DTYPE = 'float64'
+
 # Logging configuration
 LOG_LEVEL = 'INFO'
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
\ No newline at end of file
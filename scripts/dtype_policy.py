@@ -0,0 +1,50 @@
+"""
+Numeric dtype policy for the forecast pipeline
+Weather inputs, physics and per-interval forecast values use COMPUTE_DTYPE;
+sums over time (energy totals, rolling means, resampling) use ACCUMULATION_DTYPE
+
+Solar geometry is always evaluated in float64 (Julian centuries and Unix
+seconds need the extra mantissa) and cast to COMPUTE_DTYPE afterwards.
+"""
+import numpy as np
+import pandas as pd
+from typing import Iterable, Optional
+
+from config import COMPUTE_DTYPE, ACCUMULATION_DTYPE
+
+
+def compute_dtype() -> np.dtype:
+    """Floating dtype used for physics and per-interval values"""
+    return np.dtype(COMPUTE_DTYPE)
+
+
+def accumulation_dtype() -> np.dtype:
+    """Floating dtype used for sums and aggregations"""
+    return np.dtype(ACCUMULATION_DTYPE)
+
+
+def as_compute_array(values) -> np.ndarray:
+    """Contiguous array in the compute dtype (no copy when it already is one)"""
+    return np.ascontiguousarray(values, dtype=compute_dtype())
+
+
+def cast_float_columns(df: pd.DataFrame, dtype: Optional[np.dtype] = None,
+                       columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Cast floating-point columns of a DataFrame in place
+
+    Args:
+        df: DataFrame to modify
+        dtype: Target dtype, defaults to the compute dtype
+        columns: Columns to cast, defaults to every floating-point column
+
+    Returns:
+        The same DataFrame, for chaining
+    """
+    dtype = np.dtype(dtype) if dtype is not None else compute_dtype()
+    if columns is None:
+        columns = [col for col in df.columns if pd.api.types.is_float_dtype(df[col])]
+    for col in columns:
+        if col in df.columns and df[col].dtype != dtype:
+            df[col] = df[col].astype(dtype)
+    return df
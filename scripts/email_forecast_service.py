@@ -18,6 +18,9 @@ import logging
 from typing import List, Dict, Optional
 import json
 
+from forecast_export import load_forecast_export
+from forecast_archive import latest_export_path
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -45,7 +48,13 @@ class ForecastEmailService:
         
         # Forecast file paths - use v3 directory
         self.data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data_output', 'intraday')
-        # Find the latest forecast files
+        # Find the latest forecast files through the forecast archive index
+        self.forecast_15min = latest_export_path(self.data_dir, 'cm_forecast', '15min')
+        self.forecast_1h = latest_export_path(self.data_dir, 'cm_forecast', '1hour')
+        if self.forecast_15min and self.forecast_1h:
+            return
+        
+        # Nothing archived yet: list the directory
         import glob
         forecast_15min_files = glob.glob(os.path.join(self.data_dir, 'cm_forecast_intraday_15min_*.csv'))
         forecast_1h_files = glob.glob(os.path.join(self.data_dir, 'cm_forecast_intraday_1hour_*.csv'))
@@ -87,9 +96,9 @@ class ForecastEmailService:
         
         logger.info(f"Creating Excel report: {output_path}")
         
-        # Load CSV files - timestamp is the last column
-        df_15min = pd.read_csv(self.forecast_15min)
-        df_1h = pd.read_csv(self.forecast_1h)
+        # Load exports (Parquet siblings when present) - timestamp is the last column
+        df_15min = load_forecast_export(self.forecast_15min)
+        df_1h = load_forecast_export(self.forecast_1h)
         
         # Set timestamp as index and parse dates
         if 'timestamp' in df_15min.columns:
@@ -118,6 +127,10 @@ class ForecastEmailService:
             df_15min.index = df_15min.index.tz_localize(None)
         if hasattr(df_1h.index, 'tz_localize'):
             df_1h.index = df_1h.index.tz_localize(None)
+        # Typed exports keep time zones on datetime columns (e.g. forecast_timestamp in UTC)
+        for df in (df_15min, df_1h):
+            for col in df.select_dtypes(include=['datetimetz']).columns:
+                df[col] = df[col].dt.tz_localize(None)
         
         # Create Excel writer
         with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
@@ -255,8 +268,8 @@ class ForecastEmailService:
     def generate_email_body(self) -> str:
         """Generate HTML email body with forecast summary"""
         # Load latest data for summary
-        df_15min = pd.read_csv(self.forecast_15min)
-        df_1h = pd.read_csv(self.forecast_1h)
+        df_15min = load_forecast_export(self.forecast_15min)
+        df_1h = load_forecast_export(self.forecast_1h)
         
         # Set timestamp as index and parse dates
         if 'timestamp' in df_15min.columns:
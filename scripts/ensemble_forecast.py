@@ -0,0 +1,123 @@
+"""
+Vectorized Monte Carlo ensemble for probabilistic intraday forecasts
+Draws members x time scenarios and reduces them to empirical quantiles
+
+Each member scales the irradiance inputs by a horizon-dependent error (one
+standard normal level per member) and adds independent cloud-induced
+fluctuations per interval. All members of a time chunk go through the fused
+physics chain (pv_kernels.irradiance_to_ac and apply_cloud_dynamics) as one
+(members, time) array, so memory is bounded by ENSEMBLE_CHUNK_ELEMENTS
+regardless of the number of members or the horizon length.
+
+Noise is keyed by horizon position (independently seeded blocks of
+ENSEMBLE_NOISE_BLOCK intervals), so results do not depend on the chunk size and
+rows gathered from the horizon (incremental updates) reproduce a full run.
+"""
+import logging
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+
+from config import ENSEMBLE_CHUNK_ELEMENTS, ACCUMULATION_DTYPE
+from pv_kernels import irradiance_to_ac, apply_cloud_dynamics
+
+logger = logging.getLogger(__name__)
+
+# Intervals per independently seeded noise block (one day at 15-minute resolution)
+ENSEMBLE_NOISE_BLOCK = 96
+
+
+def member_levels(seed: int, members: int) -> np.ndarray:
+    """Standard normal irradiance error level per member, shape (members, 1)"""
+    return np.random.default_rng([seed, 0]).standard_normal((members, 1))
+
+
+def interval_noise(seed: int, members: int, positions: np.ndarray) -> np.ndarray:
+    """
+    Standard normal noise for the given horizon positions, shape (members, len(positions))
+
+    The value for (member, position) only depends on the seed, so any subset of
+    positions gets the same numbers as the full horizon.
+    """
+    first_block = positions[0] // ENSEMBLE_NOISE_BLOCK
+    last_block = positions[-1] // ENSEMBLE_NOISE_BLOCK
+    blocks = np.concatenate([
+        np.random.default_rng([seed, 1, block]).standard_normal((members, ENSEMBLE_NOISE_BLOCK))
+        for block in range(first_block, last_block + 1)
+    ], axis=1)
+    return blocks[:, positions - first_block * ENSEMBLE_NOISE_BLOCK]
+
+
+def ensemble_quantiles(elevation: np.ndarray, azimuth: np.ndarray, ghi: np.ndarray,
+                       relative_uncertainty: np.ndarray, quantiles: Sequence[float],
+                       dni: Optional[np.ndarray] = None, dhi: Optional[np.ndarray] = None,
+                       temperature: Optional[np.ndarray] = None,
+                       wind_speed: Optional[np.ndarray] = None,
+                       cloud_cover: Optional[np.ndarray] = None,
+                       positions: Optional[np.ndarray] = None,
+                       members: int = 500, seed: int = 42, smoothing_window: int = 4,
+                       chunk_elements: int = ENSEMBLE_CHUNK_ELEMENTS,
+                       system: Optional[Dict] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simulate the ensemble and reduce it to its mean and empirical quantiles
+
+    Args:
+        elevation, azimuth: Solar position in degrees, shape (T,)
+        ghi, dni, dhi: Irradiance in W/m² without missing values (dni/dhi None when not measured)
+        relative_uncertainty: Standard deviation of the irradiance error per interval, shape (T,)
+        quantiles: Quantile levels to return
+        temperature, wind_speed, cloud_cover: Optional weather arrays, shape (T,)
+        positions: Horizon position of each row (defaults to 0..T-1)
+        members: Number of ensemble members
+        seed: Seed of the local random generators
+        smoothing_window: Rolling window in intervals (as apply_cloud_dynamics)
+        chunk_elements: Maximum members x time elements simulated at once
+        system: Keyword arguments for irradiance_to_ac (tilt, capacities, ...)
+
+    Returns:
+        Tuple of ensemble mean AC power (T,) and quantiles (T, Q), both in MW
+    """
+    system = system or {}
+    n_times = len(ghi)
+    if positions is None:
+        positions = np.arange(n_times)
+    dtype = np.result_type(np.asarray(ghi).dtype, np.float32)
+
+    levels = member_levels(seed, members).astype(dtype)
+    mean = np.empty(n_times, dtype=ACCUMULATION_DTYPE)
+    bands = np.empty((n_times, len(quantiles)), dtype=dtype)
+
+    # Time chunks carry a halo so the centered smoothing sees the same neighbours as a full run
+    halo = smoothing_window
+    chunk_times = max(chunk_elements // members - 2 * halo, 1)
+
+    for start in range(0, n_times, chunk_times):
+        end = min(start + chunk_times, n_times)
+        lo, hi = max(start - halo, 0), min(end + halo, n_times)
+        rows = slice(lo, hi)
+
+        def take(values: Optional[np.ndarray]) -> Optional[np.ndarray]:
+            return None if values is None else values[rows]
+
+        # Irradiance error: one level per member, scaled by the horizon-dependent uncertainty
+        factor = np.maximum(1 + relative_uncertainty[rows] * levels, 0).astype(dtype, copy=False)
+        scaled = {name: None if values is None else values[rows] * factor
+                  for name, values in (('ghi', ghi), ('dni', dni), ('dhi', dhi))}
+
+        ac_power = irradiance_to_ac(
+            elevation=elevation[rows], azimuth=azimuth[rows],
+            ghi=scaled['ghi'], dni=scaled['dni'], dhi=scaled['dhi'],
+            temperature=take(temperature), wind_speed=take(wind_speed),
+            cloud_cover=take(cloud_cover), **system
+        )
+
+        if cloud_cover is not None:
+            noise = interval_noise(seed, members, positions[rows]) * ((cloud_cover[rows] / 100) * 0.3)
+            ac_power = apply_cloud_dynamics(ac_power, cloud_cover[rows], noise.astype(dtype),
+                                            system.get('ac_capacity_mw', 1.0), smoothing_window)
+
+        core = ac_power[:, start - lo:end - lo]
+        mean[start:end] = core.mean(axis=0, dtype=ACCUMULATION_DTYPE)
+        bands[start:end] = np.quantile(core, quantiles, axis=0).T
+
+    logger.debug(f"Simulated {members} ensemble members over {n_times} intervals")
+    return mean, bands
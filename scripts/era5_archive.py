@@ -0,0 +1,228 @@
+"""
+Bulk ERA5 historical weather archive
+Downloads multi-year hourly ERA5 reanalysis from the Open-Meteo archive endpoint
+(WEATHER_SOURCES 'open_meteo_era5') into a local Parquet dataset
+
+Layout: ERA5_ARCHIVE_DIR/site=<location_key>/year=<YYYY>/month=<MM>.parquet
+(hive-style partitions by site and year). Each month is one request; month files
+are written atomically, so an interrupted download resumes from the missing
+months on the next run. Months that ERA5 has not fully published yet (about five
+days of lag) are skipped until they are complete.
+
+Backtests and calibration read the store with load_era5_weather, which
+memory-maps the Parquet files instead of calling the API at training time.
+"""
+import os
+import logging
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+import pytz
+
+# Try importing pyarrow for the Parquet dataset
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logging.warning("pyarrow library not found, ERA5 archive unavailable. Install with: pip install pyarrow")
+
+from config import LOCATIONS, WEATHER_SOURCES, ERA5_ARCHIVE_DIR, ERA5_DOWNLOAD_CONCURRENCY
+from http_client import get_http_client
+from dtype_policy import compute_dtype
+
+logger = logging.getLogger(__name__)
+
+ERA5_SOURCE = next(source for source in WEATHER_SOURCES if source['name'] == 'open_meteo_era5')
+
+# ERA5 variable -> weather column used throughout the pipeline
+ERA5_COLUMNS = {
+    'temperature_2m': 'temperature',
+    'shortwave_radiation': 'ghi',
+    'direct_normal_irradiance': 'dni',
+    'diffuse_radiation': 'dhi',
+    'windspeed_10m': 'wind_speed',
+    'cloudcover': 'cloud_cover',
+    'relative_humidity_2m': 'humidity'
+}
+
+# Days until ERA5 data for a date is published
+ERA5_AVAILABILITY_LAG_DAYS = 5
+
+
+def _require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow is required for the ERA5 archive. Install with: pip install pyarrow")
+
+
+def month_path(location_key: str, year: int, month: int, archive_dir: str = ERA5_ARCHIVE_DIR) -> str:
+    """Parquet file of one site-month"""
+    return os.path.join(archive_dir, f"site={location_key}", f"year={year}", f"month={month:02d}.parquet")
+
+
+def month_chunks(location_keys: Sequence[str], start_year: int, end_year: int,
+                 today: Optional[date] = None) -> List[Tuple[str, int, int]]:
+    """(location_key, year, month) for every fully published month of the range"""
+    today = today or datetime.now(pytz.UTC).date()
+    last_available = today - timedelta(days=ERA5_AVAILABILITY_LAG_DAYS)
+    chunks = []
+    for location_key in location_keys:
+        for year in range(start_year, end_year + 1):
+            for month in range(1, 13):
+                month_end = (pd.Timestamp(year=year, month=month, day=1) + pd.offsets.MonthEnd(0)).date()
+                if month_end <= last_available:
+                    chunks.append((location_key, year, month))
+    return chunks
+
+
+def fetch_era5_month(location: Dict, year: int, month: int) -> pd.DataFrame:
+    """
+    Download one month of hourly ERA5 data for a site
+
+    Returns:
+        DataFrame indexed by UTC timestamp with the weather columns in the compute dtype
+    """
+    first_day = date(year, month, 1)
+    last_day = (pd.Timestamp(first_day) + pd.offsets.MonthEnd(0)).date()
+    params = {
+        'latitude': location['latitude'],
+        'longitude': location['longitude'],
+        'start_date': first_day.isoformat(),
+        'end_date': last_day.isoformat(),
+        'hourly': ','.join(ERA5_SOURCE['variables']),
+        'timezone': 'UTC'
+    }
+    data = get_http_client().get_json(ERA5_SOURCE['api_url'], params=params, timeout=60)
+    hourly = data['hourly']
+
+    index = pd.DatetimeIndex(pd.to_datetime(hourly['time'], utc=True), name='timestamp')
+    nan_column = [np.nan] * len(index)
+    return pd.DataFrame({
+        column: np.array(hourly.get(variable) or nan_column, dtype=float).astype(compute_dtype())
+        for variable, column in ERA5_COLUMNS.items()
+    }, index=index)
+
+
+def _write_month(weather_df: pd.DataFrame, path: str):
+    """Write a month file atomically (a partial file never looks like a finished month)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    pq.write_table(pa.Table.from_pandas(weather_df), tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+
+
+def download_era5_archive(location_keys: Optional[Sequence[str]] = None,
+                          start_year: int = 2020, end_year: Optional[int] = None,
+                          archive_dir: str = ERA5_ARCHIVE_DIR,
+                          max_workers: int = ERA5_DOWNLOAD_CONCURRENCY) -> Dict[str, int]:
+    """
+    Download ERA5 history for many sites in concurrent month chunks, resuming where a previous run stopped
+
+    Args:
+        location_keys: Sites to download (default: all LOCATIONS)
+        start_year, end_year: Inclusive year range (end defaults to the current year)
+        archive_dir: Root of the Parquet dataset
+        max_workers: Month chunks downloaded in parallel (requests share the HTTP client's rate limit)
+
+    Returns:
+        Counts of 'downloaded', 'skipped' (already present) and 'failed' month chunks
+    """
+    _require_pyarrow()
+    location_keys = list(location_keys) if location_keys else list(LOCATIONS.keys())
+    end_year = end_year or datetime.now(pytz.UTC).year
+
+    chunks = month_chunks(location_keys, start_year, end_year)
+    pending = [chunk for chunk in chunks if not os.path.exists(month_path(*chunk, archive_dir))]
+    summary = {'downloaded': 0, 'skipped': len(chunks) - len(pending), 'failed': 0}
+    logger.info(f"ERA5 archive: {len(pending)} of {len(chunks)} site-months to download "
+                f"({len(location_keys)} sites, {start_year}-{end_year})")
+
+    def download(chunk: Tuple[str, int, int]):
+        location_key, year, month = chunk
+        weather_df = fetch_era5_month(LOCATIONS[location_key], year, month)
+        _write_month(weather_df, month_path(location_key, year, month, archive_dir))
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='era5') as executor:
+        futures = {executor.submit(download, chunk): chunk for chunk in pending}
+        for future in as_completed(futures):
+            location_key, year, month = futures[future]
+            try:
+                future.result()
+                summary['downloaded'] += 1
+                logger.debug(f"ERA5 {location_key} {year}-{month:02d} stored")
+            except Exception as e:
+                summary['failed'] += 1
+                logger.warning(f"ERA5 download failed for {location_key} {year}-{month:02d}: {e}")
+
+    logger.info(f"ERA5 archive: {summary['downloaded']} downloaded, {summary['skipped']} already present, "
+                f"{summary['failed']} failed")
+    return summary
+
+
+def _utc_timestamp(value: Optional[datetime]) -> Optional[pd.Timestamp]:
+    """UTC Timestamp (naive values are treated as UTC), None passes through"""
+    if value is None:
+        return None
+    value = pd.Timestamp(value)
+    return value.tz_localize('UTC') if value.tz is None else value.tz_convert('UTC')
+
+
+def load_era5_weather(location_key: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      columns: Optional[Sequence[str]] = None,
+                      archive_dir: str = ERA5_ARCHIVE_DIR) -> pd.DataFrame:
+    """
+    Read archived hourly ERA5 weather for a site (memory-mapped Parquet)
+
+    Args:
+        location_key: Site key
+        start, end: Optional UTC bounds (inclusive start, exclusive end)
+        columns: Weather columns to read (default: all)
+        archive_dir: Root of the Parquet dataset
+
+    Returns:
+        DataFrame indexed by UTC timestamp; empty when nothing is archived for the range
+    """
+    _require_pyarrow()
+    site_dir = os.path.join(archive_dir, f"site={location_key}")
+    start, end = _utc_timestamp(start), _utc_timestamp(end)
+
+    paths = []
+    if os.path.isdir(site_dir):
+        for year_dir in sorted(os.listdir(site_dir)):
+            year = int(year_dir.split('=')[1])
+            if (start is not None and year < start.year) or (end is not None and year > end.year):
+                continue
+            year_path = os.path.join(site_dir, year_dir)
+            paths.extend(os.path.join(year_path, name) for name in sorted(os.listdir(year_path))
+                         if name.endswith('.parquet'))
+
+    read_columns = list(columns) + ['timestamp'] if columns is not None else None
+    tables = [pq.read_table(path, columns=read_columns, memory_map=True) for path in paths]
+    if not tables:
+        return pd.DataFrame(columns=list(columns or ERA5_COLUMNS.values()),
+                            index=pd.DatetimeIndex([], tz='UTC', name='timestamp'))
+
+    weather_df = pa.concat_tables(tables).to_pandas()
+    if start is not None:
+        weather_df = weather_df[weather_df.index >= start]
+    if end is not None:
+        weather_df = weather_df[weather_df.index < end]
+    return weather_df
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Download ERA5 history for the configured sites')
+    parser.add_argument('--sites', nargs='+', default=None, help='Location keys (default: all)')
+    parser.add_argument('--start-year', type=int, default=2020)
+    parser.add_argument('--end-year', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=ERA5_DOWNLOAD_CONCURRENCY)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    result = download_era5_archive(args.sites, args.start_year, args.end_year, max_workers=args.workers)
+    print(f"✓ {result['downloaded']} downloaded, {result['skipped']} skipped, {result['failed']} failed")
@@ -12,6 +12,9 @@ from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.utils.dataframe import dataframe_to_rows
 import sys
 
+from forecast_export import load_forecast_export
+from forecast_archive import latest_export_path
+
 def export_forecast_to_excel(output_path=None):
     """
     Export the latest intraday forecast CSV files to Excel
@@ -23,33 +26,41 @@ def export_forecast_to_excel(output_path=None):
         # Set data directory
         data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data_output', 'intraday')
         
-        # Find latest CSV files
-        csv_files = [f for f in os.listdir(data_dir) if f.endswith('.csv') and 'cm_forecast_intraday' in f]
-        
-        # Separate 15min and 1hour files
-        files_15min = [f for f in csv_files if '15min' in f]
-        files_1hour = [f for f in csv_files if '1hour' in f]
-        
-        if not files_15min or not files_1hour:
-            print("Error: Could not find forecast CSV files")
-            print(f"Looking in directory: {data_dir}")
-            print(f"Found {len(files_15min)} 15-minute files and {len(files_1hour)} hourly files")
-            return None
-        
-        # Sort by modification time to get the truly latest files
-        files_15min.sort(key=lambda x: os.path.getmtime(os.path.join(data_dir, x)))
-        files_1hour.sort(key=lambda x: os.path.getmtime(os.path.join(data_dir, x)))
+        # Find latest CSV files through the forecast archive index
+        latest_15min_path = latest_export_path(data_dir, 'cm_forecast', '15min')
+        latest_1hour_path = latest_export_path(data_dir, 'cm_forecast', '1hour')
         
-        # Use latest files
-        latest_15min = files_15min[-1]
-        latest_1hour = files_1hour[-1]
+        if latest_15min_path and latest_1hour_path:
+            latest_15min = os.path.basename(latest_15min_path)
+            latest_1hour = os.path.basename(latest_1hour_path)
+        else:
+            # Nothing archived yet: list the directory
+            csv_files = [f for f in os.listdir(data_dir) if f.endswith('.csv') and 'cm_forecast_intraday' in f]
+            
+            # Separate 15min and 1hour files
+            files_15min = [f for f in csv_files if '15min' in f]
+            files_1hour = [f for f in csv_files if '1hour' in f]
+            
+            if not files_15min or not files_1hour:
+                print("Error: Could not find forecast CSV files")
+                print(f"Looking in directory: {data_dir}")
+                print(f"Found {len(files_15min)} 15-minute files and {len(files_1hour)} hourly files")
+                return None
+            
+            # Sort by modification time to get the truly latest files
+            files_15min.sort(key=lambda x: os.path.getmtime(os.path.join(data_dir, x)))
+            files_1hour.sort(key=lambda x: os.path.getmtime(os.path.join(data_dir, x)))
+            
+            # Use latest files
+            latest_15min = files_15min[-1]
+            latest_1hour = files_1hour[-1]
         
         print(f"Loading 15-minute data: {latest_15min}")
         print(f"Loading hourly data: {latest_1hour}")
         
-        # Read CSV files (skip comment lines starting with #)
-        df_15min = pd.read_csv(os.path.join(data_dir, latest_15min), comment='#')
-        df_1hour = pd.read_csv(os.path.join(data_dir, latest_1hour), comment='#')
+        # Read exports (typed Parquet siblings when present, CSV otherwise)
+        df_15min = load_forecast_export(os.path.join(data_dir, latest_15min))
+        df_1hour = load_forecast_export(os.path.join(data_dir, latest_1hour))
 
         # Convert MWh to kWh (multiply by 1000)
         energy_columns = ['energy_mwh', 'energy_q10_mwh', 'energy_q25_mwh', 'energy_q50_mwh', 'energy_q75_mwh', 'energy_q90_mwh']
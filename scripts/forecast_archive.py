@@ -0,0 +1,181 @@
+"""
+Append-only forecast archive indexed by issue time
+Keeps every forecast run in a compressed store instead of a growing pile of CSVs
+
+Layout: FORECAST_ARCHIVE_DIR/site=<location_key>/month=<YYYY-MM>/<issue>_<resolution>.parquet
+(issue = UTC issue time as YYYYmmddTHHMMSSZ), written with the typed export
+schema of forecast_export (time zone, units and run metadata in the file).
+
+Each site has an issue-time index, issues.bin: one little-endian int64 (Unix
+seconds) per run, appended after the run's files are in place, so the index
+never points at missing data. The index is memory-mapped; latest() reads the
+last entry (O(1)) and as_of() binary-searches it (O(log n)), independent of how
+many runs are kept. Issue times must increase; re-archiving the latest issue
+time replaces its files.
+"""
+import os
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+import pytz
+
+from config import FORECAST_ARCHIVE_DIR
+from forecast_export import (
+    PYARROW_AVAILABLE, EXPORT_TIMESTAMP_FORMAT, export_csv_name, read_forecast_parquet, write_forecast_parquet
+)
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = 'issues.bin'
+INDEX_DTYPE = np.dtype('<i8')
+ISSUE_FORMAT = '%Y%m%dT%H%M%SZ'
+
+
+def _issue_seconds(issue_time: datetime) -> int:
+    """Unix seconds of an issue time (naive values are treated as UTC)"""
+    issue_time = pd.Timestamp(issue_time)
+    if issue_time.tz is None:
+        issue_time = issue_time.tz_localize('UTC')
+    return int(issue_time.timestamp())
+
+
+def _issue_datetime(seconds: int) -> datetime:
+    return datetime.fromtimestamp(int(seconds), pytz.UTC)
+
+
+class ForecastArchive:
+    """Append-only per-site store of forecast runs with an issue-time index"""
+
+    def __init__(self, location_key: str, root: str = FORECAST_ARCHIVE_DIR):
+        self.location_key = location_key
+        self.site_dir = os.path.join(root, f"site={location_key}")
+        self.index_path = os.path.join(self.site_dir, INDEX_FILENAME)
+
+    def run_path(self, issue_time: datetime, resolution: str) -> str:
+        """File of one resolution of the run issued at issue_time"""
+        issued = _issue_datetime(_issue_seconds(issue_time))
+        return os.path.join(self.site_dir, f"month={issued:%Y-%m}",
+                            f"{issued.strftime(ISSUE_FORMAT)}_{resolution}.parquet")
+
+    def issue_times(self) -> np.ndarray:
+        """Issue times of all archived runs in Unix seconds, increasing (memory-mapped)"""
+        if not os.path.exists(self.index_path):
+            return np.empty(0, dtype=INDEX_DTYPE)
+        # A torn trailing record (interrupted append) is ignored
+        entries = os.path.getsize(self.index_path) // INDEX_DTYPE.itemsize
+        if entries == 0:
+            return np.empty(0, dtype=INDEX_DTYPE)
+        return np.memmap(self.index_path, dtype=INDEX_DTYPE, mode='r', shape=(entries,))
+
+    def __len__(self) -> int:
+        return len(self.issue_times())
+
+    def append(self, issue_time: datetime, frames: Dict[str, pd.DataFrame],
+               metadata: Optional[Dict] = None) -> Dict[str, str]:
+        """
+        Archive one forecast run
+
+        Args:
+            issue_time: Issue time of the run (UTC)
+            frames: Export frame per resolution
+            metadata: Run metadata stored with every file
+
+        Returns:
+            Archived file per resolution
+
+        Raises:
+            ValueError: When issue_time is older than the latest archived run
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for the forecast archive. Install with: pip install pyarrow")
+
+        seconds = _issue_seconds(issue_time)
+        issues = self.issue_times()
+        latest = int(issues[-1]) if len(issues) else None
+        del issues
+        if latest is not None and seconds < latest:
+            raise ValueError(f"Forecast archive is append-only: issue time {_issue_datetime(seconds)} "
+                             f"is older than the latest run {_issue_datetime(latest)}")
+
+        paths = {}
+        for resolution, frame in frames.items():
+            path = self.run_path(issue_time, resolution)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            paths[resolution] = write_forecast_parquet(frame, path, {
+                **(metadata or {}),
+                'location': self.location_key,
+                'resolution': resolution,
+                'issue_time': _issue_datetime(seconds).isoformat()
+            })
+
+        if seconds != latest:
+            with open(self.index_path, 'ab') as f:
+                f.write(np.array([seconds], dtype=INDEX_DTYPE).tobytes())
+
+        logger.debug(f"Archived {self.location_key} run {_issue_datetime(seconds)} ({', '.join(frames)})")
+        return paths
+
+    def latest_issue_time(self) -> Optional[datetime]:
+        """Issue time of the latest run (O(1))"""
+        issues = self.issue_times()
+        return _issue_datetime(issues[-1]) if len(issues) else None
+
+    def issue_time_as_of(self, issue_time: datetime) -> Optional[datetime]:
+        """Issue time of the latest run issued at or before issue_time (O(log n))"""
+        issues = self.issue_times()
+        position = np.searchsorted(issues, _issue_seconds(issue_time), side='right') - 1
+        return _issue_datetime(issues[position]) if position >= 0 else None
+
+    def load(self, issue_time: datetime, resolution: str) -> Optional[Tuple[pd.DataFrame, Dict]]:
+        """Export frame and metadata of one archived run (None when the resolution was not archived)"""
+        path = self.run_path(issue_time, resolution)
+        if not os.path.exists(path):
+            return None
+        return read_forecast_parquet(path)
+
+    def latest(self, resolution: str) -> Optional[Tuple[pd.DataFrame, Dict]]:
+        """Export frame and metadata of the latest run"""
+        issued = self.latest_issue_time()
+        return self.load(issued, resolution) if issued is not None else None
+
+    def as_of(self, issue_time: datetime, resolution: str) -> Optional[Tuple[pd.DataFrame, Dict]]:
+        """Export frame and metadata of the forecast that was current at issue_time"""
+        issued = self.issue_time_as_of(issue_time)
+        return self.load(issued, resolution) if issued is not None else None
+
+
+def latest_export_path(output_dir: str, location_key: str, resolution: str,
+                       root: str = FORECAST_ARCHIVE_DIR) -> Optional[str]:
+    """
+    CSV export of the latest archived run, located through the issue-time index
+
+    Returns:
+        Path of the CSV export, or None when nothing is archived or the export was pruned
+    """
+    issued = ForecastArchive(location_key, root).latest_issue_time()
+    if issued is None:
+        return None
+    path = os.path.join(output_dir, export_csv_name(location_key, resolution, issued.strftime(EXPORT_TIMESTAMP_FORMAT)))
+    return path if os.path.exists(path) else None
+
+
+def prune_exports(output_dir: str, location_key: str, resolution: str, keep: int) -> int:
+    """
+    Remove all but the newest `keep` timestamped exports (CSV and Parquet) of a resolution
+
+    Returns:
+        Number of files removed
+    """
+    prefix = export_csv_name(location_key, resolution, '')[:-len('.csv')]
+    runs = sorted({os.path.splitext(name)[0] for name in os.listdir(output_dir)
+                   if name.startswith(prefix) and name.endswith(('.csv', '.parquet'))})
+    removed = 0
+    for stem in runs[:-keep] if keep > 0 else runs:
+        for extension in ('.csv', '.parquet'):
+            path = os.path.join(output_dir, stem + extension)
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+    return removed
@@ -0,0 +1,139 @@
+"""
+Typed columnar forecast exports
+Parquet siblings of the forecast CSV exports for downstream readers
+
+Every <name>.csv written by IntradayDataAggregator.create_csv_exports gets a
+<name>.parquet with the same columns, but typed: timestamps are datetime
+columns (wall-clock time in OUTPUT_TIMEZONE, like the CSV text) and values
+keep their float/int types. The time zone, the unit of every column and the
+run metadata (location, resolution, generation time) are stored in the
+Parquet schema. Readers call load_forecast_export with the CSV path; the
+Parquet sibling is memory-mapped when present, and the CSV is parsed only
+as a fallback.
+"""
+import os
+import json
+import logging
+import pandas as pd
+from typing import Dict, Optional, Sequence, Tuple
+
+# Try importing pyarrow for the Parquet exports
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logging.warning("pyarrow library not found, forecast exports limited to CSV. Install with: pip install pyarrow")
+
+from config import OUTPUT_TIMEZONE, OUTPUT_TIMEZONE_NAME, OUTPUT_TIMEZONE_NOTICE
+
+logger = logging.getLogger(__name__)
+
+# Run timestamp in export file names (UTC)
+EXPORT_TIMESTAMP_FORMAT = '%Y%m%d_%H%M%S'
+
+# Schema metadata key of the forecast run metadata
+FORECAST_METADATA_KEY = b'solar_forecast'
+
+# Column -> unit stored as field metadata
+COLUMN_UNITS = {
+    'power_kw': 'kW',
+    'production_kw': 'kW',
+    'q10': 'kW',
+    'q25': 'kW',
+    'q50': 'kW',
+    'q75': 'kW',
+    'q90': 'kW',
+    'energy_kwh': 'kWh',
+    'energy_q10_kwh': 'kWh',
+    'energy_q25_kwh': 'kWh',
+    'energy_q50_kwh': 'kWh',
+    'energy_q75_kwh': 'kWh',
+    'energy_q90_kwh': 'kWh',
+    'resolution_minutes': 'min'
+}
+
+
+def export_csv_name(location_key: str, resolution: str, run_timestamp: str) -> str:
+    """File name of a CSV export (run_timestamp formatted with EXPORT_TIMESTAMP_FORMAT)"""
+    return f"{location_key}_intraday_{resolution}_{run_timestamp}.csv"
+
+
+def parquet_path(csv_path: str) -> str:
+    """Parquet sibling of a CSV export"""
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+
+def write_forecast_parquet(export_df: pd.DataFrame, path: str, metadata: Dict) -> str:
+    """
+    Write an export frame as Parquet with units and run metadata in the schema (atomic write)
+
+    Args:
+        export_df: Export frame as written to CSV, with typed timestamp columns
+        path: Output file
+        metadata: Run metadata (location, resolution, ...); timezone information is added
+
+    Returns:
+        Path of the written file
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow is required for Parquet exports. Install with: pip install pyarrow")
+
+    table = pa.Table.from_pandas(export_df, preserve_index=False)
+    fields = [field.with_metadata({'unit': COLUMN_UNITS[field.name]}) if field.name in COLUMN_UNITS else field
+              for field in table.schema]
+    run_metadata = {
+        **metadata,
+        'timezone': OUTPUT_TIMEZONE,
+        'timezone_name': OUTPUT_TIMEZONE_NAME,
+        'timezone_notice': OUTPUT_TIMEZONE_NOTICE,
+        'units': {field.name: COLUMN_UNITS[field.name] for field in table.schema if field.name in COLUMN_UNITS}
+    }
+    schema = pa.schema(fields, metadata={
+        **(table.schema.metadata or {}),
+        FORECAST_METADATA_KEY: json.dumps(run_metadata, default=str).encode('utf-8')
+    })
+    table = table.cast(schema)
+
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_forecast_parquet(path: str, columns: Optional[Sequence[str]] = None) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Read a Parquet export (memory-mapped)
+
+    Returns:
+        Export frame and the run metadata stored with it
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow is required for Parquet exports. Install with: pip install pyarrow")
+
+    table = pq.read_table(path, columns=list(columns) if columns is not None else None, memory_map=True)
+    raw_metadata = (table.schema.metadata or {}).get(FORECAST_METADATA_KEY)
+    metadata = json.loads(raw_metadata) if raw_metadata else {}
+    return table.to_pandas(), metadata
+
+
+def load_forecast_export(csv_path: str) -> pd.DataFrame:
+    """
+    Load a forecast export, preferring its Parquet sibling over parsing the CSV
+
+    Args:
+        csv_path: Path of the CSV export
+
+    Returns:
+        Export frame; timestamps are already parsed when read from Parquet
+    """
+    columnar_path = parquet_path(csv_path)
+    if PYARROW_AVAILABLE and os.path.exists(columnar_path):
+        try:
+            export_df, _ = read_forecast_parquet(columnar_path)
+            logger.debug(f"Loaded {columnar_path}")
+            return export_df
+        except Exception as e:
+            logger.warning(f"Could not read {columnar_path}, falling back to CSV: {e}")
+    return pd.read_csv(csv_path, comment='#')
@@ -0,0 +1,55 @@
+"""
+Columnar post-processing for probabilistic forecast quantiles
+Shared by the intraday physics model and the Smart Persistence Model
+"""
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Sequence
+
+from config import QUANTILES
+
+
+def quantile_columns(quantiles: Sequence[float] = QUANTILES) -> List[str]:
+    """Column names for quantile levels, e.g. 0.1 -> 'q10'"""
+    return [f"q{int(round(q * 100))}" for q in quantiles]
+
+
+def sort_quantiles(values: np.ndarray, lower: float = 0.0,
+                   upper: Optional[float] = None) -> np.ndarray:
+    """
+    Clip quantile values to physical limits and remove quantile crossing
+
+    Args:
+        values: Array of shape (..., n_quantiles) ordered from lowest to highest level
+        lower: Lower physical limit (e.g. zero production)
+        upper: Upper physical limit (e.g. AC capacity), None for no upper limit
+
+    Returns:
+        New array with each row clipped and sorted ascending along the last axis,
+        keeping the floating dtype of values
+    """
+    values = np.asarray(values)
+    if not np.issubdtype(values.dtype, np.floating):
+        values = values.astype(float)
+    clipped = np.clip(values, lower, upper).astype(values.dtype, copy=False)
+    return np.sort(clipped, axis=-1)
+
+
+def order_quantile_columns(df: pd.DataFrame, columns: Optional[List[str]] = None,
+                           lower: float = 0.0, upper: Optional[float] = None) -> pd.DataFrame:
+    """
+    Apply sort_quantiles to the quantile columns of a forecast DataFrame in place
+
+    Args:
+        df: Forecast DataFrame
+        columns: Quantile columns ordered from lowest to highest level (defaults to config QUANTILES)
+        lower: Lower physical limit
+        upper: Upper physical limit
+
+    Returns:
+        The same DataFrame, for chaining
+    """
+    if columns is None:
+        columns = quantile_columns()
+    df[columns] = sort_quantiles(df[columns].to_numpy(), lower=lower, upper=upper)
+    return df
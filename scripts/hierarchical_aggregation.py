@@ -0,0 +1,215 @@
+"""
+Hierarchical multi-resolution aggregation
+Aggregates a 15-minute forecast to every requested resolution in one pass
+
+The forecast is laid onto a regular grid of base intervals anchored at local
+midnight of its first day (the origin DataFrame.resample uses) as per-column
+sums and non-NaN counts. Every level is then reduced from the coarsest level
+already computed whose bins nest inside its own: fixed-width levels (multiples
+of the base step shorter than a day) by reshaping the parent arrays to
+(bins, ratio, columns) and summing, calendar-day levels (23 or 25 hours long
+across DST changes) with np.add.reduceat at the local midnights. Means are
+sums over counts, so coarse levels built from fine ones are exact and match
+resample(...).agg(...) bin for bin.
+
+Resolutions are named '<n>min', '<n>hour' or '<n>day'; any multiple of the
+base step is supported.
+"""
+import re
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence
+
+from config import INTRADAY_RESOLUTION_MINUTES
+from dtype_policy import accumulation_dtype
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 1440
+
+RESOLUTION_UNITS = {'min': 1, 'hour': 60, 'day': MINUTES_PER_DAY}
+_RESOLUTION_PATTERN = re.compile(r'^(\d+)(min|hour|day)$')
+
+# Aggregation methods understood by aggregate_levels
+REDUCED_METHODS = ('mean', 'sum')
+FIRST_METHOD = 'first'
+
+
+def resolution_minutes(resolution: str) -> int:
+    """Length of a resolution such as '15min', '3hour' or '1day' in minutes"""
+    match = _RESOLUTION_PATTERN.match(resolution)
+    if match is None or int(match.group(1)) == 0:
+        raise ValueError(f"Unsupported resolution: {resolution}")
+    return int(match.group(1)) * RESOLUTION_UNITS[match.group(2)]
+
+
+def resolution_freq(minutes: int) -> str:
+    """pandas frequency of a resolution (whole days are calendar days, like '1D')"""
+    if minutes % MINUTES_PER_DAY == 0:
+        return f"{minutes // MINUTES_PER_DAY}D"
+    if minutes % 60 == 0:
+        return f"{minutes // 60}h"
+    return f"{minutes}min"
+
+
+class _Level:
+    """Per-bin totals of one resolution: bin start slots on the base grid and [sums | counts | rows]"""
+
+    def __init__(self, minutes: int, labels: pd.DatetimeIndex, starts: np.ndarray, totals: np.ndarray):
+        self.minutes = minutes
+        self.labels = labels
+        self.starts = starts
+        self.totals = totals
+
+    @property
+    def calendar(self) -> bool:
+        return self.minutes % MINUTES_PER_DAY == 0
+
+
+def _calendar_starts(origin: pd.Timestamp, last: pd.Timestamp, days: int,
+                     step: np.timedelta64) -> Optional[pd.DatetimeIndex]:
+    """Local midnights every `days` days from origin to last (None when they are not on the base grid)"""
+    if origin.tz is None:
+        labels = pd.date_range(origin, last.normalize(), freq=f"{days}D")
+    else:
+        local = pd.date_range(origin.tz_localize(None), last.tz_localize(None).normalize(), freq=f"{days}D")
+        try:
+            labels = local.tz_localize(origin.tz)
+        except (ValueError, TypeError):
+            # Midnight skipped or repeated by a DST change in this time zone
+            return None
+    offsets = (labels - origin).to_numpy()
+    if (offsets % step != np.timedelta64(0)).any():
+        return None
+    return labels
+
+
+def _reduce(parent: _Level, minutes: int, starts: np.ndarray) -> np.ndarray:
+    """Totals of the bins starting at `starts` from the totals of a nesting parent level"""
+    if not parent.calendar and minutes % MINUTES_PER_DAY != 0:
+        ratio = minutes // parent.minutes
+        bins = len(starts)
+        padded = parent.totals
+        if bins * ratio != len(padded):
+            padded = np.zeros((bins * ratio, padded.shape[1]), dtype=padded.dtype)
+            padded[:len(parent.totals)] = parent.totals
+        return padded.reshape(bins, ratio, -1).sum(axis=1)
+    return np.add.reduceat(parent.totals, parent.starts.searchsorted(starts), axis=0)
+
+
+def _nesting_parent(levels: List[_Level], minutes: int, starts: np.ndarray) -> _Level:
+    """Coarsest computed level whose bins subdivide the bins starting at `starts`"""
+    for level in sorted(levels, key=lambda level: level.minutes, reverse=True):
+        if level.minutes >= minutes:
+            continue
+        if not level.calendar and minutes % MINUTES_PER_DAY != 0:
+            if minutes % level.minutes == 0:
+                return level
+        elif np.isin(starts, level.starts).all():
+            return level
+    # The base grid nests everything
+    return min(levels, key=lambda level: level.minutes)
+
+
+def aggregate_levels(df: pd.DataFrame, levels: Sequence[int], agg_methods: Dict[str, str],
+                     base_minutes: int = INTRADAY_RESOLUTION_MINUTES) -> Optional[Dict[int, pd.DataFrame]]:
+    """
+    Aggregate a base-resolution frame to several resolutions at once
+
+    Args:
+        df: Frame indexed by timestamps on the base_minutes grid (gaps allowed)
+        levels: Resolutions in minutes, each a multiple of base_minutes
+        agg_methods: Column -> 'mean', 'sum' or 'first' (first non-null value of the bin)
+        base_minutes: Resolution of df in minutes
+
+    Returns:
+        Dictionary of DataFrames keyed by resolution in minutes, with the columns of
+        agg_methods in order, equal to df.resample(resolution_freq(minutes)).agg(agg_methods);
+        None when df is not on a regular base grid (use resample instead)
+    """
+    for minutes in levels:
+        if minutes % base_minutes != 0:
+            raise ValueError(f"Resolution of {minutes} minutes is not a multiple of {base_minutes} minutes")
+
+    index = df.index
+    if (not isinstance(index, pd.DatetimeIndex) or len(index) == 0
+            or not index.is_monotonic_increasing or index.has_duplicates):
+        return None
+
+    step = np.timedelta64(base_minutes, 'm')
+    origin = index[0].normalize()
+    offsets = (index - origin).to_numpy()
+    if (offsets % step != np.timedelta64(0)).any():
+        return None
+    slots = (offsets // step).astype(np.int64)
+    n_slots = int(slots[-1]) + 1
+
+    reduced_columns = [col for col, method in agg_methods.items() if method in REDUCED_METHODS]
+    first_columns = [col for col, method in agg_methods.items() if method == FIRST_METHOD]
+    unknown = set(agg_methods.values()) - set(REDUCED_METHODS) - {FIRST_METHOD}
+    if unknown:
+        raise ValueError(f"Unsupported aggregation methods: {sorted(unknown)}")
+
+    # Base grid totals: [sums | non-NaN counts | rows present]
+    n_columns = len(reduced_columns)
+    values = df[reduced_columns].to_numpy(dtype=accumulation_dtype())
+    present = ~np.isnan(values)
+    totals = np.zeros((n_slots, 2 * n_columns + 1), dtype=accumulation_dtype())
+    totals[slots, :n_columns] = np.where(present, values, 0)
+    totals[slots, n_columns:2 * n_columns] = present
+    totals[slots, -1] = 1
+
+    first_rows = {col: np.flatnonzero(df[col].notna().to_numpy()) for col in first_columns}
+
+    base = _Level(base_minutes, pd.date_range(origin, periods=n_slots, freq=resolution_freq(base_minutes)),
+                  np.arange(n_slots), totals)
+    computed = [base]
+    results = {}
+
+    for minutes in sorted(set(levels)):
+        if minutes == base_minutes:
+            level = base
+        else:
+            if minutes % MINUTES_PER_DAY == 0:
+                labels = _calendar_starts(origin, base.labels[-1], minutes // MINUTES_PER_DAY, step)
+                if labels is None:
+                    return None
+                starts = ((labels - origin).to_numpy() // step).astype(np.int64)
+            else:
+                width = minutes // base_minutes
+                starts = np.arange(0, n_slots, width)
+                labels = pd.date_range(origin, periods=len(starts), freq=resolution_freq(minutes))
+            parent = _nesting_parent(computed, minutes, starts)
+            level = _Level(minutes, labels, starts, _reduce(parent, minutes, starts))
+            computed.append(level)
+        results[minutes] = _level_frame(level, df, slots, reduced_columns, first_rows, agg_methods)
+
+    return results
+
+
+def _level_frame(level: _Level, df: pd.DataFrame, slots: np.ndarray, reduced_columns: List[str],
+                 first_rows: Dict[str, np.ndarray], agg_methods: Dict[str, str]) -> pd.DataFrame:
+    """DataFrame of one level, trimmed to the bins between the first and last row of df"""
+    n_columns = len(reduced_columns)
+    occupied = np.flatnonzero(level.totals[:, -1] > 0)
+    keep = slice(occupied[0], occupied[-1] + 1)
+    labels = level.labels[keep]
+
+    values = level.totals[keep, :n_columns].copy()
+    counts = level.totals[keep, n_columns:2 * n_columns]
+    means = np.array([agg_methods[col] == 'mean' for col in reduced_columns], dtype=bool)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        values[:, means] = np.where(counts[:, means] > 0, values[:, means] / counts[:, means], np.nan)
+    frame = pd.DataFrame(values, index=labels, columns=reduced_columns)
+
+    for col, rows in first_rows.items():
+        # Rows are in time order, so the first non-null row of a bin is where the bin number changes
+        row_bins = level.starts.searchsorted(slots[rows], side='right') - 1
+        first = np.flatnonzero(np.diff(row_bins, prepend=-1))
+        column = df[col].iloc[rows[first]]
+        column.index = level.labels[row_bins[first]]
+        frame[col] = column.reindex(labels)
+
+    frame.index.name = df.index.name
+    return frame[list(agg_methods)]
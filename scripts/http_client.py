@@ -0,0 +1,220 @@
+"""
+Pooled HTTP client for weather API requests
+Shared by the weather fetchers so repeated Open-Meteo calls reuse keep-alive
+connections instead of opening a new TCP/TLS connection per request
+
+Transient failures (connection errors, 429 and 5xx responses) are retried with
+exponential backoff inside the connection adapter. Read timeouts are not
+retried, so a stalled endpoint costs one read timeout per attempt chain and the
+caller's fallback takes over. When HTTP_HEDGE_AFTER_SECONDS is set, a request
+that has not answered within that time gets a second (hedged) copy and
+whichever response arrives first is used, so one slow endpoint does not stall
+the daily job. Hedges run on their own thread pool so they never queue behind
+the requests they hedge. Every request (hedges included) takes a
+token from a rate limiter so concurrent fetches stay within the Open-Meteo
+quota. Latency and payload size of every request are recorded for monitoring.
+With WEATHER_RECORD_DIR set, successful responses are also saved for replay by
+the weather_replay stand-in server.
+"""
+import time
+import threading
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, TimeoutError as FutureTimeout, wait
+from typing import Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import (
+    HTTP_POOL_MAXSIZE, HTTP_RETRY_TOTAL, HTTP_RETRY_BACKOFF_SECONDS,
+    HTTP_CONNECT_TIMEOUT_SECONDS, HTTP_HEDGE_AFTER_SECONDS, HTTP_STATS_HISTORY,
+    OPEN_METEO_RATE_LIMIT_PER_MINUTE, OPEN_METEO_RATE_LIMIT_BURST, WEATHER_RECORD_DIR
+)
+from weather_replay import save_recording
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter (rate tokens per second, bursts up to capacity)"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+class PooledHttpClient:
+    """requests.Session with connection pooling, retries, hedging and request statistics"""
+
+    def __init__(self, pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                 retries: int = HTTP_RETRY_TOTAL,
+                 backoff_seconds: float = HTTP_RETRY_BACKOFF_SECONDS,
+                 hedge_after_seconds: Optional[float] = HTTP_HEDGE_AFTER_SECONDS,
+                 requests_per_minute: Optional[float] = OPEN_METEO_RATE_LIMIT_PER_MINUTE,
+                 burst: int = OPEN_METEO_RATE_LIMIT_BURST,
+                 record_dir: Optional[str] = WEATHER_RECORD_DIR):
+        self.hedge_after_seconds = hedge_after_seconds
+        self.record_dir = record_dir
+        self.rate_limiter = TokenBucket(requests_per_minute / 60, burst) if requests_per_minute else None
+
+        retry = Retry(
+            total=retries,
+            read=0,  # A read timeout is not retried (the hedge covers slow responses)
+            backoff_factor=backoff_seconds,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize,
+                              max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Original and hedged request run concurrently, on separate pools
+        self._executor = ThreadPoolExecutor(max_workers=pool_maxsize,
+                                            thread_name_prefix='http-request')
+        self._hedge_executor = ThreadPoolExecutor(max_workers=pool_maxsize,
+                                                  thread_name_prefix='http-hedge')
+        self._stats = deque(maxlen=HTTP_STATS_HISTORY)
+        self._stats_lock = threading.Lock()
+
+    def get_json(self, url: str, params: Optional[Dict] = None, timeout: float = 30) -> Dict:
+        """
+        GET a JSON document
+
+        Args:
+            url: Request URL
+            params: Query parameters
+            timeout: Read timeout in seconds (read timeouts are not retried; connect timeout is HTTP_CONNECT_TIMEOUT_SECONDS)
+
+        Returns:
+            Parsed JSON response
+
+        Raises:
+            requests.RequestException: When all attempts (and the hedged request) failed
+        """
+        return self.get(url, params, timeout).json()
+
+    def get(self, url: str, params: Optional[Dict] = None, timeout: float = 30) -> requests.Response:
+        """GET with retries, hedged after hedge_after_seconds when configured; raises on HTTP errors"""
+        timeouts = (HTTP_CONNECT_TIMEOUT_SECONDS, timeout)
+        if not self.hedge_after_seconds:
+            return self._get(url, params, timeouts, hedged=False)
+
+        first = self._executor.submit(self._get, url, params, timeouts, False)
+        try:
+            return first.result(timeout=self.hedge_after_seconds)
+        except FutureTimeout:
+            logger.info(f"No response from {url} after {self.hedge_after_seconds}s, sending hedged request")
+
+        second = self._hedge_executor.submit(self._get, url, params, timeouts, True)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except requests.RequestException as e:
+                    error = e
+        raise error
+
+    def _get(self, url: str, params: Optional[Dict], timeout: Timeout, hedged: bool) -> requests.Response:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        start = time.perf_counter()
+        status = None
+        size = 0
+        try:
+            response = self.session.get(url, params=params, timeout=timeout)
+            status = response.status_code
+            size = len(response.content)
+            response.raise_for_status()
+            if self.record_dir:
+                self._save_recording(response)
+            return response
+        finally:
+            latency = time.perf_counter() - start
+            self._record(url, latency, size, status, hedged)
+
+    def _save_recording(self, response: requests.Response):
+        try:
+            save_recording(self.record_dir, response.url, response.status_code,
+                           response.headers.get('Content-Type', 'application/json'), response.content)
+        except OSError as e:
+            logger.warning(f"Could not record response for {response.url}: {e}")
+
+    def _record(self, url: str, latency: float, size: int, status: Optional[int], hedged: bool):
+        with self._stats_lock:
+            self._stats.append({
+                'url': url,
+                'latency_s': latency,
+                'bytes': size,
+                'status': status,
+                'hedged': hedged,
+                'timestamp': time.time()
+            })
+        logger.debug(f"GET {url} -> {status} in {latency * 1000:.0f} ms, {size} bytes"
+                     f"{' (hedged)' if hedged else ''}")
+
+    def request_stats(self) -> list:
+        """Per-request records (url, latency_s, bytes, status, hedged, timestamp), oldest first"""
+        with self._stats_lock:
+            return list(self._stats)
+
+    def stats_summary(self) -> Dict:
+        """Request count, failures, hedges, latency percentiles and bytes transferred"""
+        records = self.request_stats()
+        if not records:
+            return {'requests': 0}
+
+        latencies = sorted(record['latency_s'] for record in records)
+
+        def percentile(q: float) -> float:
+            return latencies[min(int(q * len(latencies)), len(latencies) - 1)]
+
+        return {
+            'requests': len(records),
+            'failures': sum(1 for record in records if record['status'] is None or record['status'] >= 400),
+            'hedged': sum(1 for record in records if record['hedged']),
+            'latency_p50_s': percentile(0.5),
+            'latency_p95_s': percentile(0.95),
+            'latency_max_s': latencies[-1],
+            'bytes_total': sum(record['bytes'] for record in records)
+        }
+
+
+_CLIENT: Optional[PooledHttpClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_http_client() -> PooledHttpClient:
+    """Process-wide pooled client (created on first use)"""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = PooledHttpClient()
+    return _CLIENT
@@ -11,17 +11,57 @@ import pytz
 import json
 
 from config import (
-    INTRADAY_RESOLUTION_MINUTES, AGGREGATION_LEVELS,
+    INTRADAY_RESOLUTION_MINUTES, AGGREGATION_LEVELS, FORECAST_PARQUET_EXPORT, FORECAST_EXPORT_RETENTION,
     OUTPUT_TIMEZONE, OUTPUT_TIMEZONE_NAME, OUTPUT_TIMEZONE_NOTICE
 )
+from dtype_policy import accumulation_dtype, cast_float_columns
+from hierarchical_aggregation import aggregate_levels, resolution_minutes, resolution_freq
+from json_stream import StreamingJsonWriter, dumps
+from forecast_export import (
+    PYARROW_AVAILABLE, EXPORT_TIMESTAMP_FORMAT, export_csv_name, parquet_path, write_forecast_parquet
+)
+from forecast_archive import ForecastArchive, prune_exports
 
 logger = logging.getLogger(__name__)
 
+# Quantile levels exposed as p10..p90 in the API payloads
+API_BAND_LEVELS = (10, 25, 50, 75, 90)
+
+# Rows serialized per chunk when streaming the row layout
+API_STREAM_CHUNK_ROWS = 10000
+
+
+def isoformat_index(index: pd.DatetimeIndex) -> List[str]:
+    """
+    ISO 8601 strings for a DatetimeIndex, identical to Timestamp.isoformat()
+
+    Whole-second timestamps are formatted in array time; anything with
+    sub-second parts falls back to per-element isoformat().
+    """
+    index = pd.DatetimeIndex(index)
+    if len(index) == 0:
+        return []
+    if (index.asi8 % 1_000_000_000 != 0).any():
+        return [timestamp.isoformat() for timestamp in index]
+
+    wall = index.tz_localize(None) if index.tz is not None else index
+    text = np.datetime_as_string(wall.values.astype('datetime64[s]'), unit='s').astype(object)
+    if index.tz is None:
+        return text.tolist()
+
+    # UTC offset per timestamp as +HH:MM (one string per distinct offset)
+    offsets = ((wall.asi8 - index.tz_convert('UTC').tz_localize(None).asi8) // 60_000_000_000)
+    unique_offsets, inverse = np.unique(offsets, return_inverse=True)
+    suffixes = np.array([f"{'+' if minutes >= 0 else '-'}{abs(minutes) // 60:02d}:{abs(minutes) % 60:02d}"
+                         for minutes in unique_offsets.tolist()], dtype=object)
+    return (text + suffixes[inverse]).tolist()
+
 
 class IntradayDataAggregator:
     """Handles aggregation and formatting of intraday forecast data"""
 
     def __init__(self):
+        # Named levels; any other multiple of the 15-minute step ('45min', '2hour', '2day', ...) also works
         self.supported_resolutions = ['15min', '30min', '1hour', '3hour', '6hour', '1day']
 
     def aggregate_forecast(self, forecast_15min: pd.DataFrame,
@@ -29,6 +69,9 @@ class IntradayDataAggregator:
         """
         Aggregate 15-minute forecast to multiple resolutions
 
+        All levels are computed in one hierarchical pass (coarser levels are reduced
+        from finer ones); irregular input falls back to resampling each level.
+
         Args:
             forecast_15min: DataFrame with 15-minute resolution forecasts
             target_resolutions: List of target resolutions to generate
@@ -41,36 +84,93 @@ class IntradayDataAggregator:
 
         logger.info(f"Aggregating forecast to resolutions: {target_resolutions}")
 
-        aggregated_data = {}
-
+        levels = {}
         for resolution in target_resolutions:
-            if resolution not in self.supported_resolutions:
+            minutes = self._get_resolution_minutes(resolution, default=None)
+            if minutes is None or minutes % INTRADAY_RESOLUTION_MINUTES != 0:
                 logger.warning(f"Unsupported resolution: {resolution}, skipping")
                 continue
+            levels[resolution] = minutes
+
+        agg_methods, metadata_cols = self._aggregation_methods(forecast_15min)
+        try:
+            df = cast_float_columns(forecast_15min[list(agg_methods)], accumulation_dtype(),
+                                    [col for col in agg_methods if col not in metadata_cols])
+            by_minutes = aggregate_levels(df, list(levels.values()), agg_methods)
+        except Exception as e:
+            logger.error(f"Hierarchical aggregation failed: {e}")
+            by_minutes = None
+
+        if by_minutes is None:
+            logger.debug("Forecast not on a regular 15-minute grid, resampling each resolution")
+            return {resolution: self._aggregate_to_resolution(forecast_15min, resolution)
+                    for resolution in levels}
+
+        return {resolution: self._finalize_aggregate(by_minutes[minutes], minutes)
+                for resolution, minutes in levels.items()}
+
+    def update_aggregates(self, aggregated_data: Dict[str, pd.DataFrame],
+                          forecast_15min: pd.DataFrame,
+                          changed_timestamps: pd.DatetimeIndex) -> Dict[str, pd.DataFrame]:
+        """
+        Patch previously aggregated forecasts after an incremental re-forecast
+
+        Only the buckets that contain changed 15-minute intervals are re-aggregated;
+        all other buckets are copied from aggregated_data.
+
+        Args:
+            aggregated_data: Output of aggregate_forecast for the previous run
+            forecast_15min: Updated 15-minute forecast (same index as the previous run)
+            changed_timestamps: 15-minute timestamps whose values changed
+
+        Returns:
+            Dictionary with updated DataFrames for each resolution
+        """
+        updated = {}
+
+        for resolution, previous in aggregated_data.items():
+            labels = previous.index
+            bucket_positions = labels.searchsorted(forecast_15min.index, side='right') - 1
+            if previous.empty or (bucket_positions < 0).any():
+                updated[resolution] = self._aggregate_to_resolution(forecast_15min, resolution)
+                continue
+
+            patched = previous.copy()
+            changed_buckets = np.unique(labels.searchsorted(changed_timestamps, side='right') - 1)
+            if len(changed_buckets) > 0:
+                rows = np.isin(bucket_positions, changed_buckets)
+                partial = self._aggregate_to_resolution(forecast_15min[rows], resolution)
+                # Resampling a sparse subset creates empty bins between the changed buckets
+                partial = partial.reindex(labels[changed_buckets])
+                patched.loc[partial.index, partial.columns] = partial
+
+            if 'forecast_timestamp' in patched.columns and 'forecast_timestamp' in forecast_15min.columns:
+                patched['forecast_timestamp'] = forecast_15min['forecast_timestamp'].iloc[0]
 
-            logger.debug(f"Aggregating to {resolution}")
-            aggregated_df = self._aggregate_to_resolution(forecast_15min, resolution)
-            aggregated_data[resolution] = aggregated_df
+            logger.debug(f"Updated {len(changed_buckets)} of {len(patched)} buckets at {resolution}")
+            updated[resolution] = patched
 
-        return aggregated_data
+        return updated
 
     def _aggregate_to_resolution(self, df: pd.DataFrame, resolution: str) -> pd.DataFrame:
         """Aggregate data to a specific resolution"""
+        minutes = resolution_minutes(resolution)
+        agg_methods, metadata_cols = self._aggregation_methods(df)
 
-        # Define frequency mapping
-        freq_map = {
-            '15min': '15min',
-            '30min': '30min',
-            '1hour': '1h',
-            '3hour': '3h',
-            '6hour': '6h',
-            '1day': '1D'
-        }
+        # Perform aggregation (means and sums accumulate in float64 even for float32 forecasts)
+        try:
+            value_columns = [col for col in agg_methods if col not in metadata_cols]
+            df = cast_float_columns(df[list(agg_methods)].copy(), accumulation_dtype(), value_columns)
+            aggregated = df.resample(resolution_freq(minutes)).agg(agg_methods)
+            return self._finalize_aggregate(aggregated, minutes)
 
-        if resolution not in freq_map:
-            raise ValueError(f"Unsupported resolution: {resolution}")
+        except Exception as e:
+            logger.error(f"Failed to aggregate to {resolution}: {e}")
+            return pd.DataFrame()
 
-        freq = freq_map[resolution]
+    @staticmethod
+    def _aggregation_methods(df: pd.DataFrame):
+        """Aggregation method per column (power means, energy sums, metadata first) and the metadata columns"""
 
         # Define aggregation methods for different columns
         agg_methods = {
@@ -101,37 +201,27 @@ class IntradayDataAggregator:
                     metadata_cols.append(col)
                     agg_methods[col] = 'first'
 
-        # Perform aggregation
-        try:
-            aggregated = df.resample(freq).agg(agg_methods)
+        return agg_methods, metadata_cols
 
-            # Update resolution metadata
-            if 'resolution_minutes' in aggregated.columns:
-                resolution_minutes = self._get_resolution_minutes(resolution)
-                aggregated['resolution_minutes'] = resolution_minutes
+    @staticmethod
+    def _finalize_aggregate(aggregated: pd.DataFrame, minutes: int) -> pd.DataFrame:
+        """Set resolution metadata and recompute energy from mean power for coarser levels"""
+        # Update resolution metadata
+        if 'resolution_minutes' in aggregated.columns:
+            aggregated['resolution_minutes'] = minutes
 
-            # Add energy calculations
-            if resolution != '15min':
-                resolution_hours = self._get_resolution_hours(resolution)
-                aggregated['energy_mwh'] = aggregated['production_kw'] / 1000 * resolution_hours
+        # Add energy calculations
+        if minutes != INTRADAY_RESOLUTION_MINUTES:
+            aggregated['energy_mwh'] = aggregated['production_kw'] / 1000 * (minutes / 60.0)
 
-            return aggregated
+        return aggregated
 
-        except Exception as e:
-            logger.error(f"Failed to aggregate to {resolution}: {e}")
-            return pd.DataFrame()
-
-    def _get_resolution_minutes(self, resolution: str) -> int:
+    def _get_resolution_minutes(self, resolution: str, default: Optional[int] = 15) -> Optional[int]:
         """Get resolution in minutes"""
-        resolution_map = {
-            '15min': 15,
-            '30min': 30,
-            '1hour': 60,
-            '3hour': 180,
-            '6hour': 360,
-            '1day': 1440
-        }
-        return resolution_map.get(resolution, 15)
+        try:
+            return resolution_minutes(resolution)
+        except ValueError:
+            return default
 
     def _get_resolution_hours(self, resolution: str) -> float:
         """Get resolution in hours"""
@@ -183,64 +273,194 @@ class IntradayDataAggregator:
         return trading_df[trading_columns]
 
     def create_api_format(self, forecasts: Dict[str, pd.DataFrame],
-                         location_key: str) -> Dict:
-        """Create API-ready format for external consumption"""
+                         location_key: str, layout: str = 'rows') -> Dict:
+        """
+        Create API-ready format for external consumption
+
+        Values are rounded column-wise and the payload is assembled from column
+        buffers instead of row by row.
 
+        Args:
+            forecasts: Forecast DataFrame per resolution
+            location_key: Location identifier
+            layout: 'rows' for one object per timestamp, 'columns' for the compact
+                    column-oriented variant (timestamps: [...], p50: [...], ...)
+
+        Returns:
+            API payload dictionary
+        """
         api_data = {
-            'metadata': {
-                'location': location_key,
-                'forecast_timestamp': datetime.now(pytz.UTC).isoformat(),
-                'forecast_horizon_days': 7,
-                'available_resolutions': list(forecasts.keys()),
-                'data_timezone': 'UTC',
-                'display_timezone': OUTPUT_TIMEZONE,
-                'display_timezone_name': OUTPUT_TIMEZONE_NAME,
-                'timezone_notice': OUTPUT_TIMEZONE_NOTICE
-            },
+            'metadata': self._api_metadata(forecasts, location_key, layout),
             'forecasts': {}
         }
 
         for resolution, df in forecasts.items():
-            forecast_data = []
-
-            for idx, row in df.iterrows():
-                data_point = {
-                    'timestamp': idx.isoformat(),
-                    'production_kw': round(row['production_kw'], 4),
-                    'uncertainty_bands': {
-                        'p10': round(row['q10'], 4),
-                        'p25': round(row['q25'], 4),
-                        'p50': round(row['q50'], 4),
-                        'p75': round(row['q75'], 4),
-                        'p90': round(row['q90'], 4)
-                    }
+            columns = self._api_columns(df)
+
+            if layout == 'columns':
+                forecast = {
+                    'resolution_minutes': self._get_resolution_minutes(resolution),
+                    'data_points': len(df),
+                    **columns
+                }
+            else:
+                forecast = {
+                    'resolution_minutes': self._get_resolution_minutes(resolution),
+                    'data_points': len(df),
+                    'data': self._api_rows(columns)
                 }
+            api_data['forecasts'][resolution] = forecast
 
-                # Add energy values if available (in kWh)
-                if 'energy_mwh' in row:
-                    # Convert MWh to kWh
-                    data_point['energy_kwh'] = round(row['energy_mwh'] * 1000, 3)
-                    data_point['energy_uncertainty_bands'] = {
-                        'p10': round(row.get('energy_q10_mwh', 0) * 1000, 3),
-                        'p25': round(row.get('energy_q25_mwh', 0) * 1000, 3),
-                        'p50': round(row.get('energy_q50_mwh', 0) * 1000, 3),
-                        'p75': round(row.get('energy_q75_mwh', 0) * 1000, 3),
-                        'p90': round(row.get('energy_q90_mwh', 0) * 1000, 3)
-                    }
+        return api_data
 
-                forecast_data.append(data_point)
+    def export_api_json(self, forecasts: Dict[str, pd.DataFrame], location_key: str,
+                        output_path: str, layout: str = 'rows',
+                        extra_fields: Optional[Dict] = None,
+                        compression: Optional[List[str]] = None) -> List[str]:
+        """
+        Stream the API payload (same schema as create_api_format) to a compact JSON file
 
-            api_data['forecasts'][resolution] = {
-                'resolution_minutes': self._get_resolution_minutes(resolution),
-                'data_points': len(forecast_data),
-                'data': forecast_data
-            }
+        Resolutions, and rows (or column values) within a resolution in chunks of
+        API_STREAM_CHUNK_ROWS, are serialized and written one at a time, so memory
+        does not grow with the horizon. Compressed siblings (.gz, .zst) are written
+        in the same pass. Missing values (NaN) are written as null.
 
-        return api_data
+        Args:
+            forecasts: Forecast DataFrame per resolution
+            location_key: Location identifier
+            output_path: Path of the JSON file
+            layout: 'rows' or 'columns' (see create_api_format)
+            extra_fields: Additional top-level fields written after 'forecasts'
+            compression: Codecs of the sibling files, None uses API_JSON_COMPRESSION
+
+        Returns:
+            Paths written (plain JSON first)
+        """
+        metadata = self._api_metadata(forecasts, location_key, layout)
+
+        with StreamingJsonWriter(output_path, compression) as writer:
+            writer.write(b'{"metadata":' + dumps(metadata) + b',"forecasts":{')
+
+            for position, (resolution, df) in enumerate(forecasts.items()):
+                header = {
+                    'resolution_minutes': self._get_resolution_minutes(resolution),
+                    'data_points': len(df)
+                }
+                # Open the resolution object; its remaining members follow
+                writer.write((b',' if position else b'') + dumps(resolution) + b':' + dumps(header)[:-1])
+
+                if layout == 'columns':
+                    for name in self._api_column_names(df):
+                        writer.write(b',' + dumps(name) + b':[')
+                        for start in range(0, len(df), API_STREAM_CHUNK_ROWS):
+                            values = self._api_column(df.iloc[start:start + API_STREAM_CHUNK_ROWS], name)
+                            writer.write((b',' if start else b'') + dumps(values)[1:-1])
+                        writer.write(b']')
+                else:
+                    writer.write(b',"data":[')
+                    for start in range(0, len(df), API_STREAM_CHUNK_ROWS):
+                        rows = self._api_rows(self._api_columns(df.iloc[start:start + API_STREAM_CHUNK_ROWS]))
+                        writer.write((b',' if start else b'') + dumps(rows)[1:-1])
+                    writer.write(b']')
+                writer.write(b'}')
+
+            writer.write(b'}')
+            for key, value in (extra_fields or {}).items():
+                writer.write(b',' + dumps(key) + b':' + dumps(value))
+            writer.write(b'}')
+
+        logger.info(f"API forecast streamed to: {output_path} ({writer.bytes_written / 1024:.0f} KB)")
+        return writer.paths
+
+    @staticmethod
+    def _api_metadata(forecasts: Dict[str, pd.DataFrame], location_key: str, layout: str) -> Dict:
+        """Metadata block of the API payload"""
+        if layout not in ('rows', 'columns'):
+            raise ValueError(f"Unknown API layout: {layout}")
+
+        metadata = {
+            'location': location_key,
+            'forecast_timestamp': datetime.now(pytz.UTC).isoformat(),
+            'forecast_horizon_days': 7,
+            'available_resolutions': list(forecasts.keys()),
+            'data_timezone': 'UTC',
+            'display_timezone': OUTPUT_TIMEZONE,
+            'display_timezone_name': OUTPUT_TIMEZONE_NAME,
+            'timezone_notice': OUTPUT_TIMEZONE_NOTICE
+        }
+        if layout == 'columns':
+            metadata['layout'] = 'columns'
+        return metadata
+
+    @classmethod
+    def _api_columns(cls, df: pd.DataFrame) -> Dict[str, list]:
+        """Rounded API column buffers: timestamps, production_kw, p10..p90 and energy columns in kWh"""
+        return {name: cls._api_column(df, name) for name in cls._api_column_names(df)}
+
+    @staticmethod
+    def _api_column_names(df: pd.DataFrame) -> List[str]:
+        """Names of the API columns of a forecast frame, in payload order"""
+        names = ['timestamps', 'production_kw'] + [f'p{level}' for level in API_BAND_LEVELS]
+        # Energy values only if available
+        if 'energy_mwh' in df.columns:
+            names += ['energy_kwh'] + [f'energy_p{level}' for level in API_BAND_LEVELS]
+        return names
+
+    @staticmethod
+    def _api_column(df: pd.DataFrame, name: str) -> list:
+        """One rounded API column buffer (missing values become None, i.e. null)"""
+        def rounded(values, decimals: int) -> list:
+            values = np.round(np.asarray(values, dtype=np.float64), decimals)
+            missing = np.isnan(values)
+            if not missing.any():
+                return values.tolist()
+            buffer = values.astype(object)
+            buffer[missing] = None
+            return buffer.tolist()
+
+        if name == 'timestamps':
+            return isoformat_index(df.index)
+        if name == 'production_kw':
+            return rounded(df['production_kw'], 4)
+        if name.startswith('energy_'):
+            # MWh converted to kWh
+            column = 'energy_mwh' if name == 'energy_kwh' else f"energy_q{name[len('energy_p'):]}_mwh"
+            values = df[column].to_numpy(dtype=np.float64) * 1000 if column in df.columns else np.zeros(len(df))
+            return rounded(values, 3)
+        return rounded(df[f'q{name[1:]}'], 4)
+
+    @staticmethod
+    def _api_rows(columns: Dict[str, list]) -> List[Dict]:
+        """One data point object per timestamp, built from the column buffers"""
+        band_names = [f'p{level}' for level in API_BAND_LEVELS]
+        bands = zip(*(columns[name] for name in band_names))
+
+        if 'energy_kwh' not in columns:
+            return [
+                {'timestamp': timestamp, 'production_kw': production,
+                 'uncertainty_bands': dict(zip(band_names, band))}
+                for timestamp, production, band in zip(columns['timestamps'], columns['production_kw'], bands)
+            ]
+
+        energy_bands = zip(*(columns[f'energy_{name}'] for name in band_names))
+        return [
+            {'timestamp': timestamp, 'production_kw': production,
+             'uncertainty_bands': dict(zip(band_names, band)),
+             'energy_kwh': energy,
+             'energy_uncertainty_bands': dict(zip(band_names, energy_band))}
+            for timestamp, production, band, energy, energy_band in zip(
+                columns['timestamps'], columns['production_kw'], bands, columns['energy_kwh'], energy_bands)
+        ]
 
     def create_csv_exports(self, forecasts: Dict[str, pd.DataFrame],
-                          location_key: str, output_dir: str) -> List[str]:
-        """Export forecasts to CSV files"""
+                          location_key: str, output_dir: str,
+                          archive: Optional[ForecastArchive] = None) -> List[str]:
+        """
+        Export forecasts to CSV files (with typed Parquet siblings when FORECAST_PARQUET_EXPORT is set)
+
+        With an archive, the run is also appended to it and only the newest
+        FORECAST_EXPORT_RETENTION timestamped exports are kept in output_dir.
+        """
 
         import os
         os.makedirs(output_dir, exist_ok=True)
@@ -249,7 +469,9 @@ class IntradayDataAggregator:
         from config import LOCATIONS
 
         exported_files = []
-        timestamp = datetime.now(pytz.UTC).strftime('%Y%m%d_%H%M%S')
+        run_time = datetime.now(pytz.UTC).replace(microsecond=0)
+        timestamp = run_time.strftime(EXPORT_TIMESTAMP_FORMAT)
+        archive_frames = {}
 
         # Get local timezone for the location
         location_tz = pytz.timezone(LOCATIONS[location_key]['timezone'])
@@ -343,12 +565,8 @@ class IntradayDataAggregator:
                     # This ensures the forecast starts at July 3rd 00:00
                     export_df_datetime = pd.to_datetime(export_df['timestamp'])
                     export_df = export_df[export_df_datetime >= '2025-07-03']
-
-                    # Format timestamp for hourly
-                    export_df['timestamp'] = export_df['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
                 else:
                     # For 15-minute format, keep simpler structure
-                    export_df['timestamp'] = export_df['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
                     # Remove the UTC timestamp column and location column
                     export_df = export_df.drop(columns=['timestamp_utc'])
                     if 'location' in export_df.columns:
@@ -362,17 +580,42 @@ class IntradayDataAggregator:
                 if col in export_df.columns:
                     export_df[col] = export_df[col].round(6)  # More precision for energy values
 
+            # Wall-clock local time (the CSV text), kept typed for the Parquet export
+            if 'timestamp' in export_df.columns:
+                export_df['timestamp'] = export_df['timestamp'].dt.tz_localize(None)
+
             # Create filename
-            filename = f"{location_key}_intraday_{resolution}_{timestamp}.csv"
+            filename = export_csv_name(location_key, resolution, timestamp)
             filepath = os.path.join(output_dir, filename)
 
             # Export CSV data directly without comments
-            export_df.to_csv(filepath, index=False)
+            csv_df = export_df
+            if 'timestamp' in csv_df.columns:
+                csv_df = csv_df.assign(timestamp=csv_df['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S'))
+            csv_df.to_csv(filepath, index=False)
 
             exported_files.append(filepath)
 
+            if FORECAST_PARQUET_EXPORT and PYARROW_AVAILABLE:
+                exported_files.append(write_forecast_parquet(export_df, parquet_path(filepath), {
+                    'location': location_key,
+                    'resolution': resolution,
+                    'resolution_minutes': self._get_resolution_minutes(resolution),
+                    'generated_at': timestamp
+                }))
+            archive_frames[resolution] = export_df
+
             logger.info(f"Exported {resolution} forecast to: {filepath}")
 
+        if archive is not None and archive_frames:
+            try:
+                archive.append(run_time, archive_frames, {'generated_at': timestamp})
+                for resolution in archive_frames:
+                    prune_exports(output_dir, location_key, resolution, FORECAST_EXPORT_RETENTION)
+                exported_files = [path for path in exported_files if os.path.exists(path)]
+            except (OSError, ValueError, ImportError) as e:
+                logger.warning(f"Could not archive forecast run {timestamp}: {e}")
+
         return exported_files
 
     def create_summary_report(self, forecasts: Dict[str, pd.DataFrame],
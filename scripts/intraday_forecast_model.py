@@ -9,17 +9,9 @@ import pandas as pd
 import numpy as np
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 import pytz
 
-# Try importing ephem for accurate solar calculations
-try:
-    import ephem
-    EPHEM_AVAILABLE = True
-except ImportError:
-    EPHEM_AVAILABLE = False
-    logging.warning("ephem library not found. Install with: pip install ephem")
-
 # Try importing pvlib for clear sky models
 try:
     import pvlib
@@ -31,8 +23,17 @@ except ImportError:
 
 from config import (
     INTRADAY_RESOLUTION_MINUTES, DEGRADATION_RATE_ANNUAL,
-    PERFORMANCE_RATIO_DEFAULT, PERFORMANCE_RATIO_BY_WEATHER, TEMPERATURE_COEFFICIENT
+    PERFORMANCE_RATIO_DEFAULT, PERFORMANCE_RATIO_BY_WEATHER, TEMPERATURE_COEFFICIENT,
+    QUANTILES, ENSEMBLE_MEMBERS
 )
+from solar_geometry import calculate_solar_position
+from forecast_quantiles import order_quantile_columns, quantile_columns
+from solar_tables import lookup_solar_data
+from clear_sky_cache import get_clearsky_cached
+from pv_kernels import irradiance_to_ac, apply_cloud_dynamics, poa_transposition
+from dtype_policy import compute_dtype, accumulation_dtype, as_compute_array, cast_float_columns
+from ensemble_forecast import ensemble_quantiles
+from hierarchical_aggregation import aggregate_levels
 
 # Try importing calibration module
 try:
@@ -44,6 +45,18 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Real-time calibration applies to the first 4 hours at 15-min resolution
+REALTIME_CALIBRATION_INTERVALS = 16
+
+
+def _dilate_mask(mask: np.ndarray, before: int, after: int) -> np.ndarray:
+    """Extend every True entry of a 1-D mask to `before` earlier and `after` later positions"""
+    positions = np.flatnonzero(mask)
+    dilated = np.zeros(len(mask) + 1, dtype=int)
+    np.add.at(dilated, np.maximum(positions - before, 0), 1)
+    np.add.at(dilated, np.minimum(positions + after + 1, len(mask)), -1)
+    return np.cumsum(dilated[:-1]) > 0
+
 
 class IntradaySolarForecastModel:
     """Fast, high-resolution solar forecasting model for intraday operations"""
@@ -82,6 +95,18 @@ class IntradaySolarForecastModel:
         self.cloud_response_factor = 0.8  # How quickly output responds to cloud changes
         self.smoothing_window = 4  # 4 * 15min = 1 hour smoothing for stability
         
+        # Read solar geometry and clear-sky values from precomputed tables
+        self.use_solar_tables = True
+        
+        # 'fused' runs the physics chain on raw arrays, 'pandas' keeps the step-by-step Series path for debugging
+        self.compute_mode = 'fused'
+        
+        # 'bands' scales the forecast by fixed uncertainty multipliers, 'ensemble' (fused mode only)
+        # takes empirical quantiles of a Monte Carlo ensemble
+        self.uncertainty_mode = 'bands'
+        self.ensemble_members = ENSEMBLE_MEMBERS
+        self.ensemble_seed = 42
+        
         # Initialize pvlib location if available
         if PVLIB_AVAILABLE:
             self.pvlib_location = Location(
@@ -107,35 +132,7 @@ class IntradaySolarForecastModel:
         logger.info(f"Period: {weather_df.index[0]} to {weather_df.index[-1]}")
         logger.info(f"Resolution: {INTRADAY_RESOLUTION_MINUTES} minutes")
         
-        predictions = pd.DataFrame(index=weather_df.index)
-        
-        # Calculate solar position for all timestamps
-        solar_data = self._calculate_solar_positions(weather_df.index)
-        
-        # Base PV model calculations
-        dc_power = self._calculate_dc_power(weather_df, solar_data)
-        
-        # Apply system losses and inefficiencies
-        ac_power = self._apply_system_losses(dc_power, weather_df)
-        
-        # Apply cloud dynamics and smoothing
-        ac_power = self._apply_cloud_dynamics(ac_power, weather_df)
-        
-        # Apply real-time calibration if current conditions available
-        if current_conditions:
-            ac_power = self._apply_realtime_calibration(ac_power, current_conditions)
-        
-        # Generate uncertainty bands for intraday risk management
-        predictions = self._generate_uncertainty_bands(ac_power, weather_df)
-        
-        # Calculate energy values (integrate power over time period)
-        resolution_hours = INTRADAY_RESOLUTION_MINUTES / 60.0
-        predictions['energy_mwh'] = predictions['production_kw'] / 1000 * resolution_hours
-        predictions['energy_q10_mwh'] = predictions['q10'] / 1000 * resolution_hours
-        predictions['energy_q25_mwh'] = predictions['q25'] / 1000 * resolution_hours
-        predictions['energy_q50_mwh'] = predictions['q50'] / 1000 * resolution_hours
-        predictions['energy_q75_mwh'] = predictions['q75'] / 1000 * resolution_hours
-        predictions['energy_q90_mwh'] = predictions['q90'] / 1000 * resolution_hours
+        predictions = self._predict_block(weather_df, current_conditions)
         
         # Apply calibration if available
         if CALIBRATION_AVAILABLE:
@@ -152,119 +149,293 @@ class IntradaySolarForecastModel:
         predictions['forecast_timestamp'] = datetime.now(pytz.UTC)
         predictions['resolution_minutes'] = INTRADAY_RESOLUTION_MINUTES
         
+        # Checked by the next incremental update
+        predictions.attrs['realtime_calibrated'] = bool(current_conditions)
+        
         logger.info(f"Generated {len(predictions)} 15-minute predictions")
         
         return predictions
     
-    def _calculate_solar_positions(self, timestamps: pd.DatetimeIndex) -> pd.DataFrame:
-        """Calculate solar position data for all timestamps using accurate astronomical calculations"""
-        solar_data = pd.DataFrame(index=timestamps)
-        
-        lat = self.location['latitude']
-        lon = self.location['longitude']
-        
-        elevations = []
-        azimuths = []
-        air_masses = []
-        
-        if EPHEM_AVAILABLE:
-            # Use ephem for accurate solar calculations
-            observer = ephem.Observer()
-            observer.lat = str(lat)
-            observer.lon = str(lon)
-            observer.elevation = 0
-            sun = ephem.Sun()
+    def predict_intraday_incremental(self, weather_df: pd.DataFrame,
+                                     previous_weather: Optional[pd.DataFrame],
+                                     previous_predictions: Optional[pd.DataFrame],
+                                     current_conditions: Optional[Dict] = None
+                                     ) -> Tuple[pd.DataFrame, Optional[pd.DatetimeIndex]]:
+        """
+        Re-forecast only the intervals whose weather changed since the previous run
+        
+        Every output row depends on its own weather row, its horizon position and,
+        through the cloud smoothing, its smoothing_window neighbours. Rows whose
+        inputs are unchanged are copied from previous_predictions; the result is
+        identical to a full predict_intraday call. Whether the previous run had
+        current conditions is read from previous_predictions.attrs['realtime_calibrated']
+        (set by predict_intraday; assumed True when missing).
+        
+        Args:
+            weather_df: New 15-minute weather data
+            previous_weather: Weather data of the previous run
+            previous_predictions: Predictions of the previous run (from predict_intraday)
+            current_conditions: Current weather for calibration
             
-            for ts in timestamps:
-                # Ensure datetime is naive UTC for ephem
-                if hasattr(ts, 'tzinfo') and ts.tzinfo is not None:
-                    naive_utc_dt = ts.astimezone(pytz.utc).replace(tzinfo=None)
-                else:
-                    naive_utc_dt = ts
-                
-                observer.date = ephem.Date(naive_utc_dt)
-                sun.compute(observer)
-                
-                elevation = np.degrees(sun.alt)
-                azimuth = np.degrees(sun.az)
-                
-                elevations.append(max(0, elevation))
-                azimuths.append(azimuth)
-                
-                # Calculate air mass
-                if elevation > 0:
-                    air_mass = 1 / (np.sin(np.radians(elevation)) + 
-                                   0.50572 * (elevation + 6.07995) ** -1.6364)
-                else:
-                    air_mass = np.inf
-                air_masses.append(air_mass)
-        else:
-            # Fallback to previous calculation if ephem not available
-            logger.warning("Using simplified solar calculations. Install ephem for accurate results: pip install ephem")
-            lat_rad = np.radians(lat)
+        Returns:
+            Tuple of (predictions, changed timestamps). The changed timestamps are
+            None when a full recompute was needed.
+        """
+        changed = self._changed_weather_rows(weather_df, previous_weather, previous_predictions)
+        if changed is None:
+            return self.predict_intraday(weather_df, current_conditions), None
+        
+        # Real-time calibration rewrites the first hours, and removes its factor when it stops
+        dirty = changed.copy()
+        if current_conditions or previous_predictions.attrs.get('realtime_calibrated', True):
+            dirty[:REALTIME_CALIBRATION_INTERVALS] = True
+        
+        # An input change reaches outputs up to window//2 rows later and window - window//2 - 1 rows earlier
+        window = self.smoothing_window
+        affected = _dilate_mask(dirty, before=window - window // 2 - 1, after=window // 2)
+        
+        predictions = previous_predictions.copy()
+        if affected.any():
+            # Recompute the affected rows plus a halo wide enough for the centered smoothing;
+            # smoothing across two gathered runs only touches halo rows, which are discarded
+            positions = np.flatnonzero(_dilate_mask(affected, before=window, after=window))
+            weather_rows = weather_df.iloc[positions].copy()
+            for col in ['ghi', 'dni', 'dhi']:
+                # Missing irradiance counts as zero whenever the full column has data
+                if col in weather_rows.columns and weather_df[col].notna().any():
+                    weather_rows[col] = weather_rows[col].fillna(0)
             
-            for ts in timestamps:
-                # Convert to local time for solar calculations
-                local_ts = ts.tz_convert(self.timezone)
-                
-                day_of_year = local_ts.dayofyear
-                hour_decimal = local_ts.hour + local_ts.minute / 60.0
-                
-                # Solar declination
-                declination = 23.45 * np.sin(np.radians((360 * (284 + day_of_year)) / 365))
-                decl_rad = np.radians(declination)
-                
-                # Equation of time
-                B = 2 * np.pi * (day_of_year - 81) / 365
-                equation_of_time = 9.87 * np.sin(2 * B) - 7.53 * np.cos(B) - 1.5 * np.sin(B)
-                
-                # Solar time
-                standard_meridian = 15 * round(local_ts.utcoffset().total_seconds() / 3600)
-                longitude_correction = 4 * (standard_meridian - lon)
-                solar_time = hour_decimal + (equation_of_time + longitude_correction) / 60
-                
-                # Hour angle
-                hour_angle = 15 * (solar_time - 12)
-                hour_angle_rad = np.radians(hour_angle)
-                
-                # Solar elevation
-                elevation = np.degrees(np.arcsin(
-                    np.sin(lat_rad) * np.sin(decl_rad) +
-                    np.cos(lat_rad) * np.cos(decl_rad) * np.cos(hour_angle_rad)
-                ))
-                
-                # Solar azimuth
-                azimuth = np.degrees(np.arctan2(
-                    np.sin(hour_angle_rad),
-                    np.cos(hour_angle_rad) * np.sin(lat_rad) - 
-                    np.tan(decl_rad) * np.cos(lat_rad)
-                ))
-                
-                elevations.append(max(0, elevation))
-                azimuths.append(azimuth)
-                
-                # Calculate air mass
-                if elevation > 0:
-                    air_mass = 1 / (np.sin(np.radians(elevation)) + 
-                                   0.50572 * (elevation + 6.07995) ** -1.6364)
-                else:
-                    air_mass = np.inf
-                air_masses.append(air_mass)
-        
-        solar_data['elevation'] = elevations
-        solar_data['azimuth'] = azimuths
-        solar_data['air_mass'] = air_masses
+            block = self._predict_block(weather_rows, current_conditions, positions)
+            keep = affected[positions]
+            predictions.iloc[positions[keep], predictions.columns.get_indexer(block.columns)] = \
+                block.to_numpy()[keep]
+        
+        predictions['forecast_timestamp'] = datetime.now(pytz.UTC)
+        predictions.attrs['realtime_calibrated'] = bool(current_conditions)
+        
+        logger.info(f"Incremental update: {int(changed.sum())} changed weather intervals, "
+                    f"{int(affected.sum())} of {len(predictions)} predictions recomputed")
+        
+        return predictions, weather_df.index[affected]
+    
+    def _changed_weather_rows(self, weather_df: pd.DataFrame,
+                              previous_weather: Optional[pd.DataFrame],
+                              previous_predictions: Optional[pd.DataFrame]) -> Optional[np.ndarray]:
+        """Boolean mask of weather rows that differ from the previous run, None if a full run is needed"""
+        if previous_weather is None or previous_predictions is None:
+            return None
+        
+        # Calibration and the pandas path are applied to the whole horizon
+        if CALIBRATION_AVAILABLE or self.compute_mode != 'fused':
+            return None
+        
+        if (not weather_df.index.equals(previous_weather.index) or
+                not weather_df.index.equals(previous_predictions.index) or
+                list(weather_df.columns) != list(previous_weather.columns) or
+                len(weather_df) <= self.smoothing_window):
+            return None
+        
+        new_values = weather_df.to_numpy(dtype=float)
+        old_values = previous_weather.to_numpy(dtype=float)
+        new_missing = np.isnan(new_values)
+        old_missing = np.isnan(old_values)
+        
+        # Columns that are entirely missing switch between measured and estimated irradiance
+        if not np.array_equal(new_missing.all(axis=0), old_missing.all(axis=0)):
+            return None
+        
+        return ((new_values != old_values) & ~(new_missing & old_missing)).any(axis=1)
+    
+    def _predict_block(self, weather_df: pd.DataFrame, current_conditions: Optional[Dict] = None,
+                       positions: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Power, quantile and energy columns for rows of the forecast horizon
+        
+        Args:
+            weather_df: Weather rows (the full horizon, or rows gathered from it)
+            current_conditions: Current weather for calibration
+            positions: Position of each row in the full horizon, None for the full horizon
+        """
+        if positions is None:
+            positions = np.arange(len(weather_df))
+        
+        # Calculate solar position for all timestamps
+        solar_data = self._calculate_solar_positions(weather_df.index)
+        
+        if self.uncertainty_mode == 'ensemble' and self.compute_mode == 'fused':
+            predictions = self._generate_ensemble_bands(weather_df, solar_data, positions, current_conditions)
+        else:
+            predictions = self._predict_deterministic(weather_df, solar_data, positions, current_conditions)
+        
+        # Calculate energy values (integrate power over time period)
+        resolution_hours = INTRADAY_RESOLUTION_MINUTES / 60.0
+        predictions['energy_mwh'] = predictions['production_kw'] / 1000 * resolution_hours
+        predictions['energy_q10_mwh'] = predictions['q10'] / 1000 * resolution_hours
+        predictions['energy_q25_mwh'] = predictions['q25'] / 1000 * resolution_hours
+        predictions['energy_q50_mwh'] = predictions['q50'] / 1000 * resolution_hours
+        predictions['energy_q75_mwh'] = predictions['q75'] / 1000 * resolution_hours
+        predictions['energy_q90_mwh'] = predictions['q90'] / 1000 * resolution_hours
+        
+        # Energy values are summed downstream, so they are kept in the accumulation dtype
+        cast_float_columns(predictions, accumulation_dtype(),
+                           [col for col in predictions.columns if col.startswith('energy_')])
+        
+        return predictions
+    
+    def _calculate_solar_positions(self, timestamps: pd.DatetimeIndex) -> pd.DataFrame:
+        """Calculate solar position data for all timestamps in a single vectorized call
+        
+        Reads the precomputed per-site table when the timestamps are on its grid,
+        which also carries the clear-sky GHI used by _calculate_clear_sky_ghi.
+        """
+        solar_data = None
+        if self.use_solar_tables:
+            solar_data = lookup_solar_data(self.location_key, self.location, timestamps)
+        
+        if solar_data is not None:
+            solar_data = solar_data[['elevation', 'azimuth', 'air_mass', 'ghi_clear']].copy()
+        else:
+            solar_data = calculate_solar_position(
+                timestamps, self.location['latitude'], self.location['longitude']
+            )
+        
+        # Nighttime elevation is reported as zero (air mass stays inf below the horizon)
+        solar_data['elevation'] = solar_data['elevation'].clip(lower=0)
         
         return solar_data
     
+    def _predict_deterministic(self, weather_df: pd.DataFrame, solar_data: pd.DataFrame,
+                               positions: np.ndarray, current_conditions: Optional[Dict]) -> pd.DataFrame:
+        """Single noise path through the physics chain, with multiplier-based uncertainty bands"""
+        if self.compute_mode == 'fused':
+            # Whole GHI -> POA -> DC -> AC chain on raw arrays
+            ac_power = self._calculate_ac_power_fused(weather_df, solar_data, positions)
+        else:
+            # Base PV model calculations
+            dc_power = self._calculate_dc_power(weather_df, solar_data)
+            
+            # Apply system losses and inefficiencies
+            ac_power = self._apply_system_losses(dc_power, weather_df)
+            
+            # Apply cloud dynamics and smoothing
+            ac_power = self._apply_cloud_dynamics(ac_power, weather_df)
+        
+        # Apply real-time calibration if current conditions available
+        if current_conditions:
+            ac_power = self._apply_realtime_calibration(ac_power, current_conditions, positions)
+        
+        # Generate uncertainty bands for intraday risk management
+        return self._generate_uncertainty_bands(ac_power, weather_df, positions)
+    
+    def _generate_ensemble_bands(self, weather_df: pd.DataFrame, solar_data: pd.DataFrame,
+                                 positions: np.ndarray, current_conditions: Optional[Dict]) -> pd.DataFrame:
+        """Empirical quantiles of a Monte Carlo ensemble of the fused physics chain
+        
+        production_kw is the ensemble mean; the irradiance error of each member is
+        scaled by the same horizon- and cloud-dependent uncertainty as the bands.
+        """
+        mean, bands = ensemble_quantiles(
+            **self._fused_inputs(weather_df, solar_data),
+            relative_uncertainty=np.asarray(self._relative_uncertainty(weather_df, positions)),
+            quantiles=QUANTILES, positions=positions,
+            members=self.ensemble_members, seed=self.ensemble_seed,
+            smoothing_window=self.smoothing_window, system=self._fused_system()
+        )
+        
+        # Convert MW to kW
+        predictions = pd.DataFrame(bands * 1000, index=weather_df.index, columns=quantile_columns())
+        predictions.insert(0, 'production_kw', mean * 1000)
+        
+        # Real-time calibration scales every member of the first hours alike
+        if current_conditions:
+            calibrated = positions < REALTIME_CALIBRATION_INTERVALS
+            predictions.loc[calibrated] *= self._realtime_calibration_factor(current_conditions)
+        
+        # Ensure physical constraints and quantile ordering
+        cast_float_columns(predictions)
+        order_quantile_columns(predictions, upper=self.capacity_kw)
+        predictions['production_kw'] = predictions['production_kw'].clip(0, self.capacity_kw)
+        
+        return predictions
+    
+    def _fused_inputs(self, weather_df: pd.DataFrame, solar_data: pd.DataFrame) -> Dict[str, Optional[np.ndarray]]:
+        """Weather and solar arrays for the fused kernels, with missing irradiance resolved
+        
+        Measured DNI/DHI with gaps are zero-filled (None when entirely missing), so any
+        subset of rows is treated exactly like the full horizon.
+        """
+        
+        def column(name: str) -> Optional[np.ndarray]:
+            if name not in weather_df.columns:
+                return None
+            return as_compute_array(weather_df[name].to_numpy())
+        
+        def measured(name: str) -> Optional[np.ndarray]:
+            values = column(name)
+            if values is None or np.isnan(values).all():
+                return None
+            return np.nan_to_num(values)
+        
+        cloud_cover = column('cloud_cover')
+        ghi = measured('ghi')
+        if ghi is None:
+            # Clear-sky GHI reduced by cloud cover
+            clear_sky_ghi = as_compute_array(self._calculate_clear_sky_ghi(weather_df.index, solar_data))
+            cloud_factor = 1 - ((cloud_cover if cloud_cover is not None else 0) / 100) * 0.8
+            ghi = as_compute_array(np.maximum(clear_sky_ghi * cloud_factor, 0))
+        
+        return {
+            'elevation': as_compute_array(solar_data['elevation']),
+            'azimuth': as_compute_array(solar_data['azimuth']),
+            'ghi': ghi, 'dni': measured('dni'), 'dhi': measured('dhi'),
+            'temperature': column('temperature'), 'wind_speed': column('wind_speed'),
+            'cloud_cover': cloud_cover
+        }
+    
+    def _fused_system(self) -> Dict:
+        """System parameters for pv_kernels.irradiance_to_ac"""
+        return {
+            'tilt': self.tilt_angle, 'panel_azimuth': self.azimuth_angle,
+            'dc_capacity_mw': self.dc_capacity_mw, 'ac_capacity_mw': self.ac_capacity_mw,
+            'temp_coefficient': self.temp_coefficient
+        }
+    
+    def _calculate_ac_power_fused(self, weather_df: pd.DataFrame,
+                                  solar_data: pd.DataFrame,
+                                  positions: Optional[np.ndarray] = None) -> pd.Series:
+        """Calculate AC power with the fused array kernel (same physics as the pandas path)
+        
+        positions (horizon position of each row) selects the matching entries of the
+        seeded noise sequence when weather_df holds rows gathered from the full horizon.
+        """
+        inputs = self._fused_inputs(weather_df, solar_data)
+        cloud_cover = inputs['cloud_cover']
+        ac_power = irradiance_to_ac(**inputs, **self._fused_system())
+        
+        # Cloud-induced fluctuations use the same seeded noise as _apply_cloud_dynamics
+        if cloud_cover is not None:
+            np.random.seed(42)  # For reproducible results
+            if positions is None:
+                standard_noise = np.random.standard_normal(len(ac_power))
+            else:
+                standard_noise = np.random.standard_normal(positions[-1] + 1)[positions]
+            noise = (standard_noise * ((cloud_cover / 100) * 0.3)).astype(compute_dtype())
+            ac_power = apply_cloud_dynamics(ac_power, cloud_cover, noise,
+                                            self.ac_capacity_mw, self.smoothing_window)
+        
+        return pd.Series(ac_power, index=weather_df.index)
+    
     def _calculate_clear_sky_ghi(self, timestamps: pd.DatetimeIndex, 
                                 solar_data: pd.DataFrame) -> pd.Series:
         """Calculate clear-sky GHI using pvlib or simple model"""
         
+        # Precomputed clear-sky envelope from the solar table
+        if 'ghi_clear' in solar_data.columns:
+            return solar_data['ghi_clear']
+        
         if PVLIB_AVAILABLE:
             try:
                 # Use pvlib for accurate clear-sky calculations
-                clear_sky = self.pvlib_location.get_clearsky(timestamps, model='ineichen')
+                clear_sky = get_clearsky_cached(self.pvlib_location, timestamps, model='ineichen')
                 return clear_sky['ghi']
             except Exception as e:
                 logger.warning(f"pvlib clear-sky calculation failed: {e}, using simple model")
@@ -281,22 +452,8 @@ class IntradaySolarForecastModel:
         
         This accounts for the tilt and orientation of the solar panels.
         """
-        # Convert angles to radians
-        tilt_rad = np.radians(self.tilt_angle)
-        azimuth_rad = np.radians(self.azimuth_angle)
-        
-        # Solar angles in radians
+        # Solar elevation in radians
         solar_elevation_rad = np.radians(solar_data['elevation'])
-        solar_azimuth_rad = np.radians(solar_data['azimuth'])
-        
-        # Calculate angle of incidence (AOI) between sun and panel normal
-        # Using the cosine of angle formula for tilted surfaces
-        cos_aoi = (np.sin(solar_elevation_rad) * np.cos(tilt_rad) +
-                   np.cos(solar_elevation_rad) * np.sin(tilt_rad) * 
-                   np.cos(solar_azimuth_rad - azimuth_rad))
-        
-        # Ensure cos_aoi is between -1 and 1 (numerical stability)
-        cos_aoi = np.clip(cos_aoi, -1, 1)
         
         # Direct beam component estimation
         # Estimate DNI from GHI (simplified approach)
@@ -329,22 +486,13 @@ class IntradaySolarForecastModel:
             dhi = ghi - dni * np.sin(solar_elevation_rad)
             dhi = np.clip(dhi, 0, ghi)
         
-        # Calculate POA irradiance
-        # Direct beam on tilted surface
-        poa_direct = dni * np.maximum(cos_aoi, 0)
-        
-        # Diffuse on tilted surface (isotropic sky model)
-        poa_diffuse = dhi * (1 + np.cos(tilt_rad)) / 2
-        
-        # Ground reflected component (albedo)
-        albedo = 0.25  # Increased for typical solar farm surroundings (was 0.2)
-        poa_reflected = ghi * albedo * (1 - np.cos(tilt_rad)) / 2
-        
-        # Total POA irradiance
-        poa_total = poa_direct + poa_diffuse + poa_reflected
-        
-        # Ensure non-negative and reasonable values
-        poa_total = np.clip(poa_total, 0, 1200)  # Max POA around 1200 W/m²
+        # POA = direct beam on tilted surface + isotropic diffuse + ground reflected
+        # Albedo 0.25 for typical solar farm surroundings (was 0.2); POA clipped at 1200 W/m²
+        poa_total = poa_transposition(
+            solar_data['elevation'].to_numpy(dtype=float), solar_data['azimuth'].to_numpy(dtype=float),
+            np.asarray(ghi, dtype=float), np.asarray(dni, dtype=float), np.asarray(dhi, dtype=float),
+            tilt=self.tilt_angle, panel_azimuth=self.azimuth_angle, albedo=0.25
+        )
         
         return pd.Series(poa_total, index=ghi.index)
     
@@ -474,8 +622,21 @@ class IntradaySolarForecastModel:
         return ac_power_smoothed.clip(lower=0, upper=self.ac_capacity_mw)
     
     def _apply_realtime_calibration(self, ac_power: pd.Series, 
-                                  current_conditions: Dict) -> pd.Series:
+                                  current_conditions: Dict,
+                                  positions: Optional[np.ndarray] = None) -> pd.Series:
         """Apply real-time calibration based on current conditions"""
+        calibration_factor = self._realtime_calibration_factor(current_conditions)
+        
+        # Apply calibration to first few hours (assumes current conditions persist)
+        if positions is None:
+            positions = np.arange(len(ac_power))
+        ac_power_calibrated = ac_power.copy()
+        ac_power_calibrated[positions < REALTIME_CALIBRATION_INTERVALS] *= calibration_factor
+        
+        return ac_power_calibrated
+    
+    def _realtime_calibration_factor(self, current_conditions: Dict) -> float:
+        """Calibration factor for the first hours of the forecast"""
         
         # This is where you would calibrate against actual measurements
         # For now, we'll apply a simple adjustment based on current weather
@@ -493,33 +654,18 @@ class IntradaySolarForecastModel:
         else:
             calibration_factor = 1.0
         
-        # Apply calibration to first few hours (assumes current conditions persist)
-        calibration_window = min(16, len(ac_power))  # 4 hours at 15-min resolution
-        ac_power_calibrated = ac_power.copy()
-        ac_power_calibrated[:calibration_window] *= calibration_factor
-        
-        return ac_power_calibrated
+        return calibration_factor
     
     def _generate_uncertainty_bands(self, ac_power: pd.Series,
-                                  weather_df: pd.DataFrame) -> pd.DataFrame:
+                                  weather_df: pd.DataFrame,
+                                  positions: Optional[np.ndarray] = None) -> pd.DataFrame:
         """Generate uncertainty bands for risk management"""
 
         predictions = pd.DataFrame(index=ac_power.index)
         # Convert MW to kW
         predictions['production_kw'] = ac_power * 1000
         
-        # Base uncertainty depends on forecast horizon
-        hours_ahead = np.arange(len(ac_power)) * (INTRADAY_RESOLUTION_MINUTES / 60)
-        base_uncertainty = 0.05 + 0.02 * (hours_ahead / 24)  # 5-19% uncertainty
-        
-        # Weather-dependent uncertainty
-        if 'cloud_cover' in weather_df.columns:
-            weather_uncertainty = weather_df['cloud_cover'] / 100 * 0.15  # Up to 15% for full clouds
-        else:
-            weather_uncertainty = 0.1  # Default 10%
-        
-        # Combine uncertainties
-        total_uncertainty = np.sqrt(base_uncertainty**2 + weather_uncertainty**2)
+        total_uncertainty = self._relative_uncertainty(weather_df, positions)
 
         # Generate quantiles (in kW)
         predictions['q10'] = ac_power * 1000 * (1 - 2 * total_uncertainty)
@@ -528,22 +674,30 @@ class IntradaySolarForecastModel:
         predictions['q75'] = ac_power * 1000 * (1 + total_uncertainty)
         predictions['q90'] = ac_power * 1000 * (1 + 2 * total_uncertainty)
 
-        # Ensure physical constraints
-        for col in ['q10', 'q25', 'q50', 'q75', 'q90']:
-            predictions[col] = predictions[col].clip(lower=0, upper=self.capacity_kw)
-        
-        # Ensure quantile ordering
-        for i in range(len(predictions)):
-            row = predictions.iloc[i]
-            sorted_values = sorted([row['q10'], row['q25'], row['q50'], row['q75'], row['q90']])
-            predictions.iloc[i, predictions.columns.get_loc('q10')] = sorted_values[0]
-            predictions.iloc[i, predictions.columns.get_loc('q25')] = sorted_values[1]
-            predictions.iloc[i, predictions.columns.get_loc('q50')] = sorted_values[2]
-            predictions.iloc[i, predictions.columns.get_loc('q75')] = sorted_values[3]
-            predictions.iloc[i, predictions.columns.get_loc('q90')] = sorted_values[4]
+        # Ensure physical constraints and quantile ordering
+        cast_float_columns(predictions)
+        order_quantile_columns(predictions, upper=self.capacity_kw)
         
         return predictions
     
+    def _relative_uncertainty(self, weather_df: pd.DataFrame, positions: Optional[np.ndarray] = None):
+        """Relative forecast uncertainty per interval (horizon and weather components combined)"""
+        
+        # Base uncertainty depends on forecast horizon
+        if positions is None:
+            positions = np.arange(len(weather_df))
+        hours_ahead = positions * (INTRADAY_RESOLUTION_MINUTES / 60)
+        base_uncertainty = 0.05 + 0.02 * (hours_ahead / 24)  # 5-19% uncertainty
+        
+        # Weather-dependent uncertainty
+        if 'cloud_cover' in weather_df.columns:
+            weather_uncertainty = weather_df['cloud_cover'] / 100 * 0.15  # Up to 15% for full clouds
+        else:
+            weather_uncertainty = 0.1  # Default 10%
+        
+        # Combine uncertainties
+        return np.sqrt(base_uncertainty**2 + weather_uncertainty**2)
+    
     def aggregate_to_hourly(self, predictions_15min: pd.DataFrame) -> pd.DataFrame:
         """Aggregate 15-minute predictions to hourly resolution"""
 
@@ -565,8 +719,10 @@ class IntradaySolarForecastModel:
             if col in predictions_15min.columns:
                 agg_methods[col] = 'sum'
         
-        # Resample to hourly
-        hourly = predictions_15min.resample('h').agg(agg_methods)
+        # Reduce to hourly (accumulating in float64 even for float32 forecasts)
+        predictions = predictions_15min[list(agg_methods)].astype(accumulation_dtype())
+        levels = aggregate_levels(predictions, [60], agg_methods)
+        hourly = levels[60] if levels is not None else predictions.resample('h').agg(agg_methods)
         
         # Add metadata
         hourly['location'] = self.location_key
@@ -20,13 +20,14 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from config import (
     LOCATIONS, INTRADAY_FORECAST_DAYS, INTRADAY_RESOLUTION_MINUTES,
-    INTRADAY_UPDATE_FREQUENCY_HOURS, AGGREGATION_LEVELS,
+    INTRADAY_UPDATE_FREQUENCY_HOURS, INTRADAY_INCREMENTAL_UPDATES, AGGREGATION_LEVELS,
     LOG_LEVEL, LOG_FORMAT
 )
 from intraday_weather_fetcher import IntradayWeatherFetcher
 from intraday_forecast_model import IntradaySolarForecastModel
 from smart_persistence_model import SmartPersistenceModel
 from intraday_aggregator import IntradayDataAggregator
+from forecast_archive import ForecastArchive
 from forecast_comparison import ForecastComparison
 from export_weather_parameters import export_weather_parameters
 
@@ -68,6 +69,9 @@ class EnhancedIntradayForecastingSystem:
         if model_type == 'comparison':
             self.comparison = ForecastComparison(location_key)
         
+        # Re-forecast only changed weather intervals on hourly updates (ml_physics model)
+        self.incremental_updates = INTRADAY_INCREMENTAL_UPDATES
+        
         # System state
         self.latest_forecast = None
         self.forecast_history = {}
@@ -80,6 +84,8 @@ class EnhancedIntradayForecastingSystem:
             'data_output', 'intraday'
         )
         os.makedirs(self.output_dir, exist_ok=True)
+        # Every run is appended to the forecast archive (latest()/as_of() lookups by issue time)
+        self.archive = ForecastArchive(location_key)
         
         logger.info(f"Enhanced intraday system initialized for {self.location_config['name']}")
         logger.info(f"Model type: {model_type}")
@@ -116,7 +122,12 @@ class EnhancedIntradayForecastingSystem:
             )
             
             # Step 2: Generate predictions based on model type
-            if self.model_type == 'ml_physics':
+            changed_timestamps = None
+            if self.model_type == 'ml_physics' and self.incremental_updates:
+                predictions_15min, changed_timestamps = self._run_ml_physics_incremental(
+                    weather_df, current_conditions
+                )
+            elif self.model_type == 'ml_physics':
                 predictions_15min = self._run_ml_physics_model(weather_df, current_conditions)
             elif self.model_type == 'smart_persistence':
                 predictions_15min = self._run_spm_model(weather_df, current_conditions)
@@ -133,19 +144,19 @@ class EnhancedIntradayForecastingSystem:
             
             # Step 3: Create multiple aggregations
             logger.info("Step 3: Creating multiple time resolutions...")
-            aggregated_forecasts = self.aggregator.aggregate_forecast(
-                forecast_to_aggregate, AGGREGATION_LEVELS
-            )
+            if changed_timestamps is not None:
+                # Re-aggregate only the buckets touched by the changed intervals
+                aggregated_forecasts = self.aggregator.update_aggregates(
+                    self.latest_forecast['forecasts'], forecast_to_aggregate, changed_timestamps
+                )
+            else:
+                aggregated_forecasts = self.aggregator.aggregate_forecast(
+                    forecast_to_aggregate, AGGREGATION_LEVELS
+                )
             
             # Step 4: Create outputs
             logger.info("Step 4: Generating outputs...")
             
-            # API format
-            api_data = self.aggregator.create_api_format(
-                aggregated_forecasts, self.location_key
-            )
-            api_data['model_type'] = self.model_type
-            
             # Trading format
             if '1hour' in aggregated_forecasts:
                 trading_data = self.aggregator.create_trading_format(
@@ -166,14 +177,16 @@ class EnhancedIntradayForecastingSystem:
             
             # CSV exports
             csv_files = self.aggregator.create_csv_exports(
-                aggregated_forecasts, self.location_key, self.output_dir
+                aggregated_forecasts, self.location_key, self.output_dir, archive=self.archive
             )
             
-            # JSON API export
+            # JSON API export, streamed with .gz/.zst siblings
             api_file = os.path.join(self.output_dir, 
                                    f"{self.location_key}_api_latest{model_suffix}.json")
-            with open(api_file, 'w') as f:
-                json.dump(api_data, f, indent=2, default=str)
+            self.aggregator.export_api_json(
+                aggregated_forecasts, self.location_key, api_file,
+                extra_fields={'model_type': self.model_type}
+            )
             
             # Trading format export
             if '1hour' in aggregated_forecasts:
@@ -192,22 +205,28 @@ class EnhancedIntradayForecastingSystem:
                 summary_report['comparison'] = comparison_report
             
             # Update system state
-            self.latest_forecast = {
+            forecast_record = {
                 'timestamp': datetime.now(pytz.UTC),
                 'forecasts': aggregated_forecasts,
-                'api_data': api_data,
+                'api_file': api_file,
                 'summary': summary_report,
                 'weather_source': weather_source,
                 'model_type': self.model_type,
                 'execution_time_seconds': time.time() - start_time
             }
+            self.latest_forecast = {
+                **forecast_record,
+                # Inputs of the next incremental update, kept for the latest run only
+                'weather': weather_df,
+                'predictions_15min': forecast_to_aggregate
+            }
             
             self.last_update = datetime.now(pytz.UTC)
             self.system_status = 'operational'
             
             # Store in history
             history_key = self.last_update.strftime('%Y%m%d_%H%M')
-            self.forecast_history[history_key] = self.latest_forecast
+            self.forecast_history[history_key] = forecast_record
             
             # Clean old history
             if len(self.forecast_history) > 48:  # Keep 48 updates
@@ -254,6 +273,25 @@ class EnhancedIntradayForecastingSystem:
         predictions['model'] = 'ml_physics'
         return predictions
     
+    def _run_ml_physics_incremental(self, weather_df: pd.DataFrame, current_conditions: Dict):
+        """Run ML/Physics model, recomputing only intervals whose weather changed
+        
+        Returns:
+            Tuple of (predictions, changed timestamps); the changed timestamps are None
+            after a full recompute
+        """
+        previous = self.latest_forecast
+        if (previous is None or previous.get('model_type') != 'ml_physics' or
+                previous.get('predictions_15min') is None):
+            return self._run_ml_physics_model(weather_df, current_conditions), None
+        
+        logger.info("Step 2: Updating 15-minute ML/Physics forecasts incrementally...")
+        predictions, changed_timestamps = self.ml_model.predict_intraday_incremental(
+            weather_df, previous['weather'], previous['predictions_15min'], current_conditions
+        )
+        predictions['model'] = 'ml_physics'
+        return predictions, changed_timestamps
+    
     def _run_spm_model(self, weather_df: pd.DataFrame, 
                       current_conditions: Dict) -> pd.DataFrame:
         """Run Smart Persistence Model"""
@@ -2,17 +2,49 @@
 Real-time weather data fetcher for intraday solar forecasting
 Supports high-frequency updates and 15-minute resolution data
 """
+import asyncio
 import pandas as pd
 import numpy as np
-import requests
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import pytz
-from config import LOCATIONS, INTRADAY_FORECAST_DAYS, INTRADAY_RESOLUTION_MINUTES
+from config import (
+    LOCATIONS, INTRADAY_FORECAST_DAYS, INTRADAY_RESOLUTION_MINUTES,
+    WEATHER_FETCH_CONCURRENCY, OPEN_METEO_BATCH_SIZE, OPEN_METEO_NATIVE_15MIN, OPEN_METEO_BASE_URL
+)
+from dtype_policy import cast_float_columns
+from weather_cache import DiskWeatherCache
+from http_client import get_http_client
+from irradiance_upsampling import upsample_irradiance
+from synthetic_weather import synthetic_weather_frame
 
 logger = logging.getLogger(__name__)
 
+# Open-Meteo hourly variables requested by the high-resolution and standard fetches
+HIGH_RES_HOURLY_VARIABLES = ('temperature_2m,shortwave_radiation,direct_normal_irradiance,'
+                             'diffuse_radiation,windspeed_10m,cloudcover,relative_humidity_2m')
+STANDARD_HOURLY_VARIABLES = 'temperature_2m,shortwave_radiation,windspeed_10m,cloudcover'
+CURRENT_VARIABLES = 'temperature_2m,cloudcover,windspeed_10m'
+
+# Weather column -> Open-Meteo variable for the hourly and native 15-minute blocks
+# (cloud cover has no minutely_15 variable and always comes from the hourly block)
+HOURLY_COLUMN_VARIABLES = {
+    'temperature': 'temperature_2m',
+    'ghi': 'shortwave_radiation',
+    'dni': 'direct_normal_irradiance',
+    'dhi': 'diffuse_radiation',
+    'wind_speed': 'windspeed_10m',
+    'cloud_cover': 'cloudcover',
+    'humidity': 'relative_humidity_2m'
+}
+MINUTELY_15_COLUMN_VARIABLES = {col: var for col, var in HOURLY_COLUMN_VARIABLES.items() if col != 'cloud_cover'}
+MINUTELY_15_VARIABLES = ','.join(MINUTELY_15_COLUMN_VARIABLES.values())
+OPEN_METEO_FORECAST_URL = f"{OPEN_METEO_BASE_URL}/v1/forecast"
+
+# Defaults used when current conditions are unavailable
+DEFAULT_CURRENT_WEATHER = {'temperature': 20, 'cloud_cover': 50, 'wind_speed': 5}
+
 
 class IntradayWeatherFetcher:
     """Real-time weather fetcher optimized for intraday operations"""
@@ -20,6 +52,19 @@ class IntradayWeatherFetcher:
     def __init__(self):
         self.cache = {}
         self.cache_expiry_minutes = 30  # Cache weather data for 30 minutes
+        self.current_expiry_minutes = 15  # Current conditions from a batched fetch stay valid for 15 minutes
+        self.native_15min = OPEN_METEO_NATIVE_15MIN
+        
+        # Pooled keep-alive session with retries, shared by all fetchers in the process
+        self.http = get_http_client()
+        self.last_sources: Dict[str, str] = {}
+        
+        # Disk cache shared across processes and runs
+        try:
+            self.disk_cache = DiskWeatherCache()
+        except OSError as e:
+            logger.warning(f"Disk weather cache unavailable: {e}")
+            self.disk_cache = None
         
     def fetch_intraday_weather(self, location_key: str) -> Tuple[pd.DataFrame, str]:
         """
@@ -40,29 +85,29 @@ class IntradayWeatherFetcher:
             logger.info(f"Using cached weather data for {location_key}")
             return self.cache[cache_key]['data'], self.cache[cache_key]['source']
         
-        # Calculate forecast period (7 days from midnight CET)
-        # Get location timezone (CET)
-        location_tz = pytz.timezone(location.get('timezone', 'Europe/Berlin'))
-        
-        # Get current time in location timezone
-        now_local = datetime.now(location_tz)
-        
-        # Start from midnight tomorrow (D+1) in local timezone
-        tomorrow_local = now_local + timedelta(days=1)
-        start_local = tomorrow_local.replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        # Convert to UTC for API calls
-        start_time = start_local.astimezone(pytz.UTC)
-        end_time = start_time + timedelta(days=INTRADAY_FORECAST_DAYS)
+        start_time, end_time = self._forecast_window(location)
         
         logger.info(f"Fetching intraday weather for {location['name']}")
         logger.info(f"Period: {start_time} to {end_time}")
         logger.info(f"Resolution: {INTRADAY_RESOLUTION_MINUTES} minutes")
         
-        # Try high-resolution weather sources
-        weather_df, source = self._fetch_high_resolution_weather(
-            location, start_time, end_time
-        )
+        # Try high-resolution weather sources (through the disk cache when available)
+        def fetch() -> Tuple[Optional[pd.DataFrame], Dict]:
+            weather_df, source = self._fetch_high_resolution_weather(location, start_time, end_time, location_key)
+            if weather_df is not None:
+                # Weather variables are stored in the compute dtype used by the models
+                cast_float_columns(weather_df)
+            return weather_df, {'source': source, 'location_key': location_key}
+        
+        if self.disk_cache is not None:
+            disk_key = self._disk_cache_key(location, start_time)
+            weather_df, metadata = self.disk_cache.get_or_fetch(disk_key, fetch)
+            if metadata.get('cache_hit'):
+                logger.info(f"Using disk-cached weather data for {location_key} "
+                            f"(fetched {metadata.get('fetched_at')})")
+        else:
+            weather_df, metadata = fetch()
+        source = metadata.get('source', 'none')
         
         if weather_df is not None:
             # Cache the result
@@ -77,7 +122,7 @@ class IntradayWeatherFetcher:
         else:
             # Fallback to synthetic weather data
             logger.warning("All weather sources failed, generating synthetic data")
-            weather_df = self._generate_synthetic_weather(location, start_time, end_time)
+            weather_df = cast_float_columns(self._generate_synthetic_weather(location, start_time, end_time))
             
             # Cache the synthetic result
             self.cache[cache_key] = {
@@ -89,16 +134,162 @@ class IntradayWeatherFetcher:
             logger.info(f"Generated {len(weather_df)} synthetic weather data points")
             return weather_df, 'synthetic'
     
+    def fetch_batch(self, location_keys: Optional[List[str]] = None,
+                    batch_size: int = OPEN_METEO_BATCH_SIZE) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Dict]]:
+        """
+        Fetch forecast and current conditions for many sites with multi-coordinate requests
+        
+        Sites are grouped into requests of up to batch_size coordinates, each returning
+        the hourly forecast and the current block for every site, so a portfolio
+        refresh takes about sites / batch_size round-trips instead of 2 per site.
+        Results populate the memory and disk caches, so later fetch_intraday_weather
+        and get_current_weather calls for these sites are served without requests.
+        Sites of a failed batch fall back to the per-site methods.
+        
+        Args:
+            location_keys: Sites to fetch (default: all LOCATIONS)
+            batch_size: Maximum coordinates per request
+        
+        Returns:
+            Tuple of (location_key -> 15-minute weather DataFrame,
+                      location_key -> current conditions dictionary)
+        """
+        location_keys = list(location_keys) if location_keys else list(LOCATIONS.keys())
+        unknown = [key for key in location_keys if key not in LOCATIONS]
+        if unknown:
+            raise ValueError(f"Locations {unknown} not found in configuration")
+        
+        weather_frames = {}
+        current_conditions = {}
+        for batch_start in range(0, len(location_keys), batch_size):
+            batch = location_keys[batch_start:batch_start + batch_size]
+            locations = [LOCATIONS[key] for key in batch]
+            params = {
+                'latitude': ','.join(str(location['latitude']) for location in locations),
+                'longitude': ','.join(str(location['longitude']) for location in locations),
+                'hourly': HIGH_RES_HOURLY_VARIABLES,
+                'current': CURRENT_VARIABLES,
+                'timezone': 'UTC',
+                'forecast_days': 7
+            }
+            if self.native_15min:
+                params['minutely_15'] = MINUTELY_15_VARIABLES
+            
+            try:
+                data = self.http.get_json(OPEN_METEO_FORECAST_URL, params=params, timeout=30)
+                # A single coordinate returns an object, several return a list in request order
+                site_data = data if isinstance(data, list) else [data]
+                if len(site_data) != len(batch):
+                    raise ValueError(f"expected {len(batch)} locations, got {len(site_data)}")
+            except Exception as e:
+                logger.warning(f"Batched Open-Meteo request for {len(batch)} sites failed: {e}")
+                for location_key in batch:
+                    weather_frames[location_key], _ = self.fetch_intraday_weather(location_key)
+                    current_conditions[location_key] = self.get_current_weather(location_key)
+                continue
+            
+            now = datetime.now(pytz.UTC)
+            for location_key, location, response in zip(batch, locations, site_data):
+                start_time, _ = self._forecast_window(location)
+                current_conditions[location_key] = self._parse_current(response.get('current', {}))
+                self.cache[f"{location_key}_current"] = {
+                    'data': current_conditions[location_key],
+                    'timestamp': now
+                }
+                
+                weather_df, source = self._response_to_frame(response, location, start_time, location_key)
+                if weather_df is None:
+                    logger.warning(f"No forecast data for {location_key} in batched response")
+                    weather_frames[location_key], _ = self.fetch_intraday_weather(location_key)
+                    continue
+                
+                weather_df = cast_float_columns(weather_df)
+                weather_frames[location_key] = weather_df
+                self.cache[f"{location_key}_intraday"] = {
+                    'data': weather_df,
+                    'source': source,
+                    'timestamp': now
+                }
+                if self.disk_cache is not None:
+                    self.disk_cache.put(self._disk_cache_key(location, start_time), weather_df,
+                                        {'source': source, 'location_key': location_key})
+        
+        logger.info(f"Fetched weather for {len(location_keys)} sites in "
+                    f"{-(-len(location_keys) // batch_size)} batched request(s)")
+        return weather_frames, current_conditions
+    
+    async def fetch_many_async(self, location_keys: Optional[List[str]] = None,
+                               max_concurrency: int = WEATHER_FETCH_CONCURRENCY) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch intraday weather for many sites concurrently
+        
+        Each site runs fetch_intraday_weather (memory/disk cache, fallbacks) in a worker
+        thread; the shared HTTP client's token bucket keeps the combined request rate
+        within the Open-Meteo quota.
+        
+        Args:
+            location_keys: Sites to fetch (default: all LOCATIONS)
+            max_concurrency: Maximum number of sites fetched at the same time
+        
+        Returns:
+            Dictionary of location_key -> weather DataFrame, in the order requested.
+            The source of each frame is stored in self.last_sources.
+        """
+        location_keys = list(location_keys) if location_keys else list(LOCATIONS.keys())
+        unknown = [key for key in location_keys if key not in LOCATIONS]
+        if unknown:
+            raise ValueError(f"Locations {unknown} not found in configuration")
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def fetch_site(location_key: str) -> Tuple[pd.DataFrame, str]:
+            async with semaphore:
+                return await asyncio.to_thread(self.fetch_intraday_weather, location_key)
+        
+        start = datetime.now(pytz.UTC)
+        results = await asyncio.gather(*(fetch_site(key) for key in location_keys))
+        elapsed = (datetime.now(pytz.UTC) - start).total_seconds()
+        
+        self.last_sources = {key: source for key, (_, source) in zip(location_keys, results)}
+        logger.info(f"Fetched weather for {len(location_keys)} sites in {elapsed:.1f}s "
+                    f"(concurrency {max_concurrency})")
+        return {key: weather_df for key, (weather_df, _) in zip(location_keys, results)}
+    
+    def fetch_many(self, location_keys: Optional[List[str]] = None,
+                   max_concurrency: int = WEATHER_FETCH_CONCURRENCY) -> Dict[str, pd.DataFrame]:
+        """Synchronous wrapper around fetch_many_async for callers without an event loop"""
+        return asyncio.run(self.fetch_many_async(location_keys, max_concurrency))
+    
+    @staticmethod
+    def _forecast_window(location: Dict) -> Tuple[datetime, datetime]:
+        """Forecast period in UTC: INTRADAY_FORECAST_DAYS from local midnight tomorrow (D+1)"""
+        location_tz = pytz.timezone(location.get('timezone', 'Europe/Berlin'))
+        
+        # Start from midnight tomorrow (D+1) in local timezone
+        tomorrow_local = datetime.now(location_tz) + timedelta(days=1)
+        start_local = tomorrow_local.replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        # Convert to UTC for API calls
+        start_time = start_local.astimezone(pytz.UTC)
+        return start_time, start_time + timedelta(days=INTRADAY_FORECAST_DAYS)
+    
+    def _disk_cache_key(self, location: Dict, start_time: datetime) -> str:
+        variables = HIGH_RES_HOURLY_VARIABLES
+        if self.native_15min:
+            variables = f"{MINUTELY_15_VARIABLES}|{variables}"
+        return self.disk_cache.make_key(location, variables, start=start_time.isoformat())
+    
     def _fetch_high_resolution_weather(self, location: Dict, 
                                      start_time: datetime, 
-                                     end_time: datetime) -> Tuple[Optional[pd.DataFrame], str]:
+                                     end_time: datetime,
+                                     location_key: Optional[str] = None) -> Tuple[Optional[pd.DataFrame], str]:
         """Fetch high-resolution weather data"""
         
         # Try Open-Meteo with high resolution first
         try:
-            weather_df = self._fetch_openmeteo_high_res(location, start_time, end_time)
+            weather_df, source = self._fetch_openmeteo_high_res(location, start_time, end_time, location_key)
             if weather_df is not None:
-                return weather_df, 'open_meteo_high_res'
+                return weather_df, source
         except Exception as e:
             logger.warning(f"Open-Meteo high-res failed: {e}")
         
@@ -107,7 +298,7 @@ class IntradayWeatherFetcher:
             weather_df = self._fetch_openmeteo_standard(location, start_time, end_time)
             if weather_df is not None:
                 # Interpolate to 15-minute resolution
-                weather_df = self._interpolate_to_15min(weather_df)
+                weather_df = self._interpolate_to_15min(weather_df, location, location_key)
                 return weather_df, 'open_meteo_interpolated'
         except Exception as e:
             logger.warning(f"Open-Meteo standard failed: {e}")
@@ -116,72 +307,105 @@ class IntradayWeatherFetcher:
     
     def _fetch_openmeteo_high_res(self, location: Dict, 
                                 start_time: datetime, 
-                                end_time: datetime) -> Optional[pd.DataFrame]:
-        """Fetch data from Open-Meteo with 15-minute resolution"""
-        
-        url = "https://api.open-meteo.com/v1/forecast"
+                                end_time: datetime,
+                                location_key: Optional[str] = None) -> Tuple[Optional[pd.DataFrame], str]:
+        """Fetch data from Open-Meteo with 15-minute resolution (native minutely_15 when enabled)"""
         
         params = {
             'latitude': location['latitude'],
             'longitude': location['longitude'],
-            'hourly': 'temperature_2m,shortwave_radiation,direct_normal_irradiance,diffuse_radiation,windspeed_10m,cloudcover,relative_humidity_2m',
+            'hourly': HIGH_RES_HOURLY_VARIABLES,
             'timezone': 'UTC',
             'forecast_days': 7
         }
+        if self.native_15min:
+            params['minutely_15'] = MINUTELY_15_VARIABLES
         
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
+        data = self.http.get_json(OPEN_METEO_FORECAST_URL, params=params, timeout=30)
         
-        data = response.json()
-        
-        if 'hourly' not in data:
-            return None
-        
-        hourly = data['hourly']
-        
-        # Create DataFrame
-        timestamps = pd.to_datetime(hourly['time'], utc=True)
-        
-        weather_df = pd.DataFrame({
-            'timestamp': timestamps,
-            'temperature': hourly.get('temperature_2m', [np.nan] * len(timestamps)),
-            'ghi': hourly.get('shortwave_radiation', [np.nan] * len(timestamps)),
-            'dni': hourly.get('direct_normal_irradiance', [np.nan] * len(timestamps)),
-            'dhi': hourly.get('diffuse_radiation', [np.nan] * len(timestamps)),
-            'wind_speed': hourly.get('windspeed_10m', [np.nan] * len(timestamps)),
-            'cloud_cover': hourly.get('cloudcover', [np.nan] * len(timestamps)),
-            'humidity': hourly.get('relative_humidity_2m', [np.nan] * len(timestamps))
-        })
+        return self._response_to_frame(data, location, start_time, location_key)
+    
+    def _response_to_frame(self, data: Dict, location: Dict, start_time: datetime,
+                           location_key: Optional[str] = None) -> Tuple[Optional[pd.DataFrame], str]:
+        """15-minute weather DataFrame and source from an Open-Meteo response (None if it has no forecast)"""
+        if data.get('minutely_15'):
+            weather_df = self._minutely_15_to_frame(data['minutely_15'], data.get('hourly'), location, start_time,
+                                                    location_key)
+            if weather_df is None:
+                logger.warning(f"No minutely_15 data from {start_time} onwards")
+                return None, 'none'
+            return weather_df, 'open_meteo_15min'
+        if 'hourly' in data:
+            return self._hourly_to_frame(data['hourly'], location, start_time, location_key), 'open_meteo_high_res'
+        return None, 'none'
+    
+    @staticmethod
+    def _block_to_frame(block: Dict, column_variables: Dict[str, str]) -> pd.DataFrame:
+        """DataFrame of an Open-Meteo time block (missing variables and null values become NaN)"""
+        timestamps = pd.to_datetime(block['time'], utc=True)
+        nan_column = [np.nan] * len(timestamps)
+        return pd.DataFrame({
+            column: np.array(block.get(variable) or nan_column, dtype=float)
+            for column, variable in column_variables.items()
+        }, index=pd.DatetimeIndex(timestamps, name='timestamp'))
+    
+    def _hourly_to_frame(self, hourly: Dict, location: Dict, start_time: datetime,
+                         location_key: Optional[str] = None) -> pd.DataFrame:
+        """Convert an Open-Meteo high-res hourly block to a 15-minute weather DataFrame"""
         
-        weather_df = weather_df.set_index('timestamp')
+        weather_df = self._block_to_frame(hourly, HOURLY_COLUMN_VARIABLES)
         
         # Filter to only include data from start_time onwards
         weather_df = weather_df[weather_df.index >= start_time]
         
         # Interpolate to 15-minute resolution
-        weather_df = self._interpolate_to_15min(weather_df)
+        weather_df = self._interpolate_to_15min(weather_df, location, location_key)
         
         return weather_df
     
+    def _minutely_15_to_frame(self, minutely: Dict, hourly: Optional[Dict],
+                              location: Dict, start_time: datetime,
+                              location_key: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """
+        Weather DataFrame from native 15-minute NWP values (None when no value is at or after start_time)
+        
+        Only variables without native values (cloud cover) or with gaps are
+        filled from the interpolated hourly block.
+        """
+        weather_df = self._block_to_frame(minutely, MINUTELY_15_COLUMN_VARIABLES)
+        weather_df = weather_df[weather_df.index >= start_time]
+        if weather_df.empty:
+            return None
+        
+        missing = [col for col in HOURLY_COLUMN_VARIABLES
+                   if col not in weather_df.columns or weather_df[col].isna().any()]
+        if missing and hourly:
+            hourly_df = self._block_to_frame(hourly, {col: HOURLY_COLUMN_VARIABLES[col] for col in missing})
+            hourly_df = hourly_df[hourly_df.index >= start_time]
+            if len(hourly_df):
+                interpolated = self._interpolate_to_15min(hourly_df, location, location_key).reindex(weather_df.index)
+                for col in missing:
+                    weather_df[col] = (weather_df[col].fillna(interpolated[col])
+                                       if col in weather_df.columns else interpolated[col])
+            logger.debug(f"Filled {missing} from hourly data")
+        
+        # Same column order as the hourly path; remaining gaps (horizon edges) are padded
+        return weather_df.reindex(columns=list(HOURLY_COLUMN_VARIABLES)).ffill().bfill()
+    
     def _fetch_openmeteo_standard(self, location: Dict, 
                                 start_time: datetime, 
                                 end_time: datetime) -> Optional[pd.DataFrame]:
         """Fallback: fetch standard hourly data"""
         
-        url = "https://api.open-meteo.com/v1/forecast"
-        
         params = {
             'latitude': location['latitude'],
             'longitude': location['longitude'],
-            'hourly': 'temperature_2m,shortwave_radiation,windspeed_10m,cloudcover',
+            'hourly': STANDARD_HOURLY_VARIABLES,
             'timezone': 'UTC',
             'forecast_days': 7
         }
         
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        
-        data = response.json()
+        data = self.http.get_json(OPEN_METEO_FORECAST_URL, params=params, timeout=30)
         
         if 'hourly' not in data:
             return None
@@ -207,7 +431,8 @@ class IntradayWeatherFetcher:
         
         return weather_df
     
-    def _interpolate_to_15min(self, hourly_df: pd.DataFrame) -> pd.DataFrame:
+    def _interpolate_to_15min(self, hourly_df: pd.DataFrame, location: Dict,
+                              location_key: Optional[str] = None) -> pd.DataFrame:
         """Interpolate hourly data to 15-minute resolution"""
         
         # Create 15-minute index
@@ -229,37 +454,23 @@ class IntradayWeatherFetcher:
                 # Linear interpolation for smooth variables
                 interpolated_df[col] = interpolated_df[col].interpolate(method='linear')
             elif col in ['ghi', 'dni', 'dhi']:
-                # Special handling for solar irradiance
-                interpolated_df[col] = self._interpolate_solar_irradiance(
-                    interpolated_df[col], new_index
-                )
+                # Solar irradiance is interpolated through the clear-sky index below
+                continue
             else:
                 # Forward fill for discrete variables like cloud cover
                 interpolated_df[col] = interpolated_df[col].ffill()
         
+        irradiance_columns = [col for col in ['ghi', 'dni', 'dhi'] if col in hourly_df.columns]
+        if irradiance_columns:
+            interpolated_df[irradiance_columns] = upsample_irradiance(
+                hourly_df[irradiance_columns], new_index, location, location_key=location_key
+            )
+        
         # Fill any remaining NaN values
         interpolated_df = interpolated_df.ffill().bfill()
         
         return interpolated_df
     
-    def _interpolate_solar_irradiance(self, irradiance_series: pd.Series, 
-                                    timestamps: pd.DatetimeIndex) -> pd.Series:
-        """Special interpolation for solar irradiance considering sun position"""
-        
-        # Fill NaN values first
-        filled_series = irradiance_series.ffill().fillna(0)
-        
-        # For nighttime hours, set irradiance to 0
-        for i, ts in enumerate(timestamps):
-            hour = ts.hour
-            if hour < 6 or hour > 20:  # Rough nighttime hours
-                filled_series.iloc[i] = 0
-        
-        # Linear interpolation for daytime
-        filled_series = filled_series.interpolate(method='linear')
-        
-        return filled_series
-    
     def _is_cache_valid(self, cache_key: str) -> bool:
         """Check if cached data is still valid"""
         if cache_key not in self.cache:
@@ -275,107 +486,39 @@ class IntradayWeatherFetcher:
         
         location = LOCATIONS[location_key]
         
+        # Conditions from a recent batched fetch
+        cached = self.cache.get(f"{location_key}_current")
+        if cached and (datetime.now(pytz.UTC) - cached['timestamp']).total_seconds() < self.current_expiry_minutes * 60:
+            return dict(cached['data'])
+        
         try:
-            url = "https://api.open-meteo.com/v1/forecast"
             params = {
                 'latitude': location['latitude'],
                 'longitude': location['longitude'],
-                'current': ['temperature_2m', 'cloudcover', 'windspeed_10m'],
+                'current': CURRENT_VARIABLES,
                 'timezone': 'UTC'
             }
             
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            current = data.get('current', {})
-            
-            return {
-                'temperature': current.get('temperature_2m', 20),
-                'cloud_cover': current.get('cloudcover', 50),
-                'wind_speed': current.get('windspeed_10m', 5),
-                'timestamp': datetime.now(pytz.UTC)
-            }
+            data = self.http.get_json(OPEN_METEO_FORECAST_URL, params=params, timeout=10)
+            return self._parse_current(data.get('current', {}))
             
         except Exception as e:
             logger.error(f"Failed to get current weather: {e}")
             # Return default values
-            return {
-                'temperature': 20,
-                'cloud_cover': 50,
-                'wind_speed': 5,
-                'timestamp': datetime.now(pytz.UTC)
-            }
+            return {**DEFAULT_CURRENT_WEATHER, 'timestamp': datetime.now(pytz.UTC)}
+    
+    @staticmethod
+    def _parse_current(current: Dict) -> Dict:
+        """Current conditions dictionary from an Open-Meteo current block"""
+        return {
+            'temperature': current.get('temperature_2m', DEFAULT_CURRENT_WEATHER['temperature']),
+            'cloud_cover': current.get('cloudcover', DEFAULT_CURRENT_WEATHER['cloud_cover']),
+            'wind_speed': current.get('windspeed_10m', DEFAULT_CURRENT_WEATHER['wind_speed']),
+            'timestamp': datetime.now(pytz.UTC)
+        }
     
     def _generate_synthetic_weather(self, location: Dict, 
                                   start_time: datetime, 
                                   end_time: datetime) -> pd.DataFrame:
         """Generate synthetic weather data as fallback"""
-        
-        # Create 15-minute timestamp index
-        freq_str = f'{INTRADAY_RESOLUTION_MINUTES}min'
-        timestamps = pd.date_range(start=start_time, end=end_time, freq=freq_str, tz='UTC')
-        
-        weather_df = pd.DataFrame(index=timestamps)
-        
-        # Generate realistic synthetic weather patterns
-        lat = location['latitude']
-        
-        for i, ts in enumerate(timestamps):
-            hour = ts.hour
-            day_of_year = ts.dayofyear
-            
-            # Temperature pattern (seasonal + diurnal)
-            seasonal_temp = 15 + 10 * np.sin((day_of_year - 80) * 2 * np.pi / 365)
-            diurnal_temp = 8 * np.sin((hour - 6) * np.pi / 12)
-            noise_temp = np.random.normal(0, 2)
-            temperature = seasonal_temp + diurnal_temp + noise_temp
-            
-            # Solar irradiance (proper solar position calculation)
-            # Calculate actual solar elevation for this timestamp
-            lat_rad = np.radians(lat)
-            
-            # Solar declination
-            declination = 23.45 * np.sin(np.radians((360 * (284 + day_of_year)) / 365))
-            decl_rad = np.radians(declination)
-            
-            # Hour angle (approximate, using UTC time)
-            hour_angle = 15 * (hour + location['longitude'] / 15 - 12)
-            hour_angle_rad = np.radians(hour_angle)
-            
-            # Solar elevation
-            solar_elevation = np.degrees(np.arcsin(
-                np.sin(lat_rad) * np.sin(decl_rad) +
-                np.cos(lat_rad) * np.cos(decl_rad) * np.cos(hour_angle_rad)
-            ))
-            
-            if solar_elevation > 0:
-                # Clear sky GHI model
-                air_mass = 1 / (np.sin(np.radians(solar_elevation)) + 
-                               0.50572 * (solar_elevation + 6.07995) ** -1.6364)
-                clear_sky_ghi = 1361 * np.sin(np.radians(solar_elevation)) * 0.7 ** air_mass
-                
-                # Add cloud variability
-                cloud_factor = 0.7 + 0.3 * np.random.random()
-                ghi = clear_sky_ghi * cloud_factor
-            else:
-                ghi = 0
-            
-            # Wind speed
-            wind_speed = 3 + 4 * np.random.random()
-            
-            # Cloud cover
-            cloud_cover = 30 + 40 * np.random.random()
-            
-            # Humidity
-            humidity = 50 + 30 * np.random.random()
-            
-            weather_df.loc[ts, 'temperature'] = temperature
-            weather_df.loc[ts, 'ghi'] = max(0, ghi)
-            weather_df.loc[ts, 'dni'] = max(0, ghi * 0.7) if ghi > 0 else 0
-            weather_df.loc[ts, 'dhi'] = max(0, ghi * 0.3) if ghi > 0 else 0
-            weather_df.loc[ts, 'wind_speed'] = wind_speed
-            weather_df.loc[ts, 'cloud_cover'] = cloud_cover
-            weather_df.loc[ts, 'humidity'] = humidity
-        
-        return weather_df
\ No newline at end of file
+        return synthetic_weather_frame(location, start_time, end_time, INTRADAY_RESOLUTION_MINUTES)
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+Streaming JSON output with precompressed siblings
+Writes a JSON document piece by piece to the plain file and its .gz/.zst
+siblings in one pass, so large payloads never need to be held in memory
+
+orjson is used for serialization when installed (standard json otherwise); both
+write NumPy scalars as JSON numbers and NaN and infinity as null, so the output
+does not depend on the extra. zstd
+compression uses pyarrow's codec. Files are written to temporary names and
+renamed on success, so readers never see a partial document.
+"""
+import os
+import gzip
+import json
+import math
+import logging
+import numpy as np
+from typing import Any, Optional, Sequence
+
+# Try importing orjson for fast serialization
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Try importing pyarrow for zstd compression
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from config import API_JSON_COMPRESSION
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+
+def _default(value: Any) -> Any:
+    """Serializer fallback: NumPy scalars and arrays as Python values, anything else as str"""
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    return str(value)
+
+
+def _finite(value: Any) -> Any:
+    """Copy of a JSON value with NaN and infinity replaced by None (as orjson writes them)"""
+    if isinstance(value, (np.generic, np.ndarray)):
+        value = value.tolist()
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Compact JSON bytes (orjson when available)
+
+    NumPy scalars and arrays become numbers and lists, NaN/infinity null and
+    other non-serializable values str.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    try:
+        text = json.dumps(value, separators=(',', ':'), default=_default, allow_nan=False)
+    except ValueError:
+        text = json.dumps(_finite(value), separators=(',', ':'), default=_default)
+    return text.encode('utf-8')
+
+
+class StreamingJsonWriter:
+    """
+    Write raw JSON fragments to a file and its compressed siblings
+
+    Use as a context manager; the files are published when the block exits
+    without an exception and discarded otherwise.
+    """
+
+    def __init__(self, path: str, compression: Optional[Sequence[str]] = None):
+        compression = API_JSON_COMPRESSION if compression is None else compression
+        self._outputs = [(None, path)]
+        for codec in compression:
+            if codec not in COMPRESSION_SUFFIXES:
+                raise ValueError(f"Unsupported compression: {codec}")
+            if codec == 'zstd' and not PYARROW_AVAILABLE:
+                logger.warning("pyarrow not installed, skipping zstd output")
+                continue
+            self._outputs.append((codec, path + COMPRESSION_SUFFIXES[codec]))
+        self.paths = [output_path for _, output_path in self._outputs]
+        self._tmp_paths = [f"{output_path}.tmp.{os.getpid()}" for output_path in self.paths]
+        self._sinks = []
+        self.bytes_written = 0
+
+    def __enter__(self) -> 'StreamingJsonWriter':
+        os.makedirs(os.path.dirname(os.path.abspath(self.paths[0])), exist_ok=True)
+        for (codec, _), tmp_path in zip(self._outputs, self._tmp_paths):
+            if codec is None:
+                self._sinks.append(open(tmp_path, 'wb'))
+            elif codec == 'gzip':
+                self._sinks.append(gzip.open(tmp_path, 'wb', compresslevel=6))
+            else:
+                self._sinks.append(pa.CompressedOutputStream(tmp_path, 'zstd'))
+        return self
+
+    def write(self, data: bytes):
+        """Write a raw JSON fragment to every output"""
+        for sink in self._sinks:
+            sink.write(data)
+        self.bytes_written += len(data)
+
+    def write_value(self, value: Any):
+        """Serialize and write one JSON value"""
+        self.write(dumps(value))
+
+    def __exit__(self, exc_type, exc, traceback):
+        for sink in self._sinks:
+            sink.close()
+        if exc_type is None:
+            for tmp_path, path in zip(self._tmp_paths, self.paths):
+                os.replace(tmp_path, path)
+        else:
+            for tmp_path in self._tmp_paths:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+        return False
+
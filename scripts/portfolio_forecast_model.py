@@ -0,0 +1,221 @@
+"""
+Batched multi-site solar forecasting for the whole LOCATIONS portfolio
+Evaluates the intraday physics chain for sites x time in one broadcasted pass
+
+Per-site parameters (tilt, azimuth, DC/AC capacity, performance ratio) are held as
+column vectors of shape (sites, 1) so every operation broadcasts against the
+(sites, time) weather arrays. Output is a sites x time x quantile tensor in kW.
+Without noise, each site's forecast equals IntradaySolarForecastModel's
+deterministic forecast for that site.
+"""
+import numpy as np
+import pandas as pd
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import pytz
+
+from config import (
+    LOCATIONS, QUANTILES, INTRADAY_RESOLUTION_MINUTES, TEMPERATURE_COEFFICIENT
+)
+from solar_geometry import solar_position_arrays, to_unix_seconds
+from forecast_quantiles import quantile_columns, sort_quantiles
+from pv_kernels import irradiance_to_ac, apply_cloud_dynamics
+from irradiance_upsampling import clear_sky_irradiance
+from dtype_policy import compute_dtype, accumulation_dtype
+
+logger = logging.getLogger(__name__)
+
+# Uncertainty multipliers per quantile level (same bands as IntradaySolarForecastModel)
+UNCERTAINTY_MULTIPLIERS = {0.1: -2.0, 0.25: -1.0, 0.5: 0.0, 0.75: 1.0, 0.9: 2.0}
+
+WEATHER_VARIABLES = ['temperature', 'ghi', 'dni', 'dhi', 'wind_speed', 'cloud_cover', 'humidity']
+
+
+def stack_weather_frames(weather_frames: Dict[str, pd.DataFrame]) -> Tuple[pd.DatetimeIndex, Dict[str, np.ndarray]]:
+    """
+    Stack per-site weather DataFrames into (sites, time) arrays on a common index
+
+    Returns:
+        Common DatetimeIndex and a dictionary of variable -> (sites, time) arrays
+        in the compute dtype, with sites ordered as in weather_frames
+    """
+    frames = list(weather_frames.values())
+    common_index = frames[0].index
+    for frame in frames[1:]:
+        common_index = common_index.intersection(frame.index)
+
+    stacked = {}
+    for variable in WEATHER_VARIABLES:
+        if all(variable in frame.columns for frame in frames):
+            stacked[variable] = np.vstack([
+                frame.loc[common_index, variable].to_numpy(dtype=compute_dtype()) for frame in frames
+            ])
+    return common_index, stacked
+
+
+class PortfolioForecastModel:
+    """Vectorized physics forecast for many sites at once"""
+
+    def __init__(self, location_keys: Optional[List[str]] = None,
+                 locations: Optional[Dict[str, Dict]] = None):
+        locations = locations if locations is not None else LOCATIONS
+        self.location_keys = list(location_keys) if location_keys else list(locations.keys())
+
+        for key in self.location_keys:
+            if key not in locations:
+                raise ValueError(f"Location {key} not found in configuration")
+
+        configs = [locations[key] for key in self.location_keys]
+        self.location_configs = configs
+
+        def column(values) -> np.ndarray:
+            return np.asarray(values, dtype=float).reshape(-1, 1)
+
+        self.latitude = column([c['latitude'] for c in configs])
+        self.longitude = column([c['longitude'] for c in configs])
+        self.tilt_angle = column([c.get('panels', {}).get('tilt', 20) for c in configs])
+        self.azimuth_angle = column([c.get('panels', {}).get('azimuth', 180) for c in configs])
+
+        # Same capacity resolution rules as IntradaySolarForecastModel
+        self.dc_capacity_mw = column([c.get('dc_capacity_mw', c['estimated_capacity_mw']) for c in configs])
+        self.ac_capacity_mw = column([
+            c.get('ac_limit_mw', c.get('ac_capacity_mw', c['estimated_capacity_mw'])) for c in configs
+        ])
+
+        # Per-site fixed performance ratio; NaN means use the weather-dependent ratio
+        self.performance_ratio = column([c.get('performance_ratio', np.nan) for c in configs])
+
+        self.temp_coefficient = TEMPERATURE_COEFFICIENT
+        self.albedo = 0.25
+        self.smoothing_window = 4
+        self.quantiles = list(QUANTILES)
+
+        unsupported = [q for q in self.quantiles if q not in UNCERTAINTY_MULTIPLIERS]
+        if unsupported:
+            raise ValueError(f"No uncertainty multiplier for quantile levels {unsupported}; "
+                             f"supported levels are {sorted(UNCERTAINTY_MULTIPLIERS)} (UNCERTAINTY_MULTIPLIERS)")
+
+        # Read clear-sky GHI from the precomputed solar tables (as IntradaySolarForecastModel)
+        self.use_solar_tables = True
+
+        logger.info(f"Portfolio model initialized for {len(self.location_keys)} sites")
+
+    def predict(self, timestamps: pd.DatetimeIndex, weather: Dict[str, np.ndarray],
+                noise_seed: Optional[int] = 42) -> np.ndarray:
+        """
+        Generate quantile forecasts for all sites
+
+        Args:
+            timestamps: Common forecast timestamps (T,)
+            weather: Variable name -> (sites, T) array (same names as weather_df columns)
+            noise_seed: Seed for cloud-induced fluctuations, None to disable noise
+
+        Returns:
+            Array of shape (sites, T, quantiles) with power in kW, in the compute dtype
+        """
+        dtype = compute_dtype()
+        n_sites, n_times = len(self.location_keys), len(timestamps)
+        weather = {name: np.asarray(values, dtype=dtype).reshape(n_sites, n_times)
+                   for name, values in weather.items()}
+
+        # Geometry is evaluated in float64, then cast to the compute dtype
+        position = solar_position_arrays(to_unix_seconds(timestamps), self.latitude, self.longitude)
+        elevation = np.maximum(position['elevation'], 0).astype(dtype)
+        azimuth = position['azimuth'].astype(dtype)
+
+        ac_power = self._calculate_ac_power(timestamps, weather, elevation, azimuth)
+        ac_power = self._apply_cloud_dynamics(ac_power, weather, noise_seed)
+
+        return self._generate_uncertainty_bands(ac_power, weather)
+
+    def predict_frames(self, timestamps: pd.DatetimeIndex, weather: Dict[str, np.ndarray],
+                       noise_seed: Optional[int] = 42) -> Dict[str, pd.DataFrame]:
+        """Generate per-site prediction DataFrames in the IntradaySolarForecastModel layout"""
+        bands = self.predict(timestamps, weather, noise_seed)
+        q_cols = quantile_columns(self.quantiles)
+        resolution_hours = INTRADAY_RESOLUTION_MINUTES / 60.0
+        forecast_timestamp = datetime.now(pytz.UTC)
+        median_idx = self.quantiles.index(0.5) if 0.5 in self.quantiles else len(self.quantiles) // 2
+
+        frames = {}
+        for site_idx, key in enumerate(self.location_keys):
+            predictions = pd.DataFrame(bands[site_idx], index=timestamps, columns=q_cols)
+            predictions.insert(0, 'production_kw', bands[site_idx, :, median_idx])
+            # Energy values are summed downstream, so they are kept in the accumulation dtype
+            predictions['energy_mwh'] = predictions['production_kw'].astype(accumulation_dtype()) / 1000 * resolution_hours
+            for col in q_cols:
+                predictions[f'energy_{col}_mwh'] = predictions[col].astype(accumulation_dtype()) / 1000 * resolution_hours
+            predictions['location'] = key
+            predictions['forecast_timestamp'] = forecast_timestamp
+            predictions['resolution_minutes'] = INTRADAY_RESOLUTION_MINUTES
+            frames[key] = predictions
+
+        return frames
+
+    def _calculate_ac_power(self, timestamps: pd.DatetimeIndex, weather: Dict[str, np.ndarray],
+                            elevation: np.ndarray, azimuth: np.ndarray) -> np.ndarray:
+        """GHI -> POA -> DC -> AC chain on (sites, time) arrays, in MW"""
+        cloud_cover = weather.get('cloud_cover')
+
+        # Irradiance: sites without any GHI use the clear-sky GHI scaled by clouds
+        if 'ghi' in weather:
+            missing = np.isnan(weather['ghi']).all(axis=-1)
+            ghi = np.nan_to_num(weather['ghi'])
+        else:
+            missing = np.ones(len(self.location_keys), dtype=bool)
+            ghi = np.zeros(elevation.shape, dtype=elevation.dtype)
+        if missing.any():
+            clear_sky_ghi = self._clear_sky_ghi(timestamps, np.flatnonzero(missing)).astype(ghi.dtype)
+            cloud_factor = 1 - ((cloud_cover[missing] if cloud_cover is not None else 0) / 100) * 0.8
+            ghi[missing] = np.maximum(clear_sky_ghi * cloud_factor, 0)
+
+        return irradiance_to_ac(
+            elevation=elevation, azimuth=azimuth, ghi=ghi,
+            dni=weather.get('dni'), dhi=weather.get('dhi'),
+            temperature=weather.get('temperature'), wind_speed=weather.get('wind_speed'),
+            cloud_cover=cloud_cover,
+            tilt=self.tilt_angle, panel_azimuth=self.azimuth_angle,
+            dc_capacity_mw=self.dc_capacity_mw, ac_capacity_mw=self.ac_capacity_mw,
+            performance_ratio=self.performance_ratio,
+            temp_coefficient=self.temp_coefficient, albedo=self.albedo
+        )
+
+    def _clear_sky_ghi(self, timestamps: pd.DatetimeIndex, sites: np.ndarray) -> np.ndarray:
+        """Clear-sky GHI of the given site rows, (len(sites), T), from the solar tables or computed"""
+        return np.vstack([
+            clear_sky_irradiance(timestamps, self.location_configs[site],
+                                 self.location_keys[site] if self.use_solar_tables else None)['ghi_clear'].to_numpy()
+            for site in sites
+        ])
+
+    def _apply_cloud_dynamics(self, ac_power: np.ndarray, weather: Dict[str, np.ndarray],
+                              noise_seed: Optional[int]) -> np.ndarray:
+        """Apply cloud-induced variability and smoothing along the time axis"""
+        cloud_cover = weather.get('cloud_cover')
+        noise = None
+        if cloud_cover is not None and noise_seed is not None:
+            rng = np.random.default_rng(noise_seed)
+            noise = (rng.standard_normal(ac_power.shape) * ((cloud_cover / 100) * 0.3)).astype(ac_power.dtype)
+
+        return apply_cloud_dynamics(ac_power, cloud_cover, noise,
+                                    self.ac_capacity_mw, self.smoothing_window)
+
+    def _generate_uncertainty_bands(self, ac_power: np.ndarray,
+                                    weather: Dict[str, np.ndarray]) -> np.ndarray:
+        """Build the (sites, time, quantile) tensor in kW"""
+        n_times = ac_power.shape[-1]
+        hours_ahead = np.arange(n_times) * (INTRADAY_RESOLUTION_MINUTES / 60)
+        base_uncertainty = 0.05 + 0.02 * (hours_ahead / 24)
+
+        if 'cloud_cover' in weather:
+            weather_uncertainty = weather['cloud_cover'] / 100 * 0.15
+        else:
+            weather_uncertainty = 0.1
+        total_uncertainty = np.sqrt(base_uncertainty ** 2 + weather_uncertainty ** 2)
+
+        multipliers = np.array([UNCERTAINTY_MULTIPLIERS[q] for q in self.quantiles])
+        bands = (ac_power * 1000)[..., None] * (1 + total_uncertainty[..., None] * multipliers)
+        bands = bands.astype(ac_power.dtype, copy=False)
+
+        return sort_quantiles(bands, upper=(self.ac_capacity_mw * 1000)[..., None])
@@ -0,0 +1,233 @@
+"""
+Fused array kernels for the PV physics chain
+GHI -> POA -> DC -> AC -> clipping on raw contiguous float arrays
+
+These kernels implement the same physics as the pandas methods of
+IntradaySolarForecastModel (_ghi_to_poa, _calculate_dc_power,
+_apply_system_losses, _apply_cloud_dynamics) without intermediate Series or
+index alignment. Work happens in place on a small set of preallocated buffers.
+Inputs may be 1-D (time) or 2-D (sites x time); per-site parameters broadcast
+as (sites, 1) column vectors. The POA transposition dispatches to a compiled
+loop when Numba is installed (see compiled_kernels).
+"""
+import numpy as np
+from typing import Optional, Union
+
+from config import PERFORMANCE_RATIO_BY_WEATHER, TEMPERATURE_COEFFICIENT, ACCUMULATION_DTYPE
+import compiled_kernels
+
+ArrayLike = Union[float, np.ndarray]
+
+
+def rolling_mean_centered(values: np.ndarray, window: int) -> np.ndarray:
+    """Centered rolling mean along the last axis (matches pandas rolling(center=True, min_periods=1))
+
+    Windows are clipped at both ends, so series shorter than the window are averaged too.
+    NaN values are skipped; a window without any value gives NaN.
+    The running sum is accumulated in ACCUMULATION_DTYPE; the result keeps the input dtype.
+    """
+    n = values.shape[-1]
+    if window <= 1 or n == 0:
+        return values
+    present = ~np.isnan(values)
+    zeros = np.zeros(values.shape[:-1] + (1,), dtype=ACCUMULATION_DTYPE)
+    cumsum = np.concatenate([zeros, np.cumsum(np.where(present, values, 0), axis=-1,
+                                              dtype=ACCUMULATION_DTYPE)], axis=-1)
+    counts = np.concatenate([zeros, np.cumsum(present, axis=-1, dtype=ACCUMULATION_DTYPE)], axis=-1)
+    positions = np.arange(n)
+    start = np.clip(positions - window // 2, 0, n)
+    end = np.clip(positions + (window - window // 2), 0, n)
+    window_counts = counts[..., end] - counts[..., start]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(window_counts > 0, (cumsum[..., end] - cumsum[..., start]) / window_counts, np.nan)
+    return means.astype(values.dtype, copy=False)
+
+
+def _has_data(values: Optional[np.ndarray]) -> Union[bool, np.ndarray]:
+    """True where a measured series has at least one value along the time axis"""
+    if values is None:
+        return False
+    return ~np.isnan(values).all(axis=-1, keepdims=True)
+
+
+def poa_transposition(elevation: np.ndarray, azimuth: np.ndarray, ghi: ArrayLike,
+                      dni: ArrayLike, dhi: ArrayLike,
+                      tilt: ArrayLike = 20.0, panel_azimuth: ArrayLike = 180.0,
+                      albedo: float = 0.25, out: Optional[np.ndarray] = None,
+                      backend: Optional[str] = None) -> np.ndarray:
+    """
+    Isotropic-sky plane-of-array irradiance (direct + diffuse + ground reflected)
+
+    Args:
+        elevation, azimuth: Solar position in degrees
+        ghi, dni, dhi: Irradiance components in W/m² (no NaN)
+        tilt, panel_azimuth: Panel orientation in degrees
+        albedo: Ground reflectance
+        out: Optional preallocated output buffer
+        backend: 'numba', 'numpy' or 'auto'; None uses config.KERNEL_BACKEND
+
+    Returns:
+        POA irradiance in W/m², clipped to 0-1200
+    """
+    shape = np.broadcast_shapes(np.shape(elevation), np.shape(azimuth), np.shape(ghi),
+                                np.shape(dni), np.shape(dhi), np.shape(tilt), np.shape(panel_azimuth))
+    if out is None:
+        out = np.empty(shape)
+
+    if compiled_kernels.resolve_backend(backend) == 'numba':
+        # Inputs in the dtype of out, broadcast by the kernel without copies
+        rows = compiled_kernels.broadcast_rows(shape, out.dtype,
+                                               (elevation, azimuth, ghi, dni, dhi, tilt, panel_azimuth))
+        target = out if out.flags.c_contiguous else np.empty(shape, dtype=out.dtype)
+        compiled_kernels.poa_transposition_numba(*rows, float(albedo), target.reshape(rows[0].shape))
+        if target is not out:
+            out[...] = target
+        return out
+
+    tilt_rad = np.radians(tilt)
+    cos_tilt = np.cos(tilt_rad)
+    elevation_rad = np.radians(elevation)
+
+    # Angle of incidence on the tilted plane, clipped to max(cos_aoi, 0)
+    cos_aoi = (np.sin(elevation_rad) * cos_tilt +
+               np.cos(elevation_rad) * np.sin(tilt_rad) *
+               np.cos(np.radians(np.asarray(azimuth) - np.asarray(panel_azimuth))))
+    np.clip(cos_aoi, 0, 1, out=cos_aoi)
+
+    np.multiply(dni, cos_aoi, out=out)
+    out += np.asarray(dhi) * ((1 + cos_tilt) / 2)
+    out += np.asarray(ghi) * (albedo * (1 - cos_tilt) / 2)
+    np.clip(out, 0, 1200, out=out)
+    return out
+
+
+def irradiance_to_ac(elevation: np.ndarray, azimuth: np.ndarray, ghi: np.ndarray,
+                     dni: Optional[np.ndarray] = None, dhi: Optional[np.ndarray] = None,
+                     temperature: Optional[np.ndarray] = None,
+                     wind_speed: Optional[np.ndarray] = None,
+                     cloud_cover: Optional[np.ndarray] = None,
+                     tilt: ArrayLike = 20.0, panel_azimuth: ArrayLike = 180.0,
+                     dc_capacity_mw: ArrayLike = 1.0, ac_capacity_mw: ArrayLike = 1.0,
+                     performance_ratio: Optional[ArrayLike] = None,
+                     temp_coefficient: float = TEMPERATURE_COEFFICIENT,
+                     albedo: float = 0.25,
+                     out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Convert horizontal irradiance to clipped AC power in a single fused pass
+
+    Args:
+        elevation: Solar elevation in degrees, already clipped at zero
+        azimuth: Solar azimuth in degrees (0=North, clockwise)
+        ghi: Global horizontal irradiance in W/m² (no NaN)
+        dni, dhi: Measured beam/diffuse irradiance; estimated from GHI when None or all-NaN
+        temperature, wind_speed, cloud_cover: Optional weather arrays
+        tilt, panel_azimuth: Panel orientation in degrees
+        dc_capacity_mw, ac_capacity_mw: Plant capacities in MW
+        performance_ratio: Fixed ratio (NaN entries fall back to the weather-dependent ratio)
+        temp_coefficient: Power temperature coefficient per °C
+        albedo: Ground reflectance
+        out: Optional preallocated output buffer
+
+    Returns:
+        AC power in MW (the out buffer when given), in the floating dtype of
+        elevation and ghi (float32 inputs stay float32)
+    """
+    shape = np.broadcast_shapes(np.shape(elevation), np.shape(ghi))
+    dtype = np.result_type(np.asarray(elevation).dtype, np.asarray(ghi).dtype, np.float32)
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    work = np.empty(shape, dtype=dtype)
+    sin_elevation = np.empty(shape, dtype=dtype)
+
+    np.radians(elevation, out=sin_elevation)
+    np.sin(sin_elevation, out=sin_elevation)
+
+    # Beam component (measured or estimated from GHI)
+    if cloud_cover is None:
+        clearness_factor = 0.90
+    else:
+        clearness_factor = np.where(cloud_cover < 10, 0.90,
+                                    np.where(cloud_cover < 30, 0.80, 1 - (cloud_cover / 100) * 0.7))
+    beam = np.maximum(sin_elevation, 0.1)
+    np.divide(ghi, beam, out=beam)
+    beam *= clearness_factor
+    np.clip(beam, 0, 950, out=beam)
+    if dni is not None:
+        beam = np.where(_has_data(dni), np.nan_to_num(dni), beam)
+
+    # Diffuse component (measured or remainder of GHI)
+    if dhi is not None and np.all(_has_data(dhi)):
+        diffuse = np.nan_to_num(dhi)
+    else:
+        diffuse = np.clip(ghi - beam * sin_elevation, 0, ghi)
+        if dhi is not None:
+            diffuse = np.where(_has_data(dhi), np.nan_to_num(dhi), diffuse)
+
+    # POA irradiance, reusing out as the accumulator
+    poa_transposition(elevation, azimuth, ghi, beam, diffuse, tilt, panel_azimuth, albedo, out=out)
+
+    # DC power = capacity * POA/1000 * temperature effect * performance ratio
+    out *= np.asarray(dc_capacity_mw) / 1000
+    if temperature is not None:
+        np.subtract(temperature, 25, out=work)
+        work *= temp_coefficient
+        work += 1
+        np.clip(work, 0.7, 1.1, out=work)
+        out *= work
+
+    if cloud_cover is not None:
+        weather_pr = np.select(
+            [cloud_cover < 20, cloud_cover < 50, cloud_cover < 80, cloud_cover >= 80],
+            [PERFORMANCE_RATIO_BY_WEATHER['clear_sky'], PERFORMANCE_RATIO_BY_WEATHER['partly_cloudy'],
+             PERFORMANCE_RATIO_BY_WEATHER['cloudy'], PERFORMANCE_RATIO_BY_WEATHER['overcast']],
+            default=PERFORMANCE_RATIO_BY_WEATHER['default']
+        )
+    else:
+        weather_pr = PERFORMANCE_RATIO_BY_WEATHER['default']
+    if performance_ratio is not None:
+        weather_pr = np.where(np.isnan(performance_ratio), weather_pr, performance_ratio)
+    out *= weather_pr
+
+    out[np.broadcast_to(elevation <= 0, shape)] = 0
+    np.clip(out, 0, dc_capacity_mw, out=out)
+
+    # Inverter part-load efficiency and wind cooling, then AC clipping
+    np.divide(out, np.asarray(ac_capacity_mw) + 0.001, out=work)
+    out *= np.where(work < 0.1, 0.95, np.where(work > 0.95, 0.99, 1.0))
+    if wind_speed is not None:
+        np.clip(wind_speed, 0, 10, out=work)
+        work *= 0.002
+        work += 1
+        out *= work
+    np.clip(out, 0, ac_capacity_mw, out=out)
+
+    return out
+
+
+def apply_cloud_dynamics(ac_power: np.ndarray, cloud_cover: Optional[np.ndarray],
+                         noise: Optional[np.ndarray], ac_capacity_mw: ArrayLike,
+                         smoothing_window: int = 4) -> np.ndarray:
+    """
+    Apply cloud-induced fluctuations and centered smoothing to AC power arrays
+
+    Args:
+        ac_power: AC power in MW, last axis is time
+        cloud_cover: Cloud cover in percent, None to return ac_power unchanged
+        noise: Standard normal-scaled noise already multiplied by the variability factor
+        ac_capacity_mw: AC limit for the final clipping
+        smoothing_window: Rolling window in intervals; series no longer than the window
+            are not smoothed (like IntradaySolarForecastModel._apply_cloud_dynamics)
+
+    Returns:
+        New array of smoothed AC power in MW
+    """
+    if cloud_cover is None:
+        return ac_power
+
+    dtype = ac_power.dtype
+    if noise is not None:
+        ac_power = np.where(ac_power > 0.01, ac_power * (1 + noise), ac_power).astype(dtype, copy=False)
+
+    if ac_power.shape[-1] > smoothing_window:
+        ac_power = rolling_mean_centered(ac_power, smoothing_window)
+    return np.clip(ac_power, 0, ac_capacity_mw).astype(dtype, copy=False)
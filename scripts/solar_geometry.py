@@ -0,0 +1,157 @@
+"""
+Vectorized solar position engine
+Computes solar elevation, azimuth and air mass for a whole DatetimeIndex in one call
+
+Uses the NOAA solar position algorithm (Meeus-based, ~0.01 degree accuracy for
+1900-2100) evaluated on NumPy arrays, with atmospheric refraction applied so the
+apparent elevation matches ephem's default output.
+Latitude and longitude may be scalars or arrays that broadcast against the time
+axis (e.g. shape (sites, 1) for a sites x time grid).
+When Numba is installed the same algorithm runs as a compiled loop (see compiled_kernels).
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Union
+
+import compiled_kernels
+
+ArrayLike = Union[float, np.ndarray]
+
+
+def to_unix_seconds(timestamps: pd.DatetimeIndex) -> np.ndarray:
+    """Convert a DatetimeIndex to float seconds since epoch (naive timestamps are treated as UTC)"""
+    timestamps = pd.DatetimeIndex(timestamps)
+    if timestamps.tz is not None:
+        timestamps = timestamps.tz_convert('UTC').tz_localize(None)
+    return timestamps.values.astype('datetime64[ns]').astype(np.int64) / 1e9
+
+
+def _refraction_correction(elevation: np.ndarray) -> np.ndarray:
+    """Atmospheric refraction correction in degrees (NOAA approximation)"""
+    e = np.clip(elevation, -89.0, 89.0)
+    tan_e = np.tan(np.radians(e))
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        correction = np.where(
+            e > 85, 0.0,
+            np.where(
+                e > 5,
+                58.1 / tan_e - 0.07 / tan_e ** 3 + 0.000086 / tan_e ** 5,
+                np.where(
+                    e > -0.575,
+                    1735 + e * (-518.2 + e * (103.4 + e * (-12.79 + e * 0.711))),
+                    -20.772 / tan_e
+                )
+            )
+        )
+    return correction / 3600.0
+
+
+def air_mass_kasten_young(elevation: ArrayLike) -> np.ndarray:
+    """Relative air mass (Kasten & Young 1989), inf when the sun is below the horizon"""
+    elevation = np.asarray(elevation, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        air_mass = 1 / (np.sin(np.radians(elevation)) +
+                        0.50572 * (np.maximum(elevation, 0) + 6.07995) ** -1.6364)
+    return np.where(elevation > 0, air_mass, np.inf)
+
+
+def solar_position_arrays(unix_seconds: np.ndarray, latitude: ArrayLike,
+                          longitude: ArrayLike, apply_refraction: bool = True,
+                          backend: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Compute solar position on raw arrays
+
+    Args:
+        unix_seconds: Seconds since epoch (UTC), shape (T,)
+        latitude: Degrees north, scalar or array broadcastable against (T,)
+        longitude: Degrees east, scalar or array broadcastable against (T,)
+        apply_refraction: Return apparent (refraction-corrected) elevation
+        backend: 'numba', 'numpy' or 'auto'; None uses config.KERNEL_BACKEND
+
+    Returns:
+        Dictionary with 'elevation', 'azimuth' (0=North, clockwise) and 'air_mass' arrays
+    """
+    if compiled_kernels.resolve_backend(backend) == 'numba':
+        shape = np.broadcast_shapes(np.shape(unix_seconds), np.shape(latitude), np.shape(longitude))
+        flat = compiled_kernels.flat_float_arrays(unix_seconds, latitude, longitude)
+        elevation = np.empty(flat[0].size)
+        azimuth = np.empty(flat[0].size)
+        compiled_kernels.solar_position_numba(*flat, apply_refraction, elevation, azimuth)
+        elevation = elevation.reshape(shape)
+        return {
+            'elevation': elevation,
+            'azimuth': azimuth.reshape(shape),
+            'air_mass': air_mass_kasten_young(elevation)
+        }
+
+    unix_seconds = np.asarray(unix_seconds, dtype=float)
+    lat_rad = np.radians(np.asarray(latitude, dtype=float))
+    lon = np.asarray(longitude, dtype=float)
+
+    # Julian century since J2000.0
+    julian_day = unix_seconds / 86400.0 + 2440587.5
+    jc = (julian_day - 2451545.0) / 36525.0
+
+    # Geometric mean longitude and anomaly of the sun (degrees)
+    mean_long = np.mod(280.46646 + jc * (36000.76983 + jc * 0.0003032), 360)
+    mean_anom = 357.52911 + jc * (35999.05029 - 0.0001537 * jc)
+    mean_anom_rad = np.radians(mean_anom)
+    eccentricity = 0.016708634 - jc * (0.000042037 + 0.0000001267 * jc)
+
+    # Equation of centre and apparent longitude
+    eq_center = (np.sin(mean_anom_rad) * (1.914602 - jc * (0.004817 + 0.000014 * jc)) +
+                 np.sin(2 * mean_anom_rad) * (0.019993 - 0.000101 * jc) +
+                 np.sin(3 * mean_anom_rad) * 0.000289)
+    omega_rad = np.radians(125.04 - 1934.136 * jc)
+    apparent_long = mean_long + eq_center - 0.00569 - 0.00478 * np.sin(omega_rad)
+
+    # Obliquity of the ecliptic and declination
+    mean_obliquity = 23 + (26 + (21.448 - jc * (46.815 + jc * (0.00059 - jc * 0.001813))) / 60) / 60
+    obliquity_rad = np.radians(mean_obliquity + 0.00256 * np.cos(omega_rad))
+    decl_rad = np.arcsin(np.sin(obliquity_rad) * np.sin(np.radians(apparent_long)))
+
+    # Equation of time (minutes)
+    var_y = np.tan(obliquity_rad / 2) ** 2
+    mean_long_rad = np.radians(mean_long)
+    equation_of_time = 4 * np.degrees(
+        var_y * np.sin(2 * mean_long_rad) -
+        2 * eccentricity * np.sin(mean_anom_rad) +
+        4 * eccentricity * var_y * np.sin(mean_anom_rad) * np.cos(2 * mean_long_rad) -
+        0.5 * var_y ** 2 * np.sin(4 * mean_long_rad) -
+        1.25 * eccentricity ** 2 * np.sin(2 * mean_anom_rad)
+    )
+
+    # True solar time and hour angle (UTC based, so no timezone offset)
+    minutes_of_day = np.mod(unix_seconds, 86400.0) / 60.0
+    true_solar_time = np.mod(minutes_of_day + equation_of_time + 4 * lon, 1440)
+    hour_angle_rad = np.radians(true_solar_time / 4 - 180)
+
+    # Elevation and azimuth
+    sin_elevation = (np.sin(lat_rad) * np.sin(decl_rad) +
+                     np.cos(lat_rad) * np.cos(decl_rad) * np.cos(hour_angle_rad))
+    elevation = np.degrees(np.arcsin(np.clip(sin_elevation, -1, 1)))
+    azimuth = np.mod(np.degrees(np.arctan2(
+        np.sin(hour_angle_rad),
+        np.cos(hour_angle_rad) * np.sin(lat_rad) - np.tan(decl_rad) * np.cos(lat_rad)
+    )) + 180, 360)
+
+    if apply_refraction:
+        elevation = elevation + _refraction_correction(elevation)
+
+    return {
+        'elevation': elevation,
+        'azimuth': np.broadcast_to(azimuth, elevation.shape),
+        'air_mass': air_mass_kasten_young(elevation)
+    }
+
+
+def calculate_solar_position(timestamps: pd.DatetimeIndex, latitude: float,
+                             longitude: float) -> pd.DataFrame:
+    """
+    Calculate solar position for every timestamp of a single site in one vectorized call
+
+    Returns:
+        DataFrame indexed by timestamps with 'elevation', 'azimuth' and 'air_mass' columns
+    """
+    position = solar_position_arrays(to_unix_seconds(timestamps), latitude, longitude)
+    return pd.DataFrame(position, index=timestamps)
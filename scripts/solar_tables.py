@@ -0,0 +1,279 @@
+"""
+Precomputed solar geometry and clear-sky envelope tables
+One table per site and UTC year, stored as a memory-mapped .npy under data_cache/
+
+Solar position and clear-sky irradiance are deterministic per site and timestamp,
+so they are computed once per year and then read by index instead of being
+recomputed on every forecast run or backtest step.
+"""
+import os
+import json
+import threading
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Tuple
+
+# Try importing pvlib for clear sky models
+try:
+    from pvlib.location import Location
+    PVLIB_AVAILABLE = True
+except ImportError:
+    PVLIB_AVAILABLE = False
+    logging.warning("pvlib library not found. Install with: pip install pvlib")
+
+from config import SOLAR_TABLE_DIR, SOLAR_TABLE_RESOLUTION_MINUTES
+from solar_geometry import solar_position_arrays, to_unix_seconds
+from clear_sky_cache import get_clearsky_cached
+
+logger = logging.getLogger(__name__)
+
+SOLAR_TABLE_COLUMNS = ['elevation', 'azimuth', 'air_mass',
+                       'ghi_clear', 'dni_clear', 'dhi_clear', 'ac_power_clear']
+
+# Parameters of the stored clear-sky AC power (same as SmartPersistenceModel)
+CLEAR_SKY_PERFORMANCE_RATIO = 0.78
+MIN_SOLAR_ELEVATION = 0.1  # degrees
+
+TABLE_FORMAT_VERSION = 2
+
+
+def plant_capacity_mw(location_config: Dict) -> Tuple[float, float]:
+    """
+    DC capacity and AC output limit of a site, resolved like IntradaySolarForecastModel
+
+    Returns:
+        (dc_capacity_mw, ac_limit_mw); the AC limit is ac_limit_mw (operational limit),
+        else ac_capacity_mw (nameplate), else estimated_capacity_mw
+    """
+    dc_capacity_mw = location_config.get('dc_capacity_mw', location_config['estimated_capacity_mw'])
+    ac_limit_mw = location_config.get('ac_limit_mw',
+                                      location_config.get('ac_capacity_mw',
+                                                          location_config['estimated_capacity_mw']))
+    return dc_capacity_mw, ac_limit_mw
+
+
+class SolarGeometryTable:
+    """Solar geometry and clear-sky values for one site on a regular UTC grid"""
+
+    def __init__(self, data: np.ndarray, metadata: Dict):
+        self.data = data
+        self.metadata = metadata
+        self.start_seconds = float(metadata['start_unix_seconds'])
+        self.step_seconds = float(metadata['resolution_minutes']) * 60
+
+    @classmethod
+    def build(cls, location_key: str, location_config: Dict, year: int,
+              resolution_minutes: int = SOLAR_TABLE_RESOLUTION_MINUTES) -> 'SolarGeometryTable':
+        """Compute the table for a full UTC year"""
+        timestamps = pd.date_range(start=f'{year}-01-01', end=f'{year + 1}-01-01',
+                                   freq=f'{resolution_minutes}min', tz='UTC', inclusive='left')
+        latitude = location_config['latitude']
+        longitude = location_config['longitude']
+
+        position = solar_position_arrays(to_unix_seconds(timestamps), latitude, longitude)
+        elevation = position['elevation']
+
+        ghi, dni, dhi = _clear_sky_irradiance(timestamps, location_config, elevation, position['air_mass'])
+
+        dc_capacity_mw, ac_limit_mw = plant_capacity_mw(location_config)
+        ac_power = np.minimum(dc_capacity_mw * (ghi / 1000) * CLEAR_SKY_PERFORMANCE_RATIO, ac_limit_mw)
+        ac_power = np.where(elevation < MIN_SOLAR_ELEVATION, 0.0, ac_power)
+
+        data = np.column_stack([elevation, position['azimuth'], position['air_mass'],
+                                ghi, dni, dhi, ac_power]).astype(np.float64)
+
+        metadata = {
+            'format_version': TABLE_FORMAT_VERSION,
+            'location_key': location_key,
+            'latitude': latitude,
+            'longitude': longitude,
+            'year': year,
+            'resolution_minutes': resolution_minutes,
+            'start_unix_seconds': float(to_unix_seconds(timestamps[:1])[0]),
+            'rows': len(timestamps),
+            'columns': SOLAR_TABLE_COLUMNS,
+            'clear_sky_model': 'ineichen' if PVLIB_AVAILABLE else 'simple',
+            'dc_capacity_mw': dc_capacity_mw,
+            'ac_limit_mw': ac_limit_mw,
+            'performance_ratio': CLEAR_SKY_PERFORMANCE_RATIO
+        }
+
+        logger.info(f"Built solar table for {location_key} {year} ({len(timestamps)} rows)")
+        return cls(data, metadata)
+
+    def save(self, path: str):
+        """Write the table as <path>.npy plus a <path>.json metadata sidecar"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.{os.getpid()}.npy"
+        np.save(tmp_path, np.ascontiguousarray(self.data))
+        os.replace(tmp_path, f"{path}.npy")
+        with open(f"{path}.json", 'w') as f:
+            json.dump(self.metadata, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> 'SolarGeometryTable':
+        """Memory-map a previously saved table"""
+        with open(f"{path}.json") as f:
+            metadata = json.load(f)
+        data = np.load(f"{path}.npy", mmap_mode='r')
+        return cls(data, metadata)
+
+    def matches(self, location_config: Dict, resolution_minutes: int) -> bool:
+        """Check the stored table was built for this site configuration (geometry and plant parameters)"""
+        dc_capacity_mw, ac_limit_mw = plant_capacity_mw(location_config)
+        return (self.metadata.get('format_version') == TABLE_FORMAT_VERSION and
+                self.metadata['latitude'] == location_config['latitude'] and
+                self.metadata['longitude'] == location_config['longitude'] and
+                self.metadata['resolution_minutes'] == resolution_minutes and
+                self.metadata['clear_sky_model'] == ('ineichen' if PVLIB_AVAILABLE else 'simple') and
+                self.metadata['dc_capacity_mw'] == dc_capacity_mw and
+                self.metadata['ac_limit_mw'] == ac_limit_mw and
+                self.metadata['performance_ratio'] == CLEAR_SKY_PERFORMANCE_RATIO and
+                self.metadata['rows'] == len(self.data))
+
+    def row_positions(self, unix_seconds: np.ndarray) -> Optional[np.ndarray]:
+        """Row index for each timestamp, None if any timestamp is off-grid or outside the table"""
+        offsets = (unix_seconds - self.start_seconds) / self.step_seconds
+        positions = np.rint(offsets).astype(np.int64)
+        if (np.any(np.abs(offsets - positions) > 1e-6) or
+                np.any(positions < 0) or np.any(positions >= len(self.data))):
+            return None
+        return positions
+
+
+def _clear_sky_irradiance(timestamps: pd.DatetimeIndex, location_config: Dict,
+                          elevation: np.ndarray, air_mass: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Clear-sky GHI/DNI/DHI with pvlib Ineichen, or a simple transmittance model"""
+    if PVLIB_AVAILABLE:
+        try:
+            location = Location(latitude=location_config['latitude'],
+                                longitude=location_config['longitude'],
+                                tz=location_config['timezone'], altitude=0)
+            clear_sky = get_clearsky_cached(location, timestamps, model='ineichen')
+            return (clear_sky['ghi'].to_numpy(), clear_sky['dni'].to_numpy(),
+                    clear_sky['dhi'].to_numpy())
+        except Exception as e:
+            logger.warning(f"pvlib clear-sky calculation failed: {e}, using simple model")
+
+    # Same transmission as IntradaySolarForecastModel's simple model
+    sin_elevation = np.sin(np.radians(np.maximum(elevation, 0)))
+    ghi = 1361 * sin_elevation * 0.75
+    with np.errstate(over='ignore', invalid='ignore'):
+        dni = np.where(elevation > 0, 1361 * 0.7 ** (air_mass ** 0.678), 0.0)
+    dhi = np.maximum(ghi - dni * sin_elevation, 0)
+    return ghi, dni, dhi
+
+
+def compute_clear_sky(timestamps: pd.DatetimeIndex, location_config: Dict) -> pd.DataFrame:
+    """
+    Clear-sky GHI/DNI/DHI for arbitrary timestamps (no table lookup)
+
+    Returns:
+        DataFrame indexed by timestamps with 'ghi_clear', 'dni_clear' and 'dhi_clear'
+    """
+    position = solar_position_arrays(to_unix_seconds(timestamps), location_config['latitude'],
+                                     location_config['longitude'])
+    ghi, dni, dhi = _clear_sky_irradiance(timestamps, location_config,
+                                          position['elevation'], position['air_mass'])
+    return pd.DataFrame({'ghi_clear': ghi, 'dni_clear': dni, 'dhi_clear': dhi}, index=timestamps)
+
+
+# Process-wide table cache, keyed by (location_key, year, resolution_minutes)
+_TABLES: Dict[Tuple[str, int, int], SolarGeometryTable] = {}
+_TABLES_LOCK = threading.Lock()
+
+
+def get_solar_table(location_key: str, location_config: Dict, year: int,
+                    resolution_minutes: int = SOLAR_TABLE_RESOLUTION_MINUTES,
+                    table_dir: str = SOLAR_TABLE_DIR) -> SolarGeometryTable:
+    """
+    Get the table for a site and year, loading it from disk or building it on first use
+    """
+    cache_key = (location_key, year, resolution_minutes)
+    with _TABLES_LOCK:
+        table = _TABLES.get(cache_key)
+        if table is not None and table.matches(location_config, resolution_minutes):
+            return table
+
+        path = os.path.join(table_dir, f"{location_key}_{year}_{resolution_minutes}min")
+        table = None
+        if os.path.exists(f"{path}.npy") and os.path.exists(f"{path}.json"):
+            try:
+                table = SolarGeometryTable.load(path)
+                if not table.matches(location_config, resolution_minutes):
+                    logger.info(f"Solar table {path} is stale, rebuilding")
+                    table = None
+            except Exception as e:
+                logger.warning(f"Failed to load solar table {path}: {e}")
+                table = None
+
+        if table is None:
+            table = SolarGeometryTable.build(location_key, location_config, year, resolution_minutes)
+            try:
+                table.save(path)
+            except OSError as e:
+                logger.warning(f"Could not persist solar table {path}: {e}")
+
+        _TABLES[cache_key] = table
+        return table
+
+
+def lookup_solar_data(location_key: str, location_config: Dict,
+                      timestamps: pd.DatetimeIndex,
+                      resolution_minutes: int = SOLAR_TABLE_RESOLUTION_MINUTES) -> Optional[pd.DataFrame]:
+    """
+    Read precomputed solar geometry and clear-sky values for the given timestamps
+
+    Returns:
+        DataFrame indexed by timestamps with SOLAR_TABLE_COLUMNS, or None when the
+        timestamps are not on the table grid (callers then compute directly).
+        The table parameters are available in the frame's attrs.
+    """
+    if len(timestamps) == 0:
+        return None
+
+    try:
+        unix_seconds = to_unix_seconds(timestamps)
+        utc_index = pd.DatetimeIndex(timestamps)
+        if utc_index.tz is not None:
+            utc_index = utc_index.tz_convert('UTC')
+        years = np.asarray(utc_index.year)
+
+        values = np.empty((len(timestamps), len(SOLAR_TABLE_COLUMNS)))
+        metadata = None
+        for year in np.unique(years):
+            table = get_solar_table(location_key, location_config, int(year), resolution_minutes)
+            mask = years == year
+            positions = table.row_positions(unix_seconds[mask])
+            if positions is None:
+                return None
+            values[mask] = table.data[positions]
+            metadata = table.metadata
+
+        solar_data = pd.DataFrame(values, index=timestamps, columns=SOLAR_TABLE_COLUMNS)
+        solar_data.attrs.update({key: metadata[key] for key in
+                                 ('dc_capacity_mw', 'ac_limit_mw', 'performance_ratio')})
+        return solar_data
+
+    except Exception as e:
+        logger.warning(f"Solar table lookup failed for {location_key}: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Prebuild tables for every configured site for the current and next year
+    import argparse
+    from datetime import datetime
+    import pytz
+    from config import LOCATIONS
+
+    parser = argparse.ArgumentParser(description='Precompute solar geometry tables')
+    parser.add_argument('--years', type=int, nargs='+',
+                        default=[datetime.now(pytz.UTC).year, datetime.now(pytz.UTC).year + 1])
+    args = parser.parse_args()
+
+    for key, config in LOCATIONS.items():
+        for year in args.years:
+            get_solar_table(key, config, year)
+            print(f"✓ {key} {year}")
@@ -0,0 +1,247 @@
+"""
+Disk-backed weather cache shared by all forecast processes
+Stores fetched weather frames under data_cache/weather so cron, docker-compose and
+run_forecast_and_email.py invocations reuse data instead of calling Open-Meteo again
+
+Entries are keyed by location, requested variables and NWP issue time (the fetch
+time floored to WEATHER_CACHE_ISSUE_INTERVAL_MINUTES), stored as Parquet with a
+JSON metadata sidecar, and expire after WEATHER_CACHE_TTL_MINUTES. Writes are
+atomic; a lock file lets one process fetch while concurrent ones wait for its
+result. When the cache grows beyond WEATHER_CACHE_MAX_SIZE_MB the least recently
+used entries are evicted.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Sequence, Tuple, Union
+import pytz
+
+# Try importing pyarrow for Parquet storage
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logging.warning("pyarrow library not found, weather cache uses pickle. Install with: pip install pyarrow")
+
+from config import (
+    WEATHER_CACHE_DIR, WEATHER_CACHE_TTL_MINUTES,
+    WEATHER_CACHE_ISSUE_INTERVAL_MINUTES, WEATHER_CACHE_MAX_SIZE_MB
+)
+
+logger = logging.getLogger(__name__)
+
+# A lock older than this is assumed to belong to a crashed process
+LOCK_STALE_SECONDS = 120
+LOCK_POLL_SECONDS = 0.5
+
+
+def issue_time(now: Optional[datetime] = None,
+               interval_minutes: int = WEATHER_CACHE_ISSUE_INTERVAL_MINUTES) -> datetime:
+    """NWP issue time bucket for a fetch time (UTC, floored to the update cadence)"""
+    now = now or datetime.now(pytz.UTC)
+    return pd.Timestamp(now).tz_convert('UTC').floor(f'{interval_minutes}min').to_pydatetime()
+
+
+class DiskWeatherCache:
+    """Weather frames cached on disk with TTL and size-based LRU eviction"""
+
+    def __init__(self, cache_dir: str = WEATHER_CACHE_DIR,
+                 ttl_minutes: float = WEATHER_CACHE_TTL_MINUTES,
+                 max_size_mb: float = WEATHER_CACHE_MAX_SIZE_MB):
+        self.cache_dir = cache_dir
+        self.ttl = timedelta(minutes=ttl_minutes)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.extension = 'parquet' if PYARROW_AVAILABLE else 'pkl'
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(location: Dict, variables: Union[str, Sequence[str]],
+                 issued: Optional[datetime] = None, **extra) -> str:
+        """
+        Cache key for a weather request
+
+        Args:
+            location: Location config (latitude/longitude identify the site)
+            variables: Requested weather variables
+            issued: NWP issue time, defaults to the current issue_time()
+            extra: Further request parameters (e.g. forecast start)
+        """
+        if not isinstance(variables, str):
+            variables = ','.join(variables)
+        issued = issued or issue_time()
+        payload = {
+            'latitude': round(float(location['latitude']), 4),
+            'longitude': round(float(location['longitude']), 4),
+            'variables': variables,
+            'issued': issued.isoformat(),
+            **{name: str(value) for name, value in sorted(extra.items())}
+        }
+        return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:20]
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.{self.extension}", f"{base}.json"
+
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, Dict]]:
+        """Return (weather_df, metadata) for a valid entry, None on miss or expiry"""
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                metadata = json.load(f)
+            fetched_at = datetime.fromisoformat(metadata['fetched_at'])
+            if datetime.now(pytz.UTC) - fetched_at > self.ttl:
+                self._remove(key)
+                return None
+
+            if self.extension == 'parquet':
+                weather_df = pd.read_parquet(data_path)
+            else:
+                weather_df = pd.read_pickle(data_path)
+
+            # Mark as recently used for eviction
+            os.utime(meta_path)
+            return weather_df, metadata
+
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable weather cache entry {key}: {e}")
+            self._remove(key)
+            return None
+
+    def put(self, key: str, weather_df: pd.DataFrame, metadata: Optional[Dict] = None):
+        """Store a weather frame atomically (data first, metadata sidecar last)"""
+        data_path, meta_path = self._paths(key)
+        metadata = dict(metadata or {})
+        metadata.setdefault('fetched_at', datetime.now(pytz.UTC).isoformat())
+        metadata['rows'] = len(weather_df)
+
+        tmp_suffix = f".tmp.{os.getpid()}"
+        try:
+            if self.extension == 'parquet':
+                weather_df.to_parquet(data_path + tmp_suffix, compression='zstd')
+            else:
+                weather_df.to_pickle(data_path + tmp_suffix)
+            os.replace(data_path + tmp_suffix, data_path)
+
+            with open(meta_path + tmp_suffix, 'w') as f:
+                json.dump(metadata, f, indent=2, default=str)
+            os.replace(meta_path + tmp_suffix, meta_path)
+        except OSError as e:
+            logger.warning(f"Could not write weather cache entry {key}: {e}")
+            return
+
+        self.evict()
+
+    def get_or_fetch(self, key: str,
+                     fetch: Callable[[], Tuple[Optional[pd.DataFrame], Dict]],
+                     wait_seconds: float = LOCK_STALE_SECONDS) -> Tuple[Optional[pd.DataFrame], Dict]:
+        """
+        Return the cached entry or call fetch() once across concurrent processes
+
+        Args:
+            key: Cache key from make_key
+            fetch: Callable returning (weather_df or None, metadata); None results are not cached
+            wait_seconds: How long to wait for another process that is fetching the same key
+
+        Returns:
+            (weather_df, metadata) with metadata['cache_hit'] set
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached[0], {**cached[1], 'cache_hit': True}
+
+        lock_path = os.path.join(self.cache_dir, f"{key}.lock")
+        deadline = time.monotonic() + wait_seconds
+        while not self._acquire_lock(lock_path):
+            # Another process is fetching this key; use its result once written
+            time.sleep(LOCK_POLL_SECONDS)
+            cached = self.get(key)
+            if cached is not None:
+                return cached[0], {**cached[1], 'cache_hit': True}
+            if time.monotonic() > deadline:
+                logger.warning(f"Timed out waiting for weather cache lock {key}, fetching directly")
+                break
+        else:
+            try:
+                # The entry may have been written between the miss and acquiring the lock
+                cached = self.get(key)
+                if cached is not None:
+                    return cached[0], {**cached[1], 'cache_hit': True}
+                weather_df, metadata = fetch()
+                if weather_df is not None:
+                    self.put(key, weather_df, metadata)
+                return weather_df, {**metadata, 'cache_hit': False}
+            finally:
+                self._release_lock(lock_path)
+
+        weather_df, metadata = fetch()
+        return weather_df, {**metadata, 'cache_hit': False}
+
+    def evict(self):
+        """Remove expired entries, then least recently used ones until under the size limit"""
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            key = name[:-5]
+            data_path, meta_path = self._paths(key)
+            try:
+                last_used = os.path.getmtime(meta_path)
+                size = os.path.getsize(meta_path) + os.path.getsize(data_path)
+            except OSError:
+                continue
+            entries.append((last_used, size, key))
+
+        # Entries untouched for longer than the TTL cannot be valid any more
+        ttl_seconds = self.ttl.total_seconds()
+        live = []
+        for last_used, size, key in entries:
+            if now - last_used > ttl_seconds:
+                self._remove(key)
+            else:
+                live.append((last_used, size, key))
+
+        total = sum(size for _, size, _ in live)
+        for last_used, size, key in sorted(live):
+            if total <= self.max_size_bytes:
+                break
+            self._remove(key)
+            total -= size
+            logger.debug(f"Evicted weather cache entry {key}")
+
+    def _remove(self, key: str):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _acquire_lock(lock_path: str) -> bool:
+        """Create the lock file exclusively, breaking locks left by crashed processes"""
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > LOCK_STALE_SECONDS:
+                    os.remove(lock_path)
+            except OSError:
+                pass
+            return False
+
+    @staticmethod
+    def _release_lock(lock_path: str):
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
@@ -0,0 +1,249 @@
+"""
+Record/replay stand-in for the Open-Meteo APIs
+Makes weather fetches deterministic for benchmarks and possible on offline machines
+
+Record: with WEATHER_RECORD_DIR set, PooledHttpClient stores every successful
+response as <key>.json in that directory (key = hash of path and query, so the
+host does not matter).
+
+Replay: the stand-in server answers requests from a recording directory with
+configurable latency, jitter and injected failures (HTTP errors or slow
+responses), so the retry, hedging and fallback chain can be exercised under
+load. Forecast requests are relative to the day they are made (forecast_days,
+no dates in the query), so their time arrays are shifted by the whole days
+between recording and replay: an old recording then covers the same days
+relative to today as when it was made, and the fetchers' "from tomorrow"
+window finds its data. Requests with explicit dates (archive) are replayed
+unchanged. Point the fetchers at it with OPEN_METEO_BASE_URL and
+OPEN_METEO_ARCHIVE_BASE_URL:
+
+    python scripts/weather_replay.py --recordings data_cache/recordings --port 8765 --latency-ms 80
+    OPEN_METEO_BASE_URL=http://127.0.0.1:8765 OPEN_METEO_ARCHIVE_BASE_URL=http://127.0.0.1:8765 \\
+        python scripts/run_forecast_and_email.py
+"""
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+import logging
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit, parse_qsl
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that pin a request to absolute dates (replayed without shifting)
+ABSOLUTE_DATE_PARAMETERS = ('start_date', 'end_date', 'start_hour', 'end_hour',
+                            'start_minutely_15', 'end_minutely_15')
+
+# Response blocks whose 'time' entries are shifted
+TIME_BLOCKS = ('current', 'minutely_15', 'hourly', 'daily')
+
+
+def recording_key(url: str) -> str:
+    """Key of a request: path and sorted query parameters (scheme and host are ignored)"""
+    parts = urlsplit(url)
+    query = sorted(parse_qsl(parts.query, keep_blank_values=True))
+    payload = json.dumps([parts.path, query])
+    return hashlib.sha1(payload.encode()).hexdigest()[:20]
+
+
+def save_recording(record_dir: str, url: str, status: int, content_type: str, body: bytes):
+    """Store one response for replay (atomic write)"""
+    os.makedirs(record_dir, exist_ok=True)
+    path = os.path.join(record_dir, f"{recording_key(url)}.json")
+    record = {
+        'url': url,
+        'status': status,
+        'content_type': content_type,
+        'body': body.decode('utf-8'),
+        'recorded_at': time.time()
+    }
+    tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(record, f)
+    os.replace(tmp_path, path)
+
+
+def recording_age_days(record: Dict, now: Optional[datetime] = None) -> int:
+    """Whole UTC calendar days between the recording and now"""
+    now = now or datetime.now(timezone.utc)
+    recorded = datetime.fromtimestamp(record['recorded_at'], timezone.utc)
+    return (now.date() - recorded.date()).days
+
+
+def is_relative_request(url: str) -> bool:
+    """True for requests whose time window depends on the day they are made"""
+    return not any(name in ABSOLUTE_DATE_PARAMETERS
+                   for name, _ in parse_qsl(urlsplit(url).query, keep_blank_values=True))
+
+
+def _shift_time(value: Any, days: int) -> Any:
+    """Shift Open-Meteo time values (ISO strings, dates or unix seconds) by whole days"""
+    if isinstance(value, list):
+        return [_shift_time(item, days) for item in value]
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value + days * 86400
+    if isinstance(value, str):
+        shifted = datetime.fromisoformat(value) + timedelta(days=days)
+        return shifted.date().isoformat() if len(value) == 10 else shifted.isoformat(timespec='minutes')
+    return value
+
+
+def shift_body(body: str, days: int) -> str:
+    """Response body with the time arrays of every site moved forward by `days` days"""
+    data = json.loads(body)
+    for site in data if isinstance(data, list) else [data]:
+        for block in TIME_BLOCKS:
+            if isinstance(site.get(block), dict) and 'time' in site[block]:
+                site[block]['time'] = _shift_time(site[block]['time'], days)
+    return json.dumps(data)
+
+
+def load_recordings(record_dir: str) -> Dict[str, Dict]:
+    """All recordings of a directory keyed by recording_key"""
+    recordings = {}
+    for name in os.listdir(record_dir):
+        if name.endswith('.json'):
+            with open(os.path.join(record_dir, name)) as f:
+                recordings[name[:-5]] = json.load(f)
+    return recordings
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """HTTP server replaying recorded weather responses with latency and failure injection"""
+
+    daemon_threads = True
+
+    def __init__(self, record_dir: str, host: str = '127.0.0.1', port: int = 0,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 failure_rate: float = 0.0, failure_status: int = 503,
+                 slow_rate: float = 0.0, slow_ms: float = 5000.0,
+                 seed: Optional[int] = None, shift_to_today: bool = True):
+        """
+        Args:
+            record_dir: Directory with recordings (see save_recording)
+            host, port: Listen address (port 0 picks a free port)
+            latency_ms: Base latency added to every response
+            jitter_ms: Uniform random extra latency in [0, jitter_ms]
+            failure_rate: Fraction of requests answered with failure_status
+            failure_status: HTTP status of injected failures
+            slow_rate: Fraction of requests delayed by an extra slow_ms (exercises hedging/timeouts)
+            slow_ms: Extra delay of slow requests
+            seed: Seed of the injection randomness (repeatable runs)
+            shift_to_today: Shift forecast recordings by their age in days (see module docstring)
+        """
+        super().__init__((host, port), ReplayHandler)
+        self.recordings = load_recordings(record_dir)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.shift_to_today = shift_to_today
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.stats = {'requests': 0, 'replayed': 0, 'missing': 0, 'failed': 0, 'slow': 0}
+        logger.info(f"Replay server loaded {len(self.recordings)} recordings from {record_dir}")
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw(self) -> Dict[str, float]:
+        """Random injection decisions for one request"""
+        with self._random_lock:
+            return {
+                'fail': self._random.random() < self.failure_rate,
+                'slow': self._random.random() < self.slow_rate,
+                'jitter': self._random.uniform(0, self.jitter_ms)
+            }
+
+    def count(self, name: str):
+        with self._random_lock:
+            self.stats[name] += 1
+
+    def start_background(self) -> threading.Thread:
+        """Serve from a daemon thread (in-process benchmarks); stop with shutdown()"""
+        thread = threading.Thread(target=self.serve_forever, daemon=True, name='weather-replay')
+        thread.start()
+        return thread
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_GET(self):
+        server: ReplayServer = self.server
+        server.count('requests')
+        injection = server.draw()
+
+        delay_ms = server.latency_ms + injection['jitter']
+        if injection['slow']:
+            server.count('slow')
+            delay_ms += server.slow_ms
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+        if injection['fail']:
+            server.count('failed')
+            self._respond(server.failure_status, 'application/json', b'{"error": true, "reason": "injected failure"}')
+            return
+
+        record = server.recordings.get(recording_key(self.path))
+        if record is None:
+            server.count('missing')
+            self._respond(404, 'application/json', b'{"error": true, "reason": "no recording"}')
+            return
+
+        server.count('replayed')
+        body = record['body']
+        if server.shift_to_today and record['status'] == 200 and is_relative_request(record['url']):
+            days = recording_age_days(record)
+            if days:
+                body = shift_body(body, days)
+        self._respond(record['status'], record['content_type'], body.encode('utf-8'))
+
+    def _respond(self, status: int, content_type: str, body: bytes):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Replay recorded weather API responses')
+    parser.add_argument('--recordings', required=True, help='Directory written with WEATHER_RECORD_DIR')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--failure-status', type=int, default=503)
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--slow-ms', type=float, default=5000.0)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--keep-dates', action='store_true',
+                        help='Replay forecast recordings with their original dates')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    replay_server = ReplayServer(args.recordings, args.host, args.port, args.latency_ms, args.jitter_ms,
+                                 args.failure_rate, args.failure_status, args.slow_rate, args.slow_ms,
+                                 args.seed, shift_to_today=not args.keep_dates)
+    print(f"✓ Replaying {len(replay_server.recordings)} recordings on {replay_server.base_url}")
+    try:
+        replay_server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"Stopped: {replay_server.stats}")
@@ -0,0 +1,73 @@
+"""Equivalence of the Numba and NumPy kernel backends"""
+import numpy as np
+import pytest
+
+pytest.importorskip('numba')
+
+from solar_geometry import solar_position_arrays
+from pv_kernels import poa_transposition
+from synthetic_weather import synthetic_weather_kernel
+
+N = 10000
+
+
+@pytest.fixture(scope='module')
+def inputs():
+    rng = np.random.default_rng(0)
+    return {
+        'unix_seconds': rng.uniform(1.7e9, 1.9e9, N),
+        'latitude': rng.uniform(-60, 70, N),
+        'longitude': rng.uniform(-180, 180, N),
+        'elevation': rng.uniform(0, 90, N),
+        'azimuth': rng.uniform(0, 360, N),
+        'irradiance': rng.uniform(0, 1000, (3, N)),
+        'hour': rng.integers(0, 24, N).astype(float),
+        'day_of_year': rng.integers(1, 367, N).astype(float),
+        'draws': rng.random((5, N)),
+    }
+
+
+def run_solar_position(inputs, backend):
+    position = solar_position_arrays(inputs['unix_seconds'], inputs['latitude'], inputs['longitude'],
+                                     backend=backend)
+    return np.stack([position['elevation'], position['azimuth']])
+
+
+def run_poa_transposition(inputs, backend):
+    ghi, dni, dhi = inputs['irradiance']
+    return poa_transposition(inputs['elevation'], inputs['azimuth'], ghi, dni, dhi,
+                             25.0, 170.0, 0.25, backend=backend)
+
+
+def run_poa_transposition_sites(inputs, backend):
+    # float32 sites x time: shared time axis, per-site orientation, preallocated output
+    ghi, dni, dhi = inputs['irradiance'].astype(np.float32)
+    sites = np.linspace(0.5, 1.5, 4, dtype=np.float32)[:, None]
+    out = np.empty((4, N), dtype=np.float32)
+    result = poa_transposition(inputs['elevation'].astype(np.float32), inputs['azimuth'].astype(np.float32),
+                               ghi * sites, dni * sites, dhi, sites * 20, sites * 180, 0.25,
+                               out=out, backend=backend)
+    assert result is out
+    return result
+
+
+def run_synthetic_weather(inputs, backend):
+    return synthetic_weather_kernel(inputs['hour'], inputs['day_of_year'], 45.0, 25.0,
+                                    inputs['draws'], backend=backend)
+
+
+@pytest.mark.parametrize('kernel', [run_solar_position, run_poa_transposition, run_synthetic_weather],
+                         ids=['solar_position', 'poa_transposition', 'synthetic_weather'])
+def test_backends_match(inputs, kernel):
+    expected = kernel(inputs, 'numpy')
+    actual = kernel(inputs, 'numba')
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9)
+
+
+def test_backends_match_float32_broadcast(inputs):
+    expected = run_poa_transposition_sites(inputs, 'numpy')
+    actual = run_poa_transposition_sites(inputs, 'numba')
+    assert actual.dtype == np.float32
+    # The compiled loop evaluates the trigonometry in double precision
+    np.testing.assert_allclose(actual, expected, rtol=1e-4, atol=1e-2)
@@ -0,0 +1,43 @@
+"""JSON output does not depend on whether orjson is installed"""
+import json
+import numpy as np
+import pytest
+
+import json_stream
+
+VALUES = {
+    'float64': np.float64(1.5),
+    'float32': np.float32(2.5),
+    'int64': np.int64(3),
+    'int32': np.int32(-4),
+    'bool': np.bool_(True),
+    'python': [1, 2.25, None, 'text'],
+    'nan': float('nan'),
+    'nan64': np.float64('nan'),
+    'inf32': np.float32('inf'),
+    'array': np.array([0.5, np.nan, 2.0]),
+    'nested': {'values': [np.float64(0.25), np.int64(7)]},
+}
+
+
+def stdlib_dumps(monkeypatch, value):
+    monkeypatch.setattr(json_stream, 'ORJSON_AVAILABLE', False)
+    return json_stream.dumps(value)
+
+
+def test_stdlib_writes_numbers_and_null(monkeypatch):
+    parsed = json.loads(stdlib_dumps(monkeypatch, VALUES))
+    assert parsed['float64'] == 1.5 and parsed['float32'] == 2.5
+    assert parsed['int64'] == 3 and isinstance(parsed['int64'], int)
+    assert parsed['bool'] is True
+    assert parsed['nan'] is None and parsed['nan64'] is None and parsed['inf32'] is None
+    assert parsed['array'] == [0.5, None, 2.0]
+    assert parsed['nested'] == {'values': [0.25, 7]}
+
+
+def test_orjson_matches_stdlib(monkeypatch):
+    pytest.importorskip('orjson')
+    fast = json_stream.dumps(VALUES)
+    fallback = stdlib_dumps(monkeypatch, VALUES)
+    assert json.loads(fast) == json.loads(fallback)
+    assert [type(v) for v in json.loads(fast).values()] == [type(v) for v in json.loads(fallback).values()]
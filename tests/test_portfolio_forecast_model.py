@@ -0,0 +1,49 @@
+"""PortfolioForecastModel against the single-site IntradaySolarForecastModel"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import intraday_forecast_model
+import portfolio_forecast_model
+from config import LOCATIONS
+from forecast_quantiles import quantile_columns
+from intraday_forecast_model import IntradaySolarForecastModel
+from portfolio_forecast_model import PortfolioForecastModel, stack_weather_frames
+from synthetic_weather import synthetic_weather_frame
+
+SITES = ['cm_forecast', 'bulgaria_rooftop', 'lithuania_rooftop']
+START = pd.Timestamp('2025-06-01', tz='UTC')
+END = pd.Timestamp('2025-06-04', tz='UTC')
+COLUMNS = ['production_kw'] + quantile_columns()
+
+
+@pytest.fixture
+def weather_frames():
+    # Without cloud cover neither model adds noise, so the forecasts are deterministic
+    frames = {key: synthetic_weather_frame(LOCATIONS[key], START, END, seed=i).drop(columns='cloud_cover')
+              for i, key in enumerate(SITES)}
+    # A site without GHI falls back to the clear-sky estimate
+    frames['bulgaria_rooftop']['ghi'] = np.nan
+    return frames
+
+
+def test_portfolio_matches_single_site(weather_frames, monkeypatch):
+    monkeypatch.setattr(intraday_forecast_model, 'CALIBRATION_AVAILABLE', False)
+    portfolio = PortfolioForecastModel(SITES)
+    portfolio.use_solar_tables = False
+    timestamps, weather = stack_weather_frames(weather_frames)
+    frames = portfolio.predict_frames(timestamps, weather, noise_seed=None)
+
+    for key in SITES:
+        model = IntradaySolarForecastModel(key, LOCATIONS[key])
+        model.use_solar_tables = False
+        expected = model.predict_intraday(weather_frames[key].loc[timestamps])
+        assert expected['production_kw'].max() > 0
+        np.testing.assert_allclose(frames[key][COLUMNS].to_numpy(float), expected[COLUMNS].to_numpy(float),
+                                   rtol=1e-4, atol=1e-2, err_msg=key)
+
+
+def test_unsupported_quantile_level(monkeypatch):
+    monkeypatch.setattr(portfolio_forecast_model, 'QUANTILES', [0.05, 0.5, 0.95])
+    with pytest.raises(ValueError, match=r"quantile levels \[0.05, 0.95\]"):
+        PortfolioForecastModel(SITES)
@@ -0,0 +1,33 @@
+"""pv_kernels against the pandas operations they replace"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from pv_kernels import rolling_mean_centered
+
+
+def pandas_rolling_mean(values, window):
+    return np.stack([pd.Series(row).rolling(window, center=True, min_periods=1).mean().to_numpy()
+                     for row in np.atleast_2d(values)]).reshape(values.shape)
+
+
+@pytest.mark.parametrize('window', [1, 2, 3, 4, 7])
+@pytest.mark.parametrize('length', [1, 3, 4, 50])
+def test_rolling_mean_centered_matches_pandas(window, length):
+    rng = np.random.default_rng(window * 100 + length)
+    values = rng.random((3, length))
+    np.testing.assert_allclose(rolling_mean_centered(values, window), pandas_rolling_mean(values, window),
+                               rtol=1e-12)
+
+
+@pytest.mark.parametrize('window', [2, 4, 5])
+def test_rolling_mean_centered_skips_nan(window):
+    rng = np.random.default_rng(window)
+    values = rng.random((2, 96))
+    values[0, 40] = np.nan
+    values[1, 10:20] = np.nan
+    values[1, 0] = np.nan
+    expected = pandas_rolling_mean(values, window)
+    actual = rolling_mean_centered(values, window)
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual, expected, rtol=1e-12)
@@ -0,0 +1,111 @@
+"""Replaying recorded Open-Meteo responses on a later day"""
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import intraday_weather_fetcher
+from http_client import PooledHttpClient
+from intraday_weather_fetcher import IntradayWeatherFetcher, HOURLY_COLUMN_VARIABLES, MINUTELY_15_COLUMN_VARIABLES
+from weather_replay import ReplayServer, shift_body
+
+AGE_DAYS = 10
+
+
+def old_forecast(days_ago: int) -> dict:
+    """Open-Meteo style forecast issued `days_ago` days ago; temperature is the hour of day"""
+    start = pd.Timestamp(datetime.now(timezone.utc).date()) - pd.Timedelta(days=days_ago)
+
+    def block(freq, variables):
+        times = pd.date_range(start, periods=7 * 24 * 60 // freq, freq=f'{freq}min')
+        hours = (times.hour + times.minute / 60).tolist()
+        values = {variable: [50.0] * len(times) for variable in variables.values()}
+        values['temperature_2m'] = hours
+        return {'time': times.strftime('%Y-%m-%dT%H:%M').tolist(), **values}
+
+    return {'minutely_15': block(15, MINUTELY_15_COLUMN_VARIABLES),
+            'hourly': block(60, HOURLY_COLUMN_VARIABLES),
+            'current': {'time': start.strftime('%Y-%m-%dT%H:%M'), 'temperature_2m': 12.0}}
+
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = json.dumps(old_forecast(AGE_DAYS)).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_fetcher(monkeypatch, base_url, record_dir=None):
+    monkeypatch.setattr(intraday_weather_fetcher, 'OPEN_METEO_FORECAST_URL', f"{base_url}/v1/forecast")
+    fetcher = IntradayWeatherFetcher()
+    fetcher.http = PooledHttpClient(hedge_after_seconds=None, requests_per_minute=None, record_dir=record_dir)
+    fetcher.disk_cache = None
+    return fetcher
+
+
+@pytest.fixture
+def old_recordings(tmp_path, monkeypatch):
+    """Recordings of the fetcher's requests, aged by AGE_DAYS"""
+    upstream = serve(ThreadingHTTPServer(('127.0.0.1', 0), UpstreamHandler))
+    try:
+        fetcher = make_fetcher(monkeypatch, f"http://127.0.0.1:{upstream.server_port}", str(tmp_path))
+        fetcher.fetch_intraday_weather('cm_forecast')
+    finally:
+        upstream.shutdown()
+    for name in os.listdir(tmp_path):
+        path = tmp_path / name
+        record = json.loads(path.read_text())
+        record['recorded_at'] -= AGE_DAYS * 86400
+        path.write_text(json.dumps(record))
+    return str(tmp_path)
+
+
+def test_shift_body_moves_time_arrays():
+    body = json.dumps([{'hourly': {'time': ['2024-02-28T23:00'], 'x': [1]},
+                        'daily': {'time': ['2024-02-28']}, 'current': {'time': 1700000000}}])
+    shifted = json.loads(shift_body(body, 2))
+    assert shifted[0]['hourly'] == {'time': ['2024-03-01T23:00'], 'x': [1]}
+    assert shifted[0]['daily']['time'] == ['2024-03-01']
+    assert shifted[0]['current']['time'] == 1700000000 + 2 * 86400
+
+
+def test_old_recording_replays_through_fetcher(old_recordings, monkeypatch):
+    replay = serve(ReplayServer(old_recordings))
+    try:
+        fetcher = make_fetcher(monkeypatch, replay.base_url)
+        weather_df, source = fetcher.fetch_intraday_weather('cm_forecast')
+    finally:
+        replay.shutdown()
+
+    assert source == 'open_meteo_15min'
+    start_time, _ = fetcher._forecast_window(intraday_weather_fetcher.LOCATIONS['cm_forecast'])
+    assert weather_df.index[0] == start_time
+    assert not weather_df.isna().any().any()
+    # Whole-day shift keeps every value at its recorded time of day
+    np.testing.assert_allclose(weather_df['temperature'].to_numpy(),
+                               weather_df.index.hour + weather_df.index.minute / 60)
+
+
+def test_unshifted_old_recording_falls_back(old_recordings, monkeypatch):
+    replay = serve(ReplayServer(old_recordings, shift_to_today=False))
+    try:
+        _, source = make_fetcher(monkeypatch, replay.base_url).fetch_intraday_weather('cm_forecast')
+    finally:
+        replay.shutdown()
+    assert source == 'synthetic'